@@ -0,0 +1,76 @@
+"""
+Benchmark the single-pass PatternMatcher against the linear pattern scan.
+
+Measures per-message latency as the number of keyword rules and the length
+of the (non-matching) input grow.
+
+Usage:
+    python benchmarks/bench_matcher.py [--repeat 200]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eliza.core.matcher import PatternMatcher
+from eliza.core.response_patterns import DEFAULT_PATTERNS, ResponsePattern
+
+FILLER = ['the', 'weather', 'was', 'nice', 'and', 'we', 'walked', 'along',
+          'river', 'for', 'hours', 'talking', 'about', 'nothing', 'much']
+
+
+def linear_match(patterns, text):
+    """The original first-match-wins scan."""
+    for index, pattern in enumerate(patterns):
+        match = pattern.pattern.match(text)
+        if match:
+            return index, match
+    return None
+
+
+def build_patterns(extra_rules: int, rng: random.Random):
+    """Default rules plus ``extra_rules`` synthetic keyword rules before the catch-all."""
+    patterns = list(DEFAULT_PATTERNS)
+    catch_all = patterns.pop()
+    for i in range(extra_rules):
+        words = '|'.join(f'kw{i}x{j}' for j in range(rng.randint(2, 6)))
+        patterns.append(ResponsePattern(re.compile(rf'.*\b({words})\b.*', re.IGNORECASE),
+                                        [f"Rule {i}"]))
+    patterns.append(catch_all)
+    return patterns
+
+
+def time_per_call(func, patterns, text, repeat):
+    """Return the mean latency of ``func(patterns, text)`` in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(patterns, text)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ELIZA pattern matching')
+    parser.add_argument('--repeat', type=int, default=200, help='Calls per measurement')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'rules':>6} {'words':>6} {'linear us':>11} {'matcher us':>11} {'speedup':>8}")
+    for extra_rules in (0, 50, 200, 1000):
+        patterns = build_patterns(extra_rules, rng)
+        matcher = PatternMatcher(patterns)
+        for words in (5, 50, 500, 5000):
+            text = ' '.join(rng.choice(FILLER) for _ in range(words))
+            assert linear_match(patterns, text)[0] == matcher.match(text)[0]
+            linear = time_per_call(linear_match, patterns, text, args.repeat)
+            single = time_per_call(lambda _, t: matcher.match(t), patterns, text, args.repeat)
+            print(f"{len(patterns):>6} {words:>6} {linear:>11.1f} {single:>11.1f} "
+                  f"{linear / single:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark the integer-encoded n-gram counter against the Counter of tuples.
+
+Generates a synthetic Zipf-distributed corpus and, for n = 1..5, reports
+wall time and peak traced memory of ``Counter(generate_ngrams(n, tokens))``
+(the original ``build_ngram_model`` path) and of ``count_ngrams``.
+
+Usage:
+    python benchmarks/bench_ngrams.py [--tokens 1000000] [--vocab 20000]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eliza.ngrams.counting import count_ngrams, iter_tokens
+from eliza.ngrams.model import generate_ngrams
+
+
+def make_corpus(tokens: int, vocab: int, seed: int = 42) -> str:
+    """Return a text of ``tokens`` words drawn from a Zipf distribution."""
+    rng = np.random.default_rng(seed)
+    ranks = np.minimum(rng.zipf(1.2, tokens), vocab) - 1
+    words = np.array([f'w{i}' for i in range(vocab)])
+    return ' '.join(words[ranks].tolist())
+
+
+def measure(func):
+    """Return ``(result, seconds, peak MiB)`` of calling ``func``."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark n-gram counting')
+    parser.add_argument('--tokens', type=int, default=1_000_000, help='Corpus size in tokens')
+    parser.add_argument('--vocab', type=int, default=20000, help='Vocabulary size')
+    args = parser.parse_args()
+
+    text = make_corpus(args.tokens, args.vocab)
+    print(f"{args.tokens} tokens, vocabulary {args.vocab}")
+    print(f"{'n':>2} {'ngrams':>9} {'Counter s':>10} {'MiB':>8} "
+          f"{'engine s':>9} {'MiB':>8} {'speedup':>8} {'memory':>7}")
+    for n in range(1, 6):
+        baseline, base_time, base_peak = measure(
+            lambda: Counter(generate_ngrams(n, list(iter_tokens(text)))))
+        table, time_, peak = measure(lambda: count_ngrams(n, text))
+        assert len(table) == len(baseline)
+        del baseline
+        print(f"{n:>2} {len(table):>9} {base_time:>10.2f} {base_peak:>8.1f} "
+              f"{time_:>9.2f} {peak:>8.1f} {base_time / time_:>7.1f}x "
+              f"{base_peak / peak:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark multi-process n-gram counting as the number of workers grows.
+
+Writes a synthetic Zipf-distributed corpus to a temporary file, counts its
+n-grams with 1, 2, 4, ... workers up to the number of cores, checks every
+result is identical to the single-worker one, and reports the speedup.
+
+Usage:
+    python benchmarks/bench_ngrams_parallel.py [--mb 200] [-n 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eliza.ngrams.parallel import count_ngrams_parallel
+
+
+def write_corpus(path: str, megabytes: int, vocab: int = 50000, seed: int = 42) -> None:
+    """Write about ``megabytes`` MiB of Zipf-distributed words, 20 per line."""
+    rng = np.random.default_rng(seed)
+    words = np.array([f'w{i}' for i in range(vocab)])
+    with open(path, 'w', encoding='utf-8') as f:
+        while f.tell() < megabytes << 20:
+            ranks = np.minimum(rng.zipf(1.2, 200000), vocab) - 1
+            lines = words[ranks].reshape(-1, 20)
+            f.write('\n'.join(' '.join(line) for line in lines.tolist()) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parallel n-gram counting')
+    parser.add_argument('--mb', type=int, default=200, help='Corpus size in MiB')
+    parser.add_argument('-n', type=int, default=3, help='Size of n-grams')
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    counts = sorted({1 << i for i in range(cores.bit_length()) if 1 << i <= cores} | {cores})
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+    try:
+        write_corpus(path, args.mb)
+        print(f"{os.path.getsize(path) / 2 ** 20:.0f} MiB corpus, n={args.n}")
+        print(f"{'workers':>7} {'seconds':>8} {'speedup':>8}")
+        reference = baseline = None
+        for workers in counts:
+            start = time.perf_counter()
+            table = count_ngrams_parallel(path, args.n, workers=workers)
+            elapsed = time.perf_counter() - start
+            if reference is None:
+                reference, baseline = table, elapsed
+            else:
+                assert np.array_equal(table.keys, reference.keys)
+                assert np.array_equal(table.counts, reference.counts)
+            print(f"{workers:>7} {elapsed:>8.2f} {baseline / elapsed:>7.1f}x")
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark per-document perplexity scoring of many short chat turns.
+
+Compares calling the original dict-based perplexity once per turn with one
+``PerplexityScorer.score_many`` call over all turns.
+
+Usage:
+    python benchmarks/bench_scoring.py [--turns 100000] [-n 2]
+"""
+
+import argparse
+import math
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eliza.ngrams.counting import count_ngrams
+from eliza.ngrams.model import calculate_probabilities
+from eliza.ngrams.scoring import PerplexityScorer
+
+
+def dict_perplexity(text, model, n, smoothing_value=1e-10):
+    """The original implementation: rebuild the probability dict, then loop."""
+    probs = calculate_probabilities(model)
+    tokens = re.findall(r'\w+', text.lower())
+    ngrams = [tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
+    if not ngrams:
+        return float('inf')
+    log_prob = sum(math.log2(probs.get(ngram, smoothing_value)) for ngram in ngrams)
+    return math.pow(2, -log_prob / len(ngrams))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batch perplexity scoring')
+    parser.add_argument('--turns', type=int, default=100000, help='Chat turns to score')
+    parser.add_argument('-n', type=int, default=2, help='Size of n-grams')
+    parser.add_argument('--baseline-turns', type=int, default=50,
+                        help='Turns scored with the original implementation')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    words = np.array([f'w{i}' for i in range(5000)])
+    corpus = ' '.join(words[np.minimum(rng.zipf(1.3, 500000), 5000) - 1].tolist())
+    turns = [' '.join(rng.choice(words, rng.integers(1, 15)).tolist()) for _ in range(args.turns)]
+
+    table = count_ngrams(args.n, corpus)
+    counter = table.to_counter()
+    print(f"{len(table)} {args.n}-grams in the model, {args.turns} turns")
+
+    start = time.perf_counter()
+    expected = [dict_perplexity(turn, counter, args.n) for turn in turns[:args.baseline_turns]]
+    baseline = (time.perf_counter() - start) / args.baseline_turns
+
+    start = time.perf_counter()
+    scorer = PerplexityScorer(table)
+    scores = scorer.score_many(turns)
+    batch = (time.perf_counter() - start) / args.turns
+    assert np.allclose(scores[:args.baseline_turns], expected, rtol=1e-9)
+
+    print(f"dict per turn:   {baseline * 1e6:12.1f} us/turn")
+    print(f"scorer batch:    {batch * 1e6:12.2f} us/turn")
+    print(f"speedup:         {baseline / batch:12.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark the streaming text scanners against the original list helpers.
+
+Writes a synthetic text file of ``--mb`` MiB (GB-scale by default), then
+runs each query both ways in a fresh process, reporting wall time and the
+peak resident memory of that process. The originals read and split the
+whole file before matching; the ``iter_*`` scanners read it line by line.
+Results are consumed without being kept, as a pipeline would.
+
+Peak memory uses ``resource``, so this runs on Unix only.
+
+Usage:
+    python benchmarks/bench_text_processing.py [--mb 1024]
+"""
+
+import argparse
+import collections
+import multiprocessing
+import os
+import random
+import re
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eliza.utils import text_processing
+
+WORDS = ['the', 'raven', 'Quoth', 'nevermore,', 'midnight', 'dreary.', 'bob', 'Ab', 'cab',
+         'weak', 'and', 'weary', 'upon', 'a', 'curious', 'volume', 'of', 'forgotten', 'lore']
+
+
+def original_words(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read().split()
+
+
+def original_lines(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+# The list implementations as they were before the streaming scanners
+ORIGINALS = {
+    'alphabetic_strings': lambda p: [w for w in original_words(p)
+                                     if re.fullmatch(r"[a-zA-Z]+", w)],
+    'consecutive_repeated_words': lambda p: [l for l in original_lines(p)
+                                             if re.search(r"(\b\w+\b)\s+\1\b", l)],
+    'integer_start_word_end': lambda p: [l for l in original_lines(p)[:500]
+                                         if re.match(r"^[0-9]+(\b.*\b)+[A-Za-z]+$", l)],
+    'capture_first_word': lambda p: [re.match(r'^[A-Za-z]+', l).group()
+                                     for l in original_lines(p) if re.match(r'^[A-Za-z]+', l)],
+}
+
+STREAMING = {
+    'alphabetic_strings': text_processing.iter_alphabetic_strings,
+    'consecutive_repeated_words': text_processing.iter_consecutive_repeated_words,
+    'integer_start_word_end': text_processing.iter_integer_start_word_end,
+    'capture_first_word': text_processing.iter_capture_first_word,
+}
+
+
+def write_corpus(path: str, megabytes: int) -> None:
+    rng = random.Random(42)
+    block = '\n'.join(
+        (f"{rng.randrange(100)} " if rng.random() < 0.1 else '')
+        + ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(1, 14)))
+        for _ in range(20000)) + '\n'
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(max(1, (megabytes << 20) // len(block))):
+            f.write(block)
+
+
+def measure(kind: str, name: str, path: str):
+    """Run one query in this (fresh) process; return (seconds, peak MiB)."""
+    func = (ORIGINALS if kind == 'original' else STREAMING)[name]
+    start = time.perf_counter()
+    collections.deque(func(path), maxlen=0)
+    elapsed = time.perf_counter() - start
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark streaming text scanners')
+    parser.add_argument('--mb', type=int, default=1024, help='Corpus size in MiB')
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+    context = multiprocessing.get_context('spawn')
+    try:
+        write_corpus(path, args.mb)
+        print(f"{os.path.getsize(path) / 2 ** 20:.0f} MiB corpus")
+        print(f"{'query':<28} {'original s':>10} {'MiB':>8} {'streaming s':>11} {'MiB':>8}")
+        for name in ORIGINALS:
+            results = []
+            for kind in ('original', 'streaming'):
+                with context.Pool(1) as pool:
+                    results.extend(pool.apply(measure, (kind, name, path)))
+            print(f"{name:<28} {results[0]:>10.2f} {results[1]:>8.0f} "
+                  f"{results[2]:>11.2f} {results[3]:>8.0f}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
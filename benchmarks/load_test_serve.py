@@ -0,0 +1,124 @@
+"""
+Load test of ``eliza-serve`` scaling with the number of worker processes.
+
+For each worker count, starts ``eliza-serve`` with a fresh SQLite session
+store, then runs ``--clients`` simulated users spread over several client
+processes for ``--duration`` seconds. Each user keeps its session ID and a
+keep-alive connection and posts chat messages back to back. Reports the
+throughput, the latency percentiles and the scaling efficiency, i.e. the
+throughput per worker relative to a single worker; near-linear scaling
+needs at least as many free CPU cores as workers plus client processes.
+
+Requires gunicorn (``pip install .[serve]``).
+
+Usage:
+    python benchmarks/load_test_serve.py [--workers 1 2 4] [--clients 32] [--duration 10]
+        [-o results.json]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+from load_test_web import MESSAGES, free_port, start_server
+
+
+def user(port: int, deadline: float) -> List[float]:
+    """Chat until ``deadline`` and return the latency of each message."""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    session_id = uuid.uuid4().hex
+    headers = {'Content-Type': 'application/json'}
+    latencies = []
+    i = 0
+    while time.time() < deadline:
+        body = json.dumps({'message': MESSAGES[i % len(MESSAGES)], 'session_id': session_id})
+        start = time.perf_counter()
+        connection.request('POST', '/api/chat', body, headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}")
+        latencies.append(time.perf_counter() - start)
+        i += 1
+    connection.close()
+    return latencies
+
+
+def client_process(port: int, users: int, deadline: float) -> List[float]:
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        futures = [pool.submit(user, port, deadline) for _ in range(users)]
+        return [latency for future in futures for latency in future.result()]
+
+
+def run_load(port: int, clients: int, processes: int, duration: float) -> Dict[str, float]:
+    deadline = time.time() + duration
+    shares = [clients // processes + (i < clients % processes) for i in range(processes)]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(client_process, port, share, deadline) for share in shares if share]
+        latencies = sorted(latency for future in futures for latency in future.result())
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {'messages': len(latencies), 'messages_per_second': len(latencies) / duration,
+            'p50_ms': quantiles[49] * 1e3, 'p99_ms': quantiles[98] * 1e3}
+
+
+def measure(workers: int, threads: int, clients: int, processes: int,
+            duration: float) -> Dict[str, Any]:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ['ELIZA_SESSION_JOURNAL'] = str(Path(tmpdir) / 'journal.jsonl')
+        server = start_server(
+            'from eliza.web.serve import main\n'
+            f'main(["--bind", "127.0.0.1:{port}", "--workers", "{workers}", '
+            f'"--threads", "{threads}", "--session-store", {str(Path(tmpdir) / "s.db")!r}, '
+            '"--log-level", "warning"])', port)
+        try:
+            # Let every worker boot before measuring
+            time.sleep(0.5 + 0.1 * workers)
+            result = run_load(port, clients, processes, duration)
+        finally:
+            server.terminate()
+            server.wait()
+    return {'workers': workers, 'threads': threads, 'clients': clients, **result}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure eliza-serve scaling with worker count')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4],
+                        help='Worker counts to measure')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per worker')
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent users')
+    parser.add_argument('--client-processes', type=int, default=os.cpu_count() or 1,
+                        help='Processes the users are spread over')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per worker count')
+    parser.add_argument('-o', '--output', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    results = []
+    for workers in args.workers:
+        result = measure(workers, args.threads, args.clients, args.client_processes,
+                         args.duration)
+        results.append(result)
+
+    base = results[0]['messages_per_second'] / results[0]['workers']
+    print(f"{'workers':>7} {'msg/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'efficiency':>10}")
+    for result in results:
+        result['efficiency'] = result['messages_per_second'] / (result['workers'] * base)
+        print(f"{result['workers']:>7} {result['messages_per_second']:>10.1f} "
+              f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['efficiency']:>10.0%}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'cpus': os.cpu_count(), 'python': sys.version.split()[0],
+                       'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Load test comparing the Flask dev-server HTTP path with the ASGI WebSocket mode.
+
+Starts both servers locally, then runs ``--clients`` concurrent simulated
+users that each send ``--messages`` chat messages, and reports throughput.
+The HTTP client mirrors ``static/js/app.js``: one POST to ``/api/chat`` per
+message followed by a POST of the new turns to ``/api/save-session``
+(skip the latter with ``--no-save``). The WebSocket client keeps one
+connection per user and sends plain-text frames.
+
+Requires the ``websockets`` package and uvicorn (``pip install .[asgi]``).
+
+Usage:
+    python benchmarks/load_test_web.py [--clients 50] [--messages 20]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+MESSAGES = ["Hello", "I feel sad today", "My mother is awful to me",
+            "I need some rest", "Why does this keep happening?", "thanks"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(code: str, port: int) -> subprocess.Popen:
+    """Start a server subprocess and wait until it accepts connections."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    process = subprocess.Popen([sys.executable, '-c', code], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def post_json(url: str, payload) -> dict:
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def http_user(base: str, messages: int, save: bool) -> None:
+    session_id = uuid.uuid4().hex
+    history = []
+    for i in range(messages):
+        text = MESSAGES[i % len(MESSAGES)]
+        reply = post_json(base + '/api/chat', {'message': text, 'session_id': session_id})
+        turns = [{'speaker': 'user', 'text': text},
+                 {'speaker': 'eliza', 'text': reply['response']}]
+        if save:
+            post_json(base + '/api/save-session',
+                      {'session_id': session_id, 'offset': len(history), 'turns': turns})
+        history += turns
+
+
+async def websocket_user(base: str, messages: int) -> None:
+    import websockets
+
+    async with websockets.connect(f'{base}/ws?session_id={uuid.uuid4().hex}') as ws:
+        for i in range(messages):
+            await ws.send(MESSAGES[i % len(MESSAGES)])
+            await ws.recv()
+
+
+def run_http(port: int, clients: int, messages: int, save: bool) -> float:
+    base = f'http://127.0.0.1:{port}'
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for future in [pool.submit(http_user, base, messages, save) for _ in range(clients)]:
+            future.result()
+    return clients * messages / (time.perf_counter() - start)
+
+
+def run_websocket(port: int, clients: int, messages: int) -> float:
+    async def run():
+        base = f'ws://127.0.0.1:{port}'
+        await asyncio.gather(*(websocket_user(base, messages) for _ in range(clients)))
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    return clients * messages / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare HTTP and WebSocket chat throughput')
+    parser.add_argument('--clients', type=int, default=50, help='Concurrent users')
+    parser.add_argument('--messages', type=int, default=20, help='Messages per user')
+    parser.add_argument('--no-save', action='store_true',
+                        help='Skip the per-message /api/save-session POST')
+    args = parser.parse_args()
+
+    flask_port, asgi_port = free_port(), free_port()
+    flask = start_server(
+        'from eliza.web.app import app\n'
+        f'app.run(port={flask_port}, threaded=True)', flask_port)
+    asgi = start_server(
+        'import uvicorn\n'
+        f'uvicorn.run("eliza.web.asgi:app", port={asgi_port}, log_level="warning")', asgi_port)
+    try:
+        http_rate = run_http(flask_port, args.clients, args.messages, not args.no_save)
+        ws_rate = run_websocket(asgi_port, args.clients, args.messages)
+    finally:
+        flask.terminate()
+        asgi.terminate()
+
+    print(f"{args.clients} clients x {args.messages} messages")
+    print(f"Flask dev server (HTTP):  {http_rate:10.1f} messages/s")
+    print(f"ASGI (WebSocket):         {ws_rate:10.1f} messages/s")
+    print(f"Speedup:                  {ws_rate / http_rate:10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+"""
+Reproducible benchmark suite for ELIZA.
+
+Runs micro and macro benchmarks of the chat pipeline, the n-gram engine
+and the text scanners on synthetic, seeded inputs, and writes the results
+with the machine and commit they were measured on as JSON. Two result
+files can then be compared to spot regressions between commits.
+
+Suites:
+    respond          Eliza.respond latency by message length and rule set
+    construction     Eliza(), Rulebook and ContextTracker construction
+    conversation     Many interleaved sessions through a SessionManager
+    ngrams           N-gram counting, perplexity and Kneser-Ney scoring by
+                     corpus size
+    text_processing  The streaming iter_* scanners by file size
+
+Each measurement runs the workload ``number`` times per repeat, with the
+garbage collector off, and reports per-call seconds over the repeats.
+
+Usage:
+    python benchmarks/run.py [-o results.json] [--scale quick] [--only respond,ngrams]
+    python benchmarks/run.py --compare baseline.json [-o results.json] [--threshold 0.1]
+"""
+
+import argparse
+import collections
+import datetime
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from eliza.core.chatbot import Eliza
+from eliza.core.context import ContextTracker
+from eliza.core.history import SessionHistory
+from eliza.core.response_patterns import DEFAULT_PATTERNS, ResponsePattern
+from eliza.core.rulebook import Rulebook
+from eliza.core.sessions import SessionManager
+from eliza.ngrams import KneserNeyModel, PerplexityScorer, count_ngrams
+from eliza.utils import text_processing
+
+SEED = 42
+FORMAT_VERSION = 1
+
+# Sizes and repetitions per scale; "smoke" only checks that everything runs
+SCALES = {
+    'full': {'repeat': 7, 'message_words': (3, 30, 300), 'extra_rules': 200,
+             'sessions': 200, 'turns': 5000, 'corpus_tokens': (10 ** 4, 10 ** 5, 10 ** 6),
+             'documents': 2000, 'file_bytes': (1 << 20, 16 << 20)},
+    'quick': {'repeat': 5, 'message_words': (3, 30, 300), 'extra_rules': 200,
+              'sessions': 50, 'turns': 1000, 'corpus_tokens': (10 ** 4, 10 ** 5),
+              'documents': 500, 'file_bytes': (1 << 20,)},
+    'smoke': {'repeat': 1, 'message_words': (3,), 'extra_rules': 5,
+              'sessions': 2, 'turns': 10, 'corpus_tokens': (1000,),
+              'documents': 10, 'file_bytes': (1 << 14,)},
+}
+
+FILLER = ['the', 'weather', 'was', 'nice', 'and', 'we', 'walked', 'along',
+          'river', 'for', 'hours', 'talking', 'about', 'nothing', 'much']
+KEYWORDS = ['sad', 'mother', 'work', 'angry', 'need', 'feel', 'why', 'help']
+CORPUS_WORDS = ['the', 'raven', 'Quoth', 'nevermore,', 'midnight', 'dreary.', 'bob', 'Ab',
+                'cab', 'weak', 'and', 'weary', 'upon', 'a', 'curious', 'volume', 'of']
+
+Record = Dict[str, Any]
+
+
+def measure(func: Callable[[], Any], repeat: int, number: int = 1,
+            per: int = 1) -> Dict[str, float]:
+    """
+    Time ``func`` and summarize the per-operation seconds over the repeats.
+
+    Args:
+        func: Workload to time
+        repeat: Number of timed repeats
+        number: Calls of ``func`` per repeat
+        per: Operations performed by one call, to report per operation
+    """
+    times = [elapsed / number / per
+             for elapsed in timeit.Timer(func).repeat(repeat=repeat, number=number)]
+    median = statistics.median(times)
+    return {
+        'min': min(times),
+        'median': median,
+        'mean': statistics.fmean(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'ops_per_s': 1 / median if median else float('inf'),
+        'repeat': repeat,
+        'number': number,
+    }
+
+
+def record(suite: str, name: str, params: Dict[str, Any], stats: Dict[str, float]) -> Record:
+    return {'suite': suite, 'name': name, 'params': params, 'unit': 's', **stats}
+
+
+def synthetic_rules(count: int, rng: random.Random) -> List[ResponsePattern]:
+    """Default rules plus ``count`` keyword rules placed before the catch-all."""
+    patterns = list(DEFAULT_PATTERNS)
+    catch_all = patterns.pop()
+    for i in range(count):
+        words = '|'.join(f'kw{i}x{j}' for j in range(rng.randint(2, 6)))
+        patterns.append(ResponsePattern(re.compile(rf'.*\b({words})\b.*', re.IGNORECASE),
+                                        [f"Rule {i}"]))
+    patterns.append(catch_all)
+    return patterns
+
+
+def messages(words: int, count: int, rng: random.Random) -> List[str]:
+    """Messages of ``words`` words, about a third of them with a rule keyword."""
+    result = []
+    for _ in range(count):
+        message = [rng.choice(FILLER) for _ in range(words)]
+        if rng.random() < 0.35:
+            message[rng.randrange(words)] = rng.choice(KEYWORDS)
+        result.append(' '.join(message))
+    return result
+
+
+def bench_respond(scale: Dict[str, Any]) -> Iterable[Record]:
+    rng = random.Random(SEED)
+    rule_sets = {'default': Rulebook(DEFAULT_PATTERNS),
+                 'extended': Rulebook(synthetic_rules(scale['extra_rules'], rng))}
+    for rules, rulebook in rule_sets.items():
+        for words in scale['message_words']:
+            batch = messages(words, 100, rng)
+            eliza = Eliza(rulebook, seed=SEED, history=SessionHistory(window=64))
+
+            def run():
+                for message in batch:
+                    eliza.respond(message)
+
+            params = {'rules': rules, 'rule_count': len(rulebook), 'words': words}
+            yield record('respond', 'respond', params,
+                         measure(run, scale['repeat'], per=len(batch)))
+
+
+def bench_construction(scale: Dict[str, Any]) -> Iterable[Record]:
+    repeat = scale['repeat']
+    yield record('construction', 'eliza', {}, measure(Eliza, repeat, number=1000))
+    yield record('construction', 'rulebook', {'rule_count': len(DEFAULT_PATTERNS)},
+                 measure(lambda: Rulebook(DEFAULT_PATTERNS), repeat, number=100))
+    yield record('construction', 'context_tracker', {},
+                 measure(ContextTracker, repeat, number=100))
+
+
+def bench_conversation(scale: Dict[str, Any]) -> Iterable[Record]:
+    rng = random.Random(SEED)
+    session_ids = [f'session-{i:04d}' for i in range(scale['sessions'])]
+    turns = [(rng.choice(session_ids), message)
+             for message in messages(12, scale['turns'], rng)]
+
+    def run():
+        sessions = SessionManager()
+        for session_id, message in turns:
+            sessions.respond(session_id, message)
+
+    params = {'sessions': scale['sessions'], 'turns': scale['turns']}
+    yield record('conversation', 'session_manager', params,
+                 measure(run, scale['repeat'], per=len(turns)))
+
+
+def bench_ngrams(scale: Dict[str, Any]) -> Iterable[Record]:
+    rng = np.random.default_rng(SEED)
+    vocabulary = np.array([f'w{i}' for i in range(20000)])
+    documents = [' '.join(rng.choice(vocabulary[:2000], rng.integers(3, 20)).tolist())
+                 for _ in range(scale['documents'])]
+    for tokens in scale['corpus_tokens']:
+        ids = np.minimum(rng.zipf(1.3, tokens), len(vocabulary)) - 1
+        corpus = ' '.join(vocabulary[ids].tolist())
+        repeat = scale['repeat']
+        for n in (2, 3):
+            params = {'tokens': tokens, 'n': n}
+            yield record('ngrams', 'count', params, measure(lambda: count_ngrams(n, corpus), repeat))
+            table = count_ngrams(n, corpus)
+            scorer = PerplexityScorer(table)
+            yield record('ngrams', 'perplexity_score_many', {**params, 'documents': len(documents)},
+                         measure(lambda: scorer.score_many(documents), repeat))
+            yield record('ngrams', 'kneser_ney_build', params,
+                         measure(lambda: KneserNeyModel(table), repeat))
+            model = KneserNeyModel(table)
+            yield record('ngrams', 'kneser_ney_score_many', {**params, 'documents': len(documents)},
+                         measure(lambda: model.score_many(documents), repeat))
+
+
+def write_corpus(path: str, size: int) -> None:
+    """Write about ``size`` bytes of seeded, line-structured text."""
+    rng = random.Random(SEED)
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < size:
+            line = ((f"{rng.randrange(100)} " if rng.random() < 0.1 else '')
+                    + ' '.join(rng.choice(CORPUS_WORDS) for _ in range(rng.randrange(1, 14))))
+            written += f.write(line + '\n')
+
+
+def bench_text_processing(scale: Dict[str, Any]) -> Iterable[Record]:
+    scanners = {
+        'alphabetic_strings': text_processing.iter_alphabetic_strings,
+        'consecutive_repeated_words': text_processing.iter_consecutive_repeated_words,
+        'integer_start_word_end': text_processing.iter_integer_start_word_end,
+        'find_words': text_processing.iter_find_words,
+        'capture_first_word': text_processing.iter_capture_first_word,
+        'capture_first_word_punc': text_processing.iter_capture_first_word_punc,
+    }
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+    try:
+        for size in scale['file_bytes']:
+            write_corpus(path, size)
+            for name, scanner in scanners.items():
+                stats = measure(lambda: collections.deque(scanner(path), maxlen=0),
+                                scale['repeat'])
+                yield record('text_processing', name, {'bytes': size}, stats)
+    finally:
+        os.remove(path)
+
+
+SUITES = {
+    'respond': bench_respond,
+    'construction': bench_construction,
+    'conversation': bench_conversation,
+    'ngrams': bench_ngrams,
+    'text_processing': bench_text_processing,
+}
+
+
+def environment(scale: str) -> Dict[str, Any]:
+    """Describe the commit, interpreter and machine the results come from."""
+    def git(*args: str) -> Optional[str]:
+        try:
+            return subprocess.run(('git',) + args, cwd=ROOT, capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    cpu = platform.processor()
+    try:
+        with open('/proc/cpuinfo', encoding='utf-8') as f:
+            cpu = next((line.split(':', 1)[1].strip() for line in f
+                        if line.startswith('model name')), cpu)
+    except OSError:
+        pass
+    return {
+        'format_version': FORMAT_VERSION,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'commit': git('rev-parse', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu': cpu,
+        'cpu_count': os.cpu_count(),
+        'scale': scale,
+        'seed': SEED,
+    }
+
+
+def run_suite(scale: str = 'full', only: Optional[Iterable[str]] = None,
+              progress: Optional[Callable[[Record], None]] = None) -> Dict[str, Any]:
+    """
+    Run the selected suites.
+
+    Args:
+        scale: Key of ``SCALES``
+        only: Names of the suites to run; all if omitted
+        progress: Called with each record as soon as it is measured
+
+    Returns:
+        ``{"environment": {...}, "results": [record, ...]}``
+    """
+    names = list(SUITES) if only is None else list(only)
+    unknown = set(names) - set(SUITES)
+    if unknown:
+        raise ValueError(f"Unknown suites: {', '.join(sorted(unknown))}")
+    results = []
+    for name in names:
+        for result in SUITES[name](SCALES[scale]):
+            results.append(result)
+            if progress:
+                progress(result)
+    return {'environment': environment(scale), 'results': results}
+
+
+def result_key(result: Record) -> Tuple[str, str, str]:
+    return result['suite'], result['name'], json.dumps(result['params'], sort_keys=True)
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = 0.1) -> List[Tuple[Record, Record, float, bool]]:
+    """
+    Pair the results of two runs measured with the same parameters.
+
+    Returns:
+        ``(baseline, current, ratio, regressed)`` tuples, where ``ratio`` is
+        the current over the baseline median and ``regressed`` is whether
+        it exceeds ``1 + threshold``
+    """
+    previous = {result_key(result): result for result in baseline['results']}
+    pairs = []
+    for result in current['results']:
+        old = previous.get(result_key(result))
+        if old is None or not old['median']:
+            continue
+        ratio = result['median'] / old['median']
+        pairs.append((old, result, ratio, ratio > 1 + threshold))
+    return pairs
+
+
+def describe(result: Record) -> str:
+    params = ' '.join(f'{key}={value}' for key, value in result['params'].items())
+    return f"{result['suite']}.{result['name']} {params}".strip()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Run the ELIZA benchmark suite')
+    parser.add_argument('-o', '--output', help='Write the results to this JSON file')
+    parser.add_argument('--scale', choices=list(SCALES), default='full',
+                        help='Input sizes and repetitions')
+    parser.add_argument('--only', help='Comma-separated suites to run: ' + ', '.join(SUITES))
+    parser.add_argument('--compare', help='Baseline results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative slowdown reported as a regression')
+    args = parser.parse_args(argv)
+
+    def progress(result: Record) -> None:
+        print(f"{describe(result):<70} {result['median'] * 1e6:>12.1f} us "
+              f"{result['ops_per_s']:>12.1f}/s", file=sys.stderr)
+
+    only = args.only.split(',') if args.only else None
+    current = run_suite(args.scale, only, progress)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+            f.write('\n')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        pairs = compare(baseline, current, args.threshold)
+        print(f"Baseline {baseline['environment'].get('commit')} "
+              f"-> {current['environment'].get('commit')}")
+        for old, new, ratio, regressed in pairs:
+            print(f"{describe(new):<70} {old['median'] * 1e6:>12.1f} -> "
+                  f"{new['median'] * 1e6:>12.1f} us {ratio:>6.2f}x"
+                  + ('  REGRESSION' if regressed else ''))
+        return 1 if any(regressed for *_, regressed in pairs) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,11 +4,24 @@ ELIZA Chatbot Package
 
 A modern implementation of the ELIZA chatbot with context awareness
 and natural language processing capabilities.
+
+The exported names are imported on first use, so importing the package
+(e.g. to run the CLI) stays fast.
 """
 
-from .core.chatbot import Eliza
-from .core.response_patterns import ResponsePattern
+from typing import TYPE_CHECKING
+
+from ._lazy import lazy_exports
 
 __version__ = '1.0.0'
 __author__ = 'Your Name'
 __all__ = ['Eliza', 'ResponsePattern']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'Eliza': '.core.chatbot',
+    'ResponsePattern': '.core.response_patterns',
+})
+
+if TYPE_CHECKING:
+    from .core.chatbot import Eliza
+    from .core.response_patterns import ResponsePattern
@@ -0,0 +1,41 @@
+"""
+Lazy package exports (PEP 562).
+
+A package lists the names it exports and the submodule defining each; the
+submodule is only imported when one of its names is first looked up, so
+``import eliza`` does not pay for the chatbot, NumPy or Flask until they
+are used.
+"""
+
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], Any],
+                                                                  Callable[[], List[str]]]:
+    """
+    Build the module ``__getattr__`` and ``__dir__`` of a package.
+
+    Args:
+        package: The package's ``__name__``
+        exports: Exported name to the relative submodule defining it,
+            e.g. ``{'Eliza': '.core.chatbot'}``
+
+    Returns:
+        ``(__getattr__, __dir__)`` to assign in the package's namespace
+    """
+    def __getattr__(name: str) -> Any:
+        try:
+            module = exports[name]
+        except KeyError:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}") from None
+        value = getattr(importlib.import_module(module, package), name)
+        # Later lookups find the name directly and skip this hook
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,187 @@
+"""
+Offline replay of recorded utterances through ELIZA.
+
+Input is read as a stream, one utterance per line. A line holding a JSON
+object is read as ``{"conversation_id": ..., "text": ...}``; any other line
+is plain text belonging to a single ``"default"`` conversation. Results are
+streamed out as JSON Lines::
+
+    {"conversation_id": "c1", "turn": 0, "text": "Hello", "response": "..."}
+
+Conversations are spread across worker processes by a stable hash of their
+ID, so every conversation is replayed by one worker, in input order. With a
+seed, each conversation gets its own generator seeded from the seed and its
+ID, making the output independent of the number of workers. With a rules
+file, every worker loads it through its compiled cache.
+"""
+
+import json
+import multiprocessing
+import queue
+import threading
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from .core.chatbot import Eliza
+from .core.rulebook import Rulebook
+from .core.rulefile import load_rulebook
+
+DEFAULT_CONVERSATION = 'default'
+
+# (conversation_id, turn, text)
+Utterance = Tuple[str, int, str]
+
+
+def read_utterances(lines: Iterable[str]) -> Iterator[Utterance]:
+    """
+    Parse input lines into utterances numbered per conversation.
+
+    Args:
+        lines: JSON Lines records or plain-text lines
+
+    Yields:
+        ``(conversation_id, turn, text)`` tuples
+    """
+    turns: Dict[str, int] = {}
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line.strip():
+            continue
+        conversation_id, text = DEFAULT_CONVERSATION, line
+        if line.lstrip().startswith('{'):
+            try:
+                record = json.loads(line)
+                conversation_id = str(record.get('conversation_id', DEFAULT_CONVERSATION))
+                text = str(record['text'])
+            except (ValueError, KeyError, AttributeError):
+                conversation_id, text = DEFAULT_CONVERSATION, line
+        turn = turns.get(conversation_id, 0)
+        turns[conversation_id] = turn + 1
+        yield conversation_id, turn, text
+
+
+class _Replayer:
+    """Keeps one ``Eliza`` per conversation and answers utterances in order."""
+
+    def __init__(self, seed: Any = None, rules: Union[str, Rulebook, None] = None):
+        self.seed = seed
+        self.rulebook = load_rulebook(rules) if isinstance(rules, str) else rules
+        self.conversations: Dict[str, Eliza] = {}
+
+    def respond(self, conversation_id: str, turn: int, text: str) -> Dict[str, Any]:
+        eliza = self.conversations.get(conversation_id)
+        if eliza is None:
+            seed = None if self.seed is None else f"{self.seed}:{conversation_id}"
+            eliza = self.conversations[conversation_id] = Eliza(self.rulebook, seed=seed)
+        response = eliza.respond(text)
+        # Only the context matters for later turns; drop the history so
+        # memory stays proportional to the number of conversations
+        eliza.state.history.clear()
+        return {'conversation_id': conversation_id, 'turn': turn,
+                'text': text, 'response': response}
+
+
+def _worker(inbox, outbox, seed: Any, rules: Union[str, Rulebook, None]) -> None:
+    replayer = _Replayer(seed, rules)
+    for chunk in iter(inbox.get, None):
+        outbox.put([replayer.respond(*utterance) for utterance in chunk])
+    outbox.put(None)
+
+
+def replay(utterances: Iterable[Utterance],
+           workers: int = 1,
+           seed: Any = None,
+           chunk_size: int = 256,
+           rules: Union[str, Rulebook, None] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Replay utterances through ELIZA, optionally across worker processes.
+
+    Args:
+        utterances: ``(conversation_id, turn, text)`` tuples, e.g. from
+            ``read_utterances``
+        workers: Number of worker processes; 1 replays in this process
+        seed: Seed for reproducible responses, or None
+        chunk_size: Utterances sent to a worker per message
+        rules: JSON rules file to respond with instead of the built-in
+            rules, or a loaded ``Rulebook``; a file is loaded by each worker
+
+    Yields:
+        Result records. With several workers, conversations are interleaved
+        but each conversation's turns are yielded in order.
+    """
+    if workers <= 1:
+        replayer = _Replayer(seed, rules)
+        for utterance in utterances:
+            yield replayer.respond(*utterance)
+        return
+
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue(maxsize=64) for _ in range(workers)]
+    outbox = context.Queue(maxsize=64 * workers)
+    processes = [context.Process(target=_worker, args=(inbox, outbox, seed, rules), daemon=True)
+                 for inbox in inboxes]
+    for process in processes:
+        process.start()
+
+    errors: List[BaseException] = []
+
+    def feed():
+        pending: List[List[Utterance]] = [[] for _ in range(workers)]
+        try:
+            for utterance in utterances:
+                shard = zlib.crc32(utterance[0].encode('utf-8')) % workers
+                pending[shard].append(utterance)
+                if len(pending[shard]) >= chunk_size:
+                    inboxes[shard].put(pending[shard])
+                    pending[shard] = []
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            for inbox, chunk in zip(inboxes, pending):
+                if chunk and not errors:
+                    inbox.put(chunk)
+                inbox.put(None)
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    try:
+        finished = 0
+        while finished < workers:
+            try:
+                chunk = outbox.get(timeout=1.0)
+            except queue.Empty:
+                if any(p.exitcode not in (None, 0) for p in processes):
+                    raise RuntimeError("A batch worker process died unexpectedly")
+                continue
+            if chunk is None:
+                finished += 1
+                continue
+            yield from chunk
+        feeder.join()
+        if errors:
+            raise errors[0]
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+
+def run_batch(source: TextIO, sink: TextIO, workers: int = 1,
+              seed: Optional[Any] = None, rules: Union[str, Rulebook, None] = None) -> int:
+    """
+    Stream utterances from ``source`` and write JSON Lines results to ``sink``.
+
+    ``rules`` is a JSON rules file or a ``Rulebook`` used instead of the
+    built-in rules.
+
+    Returns:
+        Number of utterances replayed
+    """
+    count = 0
+    for record in replay(read_utterances(source), workers=workers, seed=seed,
+                         rules=rules):
+        sink.write(json.dumps(record, ensure_ascii=False) + '\n')
+        count += 1
+    sink.flush()
+    return count
@@ -1,10 +1,17 @@
 """
 Command-line interface for the ELIZA chatbot.
+
+The chatbot is imported only once the arguments are parsed, and each
+subcommand imports only what it runs, so starting the CLI stays fast.
 """
 
 import argparse
+import atexit
 import sys
-from .core.chatbot import Eliza
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .core.rulebook import Rulebook
 
 def main():
     """
@@ -17,11 +24,54 @@ def main():
     parser.add_argument('--debug', 
                        action='store_true',
                        help='Enable debug output')
+    parser.add_argument('--rules',
+                       help='JSON rules file to converse with instead of the built-in rules')
+    parser.add_argument('--stats',
+                       action='store_true',
+                       help='Print per-stage timings and rule statistics of conversations run in this process to stderr on exit')
+    
+    subparsers = parser.add_subparsers(dest='command')
+    batch_parser = subparsers.add_parser(
+        'batch', help='Replay utterances from a file or stdin and write JSON Lines results')
+    batch_parser.add_argument('--input', '-i',
+                              help='Input file of JSON Lines or plain text (default: stdin)')
+    batch_parser.add_argument('--output', '-o',
+                              help='Output JSON Lines file (default: stdout)')
+    batch_parser.add_argument('--workers', '-w', type=int, default=1,
+                              help='Number of worker processes')
+    batch_parser.add_argument('--seed', type=int,
+                              help='Seed making responses reproducible between runs')
+    export_parser = subparsers.add_parser(
+        'export-rules', help='Write the built-in rules as a JSON rules file to edit')
+    export_parser.add_argument('output', help='Rules file to write')
+    compile_parser = subparsers.add_parser(
+        'compile-rules', help='Validate a rules file and build its compiled cache')
+    compile_parser.add_argument('rules', help='Rules file to compile')
     
     args = parser.parse_args()
+    if args.stats and args.command == 'batch' and args.workers > 1:
+        parser.error("--stats cannot be combined with batch --workers > 1: "
+                     "worker processes keep their own statistics")
+    
+    if args.command in ('export-rules', 'compile-rules'):
+        run_rules_command(args)
+        return
+    
+    from .core.chatbot import Eliza
+    from .core.metrics import default_metrics
+    from .core.rulebook import default_rulebook
+    
+    rulebook = load_rules_or_exit(args.rules) if args.rules else default_rulebook()
+    if args.stats:
+        default_metrics().enable()
+        atexit.register(print_stats, rulebook)
+    
+    if args.command == 'batch':
+        run_batch_command(args, rulebook)
+        return
     
     # Initialize ELIZA
-    eliza = Eliza()
+    eliza = Eliza(rulebook)
     print("ELIZA: Hello! I'm here to listen and support you. How are you feeling today?")
     
     try:
@@ -49,5 +99,62 @@ def main():
             print("An error occurred. Please try again.", file=sys.stderr)
         sys.exit(1)
 
+def print_stats(rulebook: 'Rulebook'):
+    """Print the statistics collected by ``--stats`` to stderr."""
+    from .core.metrics import default_metrics
+    
+    print(default_metrics().summary(), file=sys.stderr)
+    cache = rulebook.cache
+    print(f"response cache: {len(cache)} entries, {cache.hit_rate:.1%} hit rate, "
+          f"~{cache.stats()['memory_bytes'] / 1024:.0f} KiB", file=sys.stderr)
+
+def load_rules_or_exit(path: str) -> 'Rulebook':
+    """Load a rules file, exiting with its error if it cannot be loaded."""
+    from .core.rulefile import load_rulebook
+    
+    try:
+        return load_rulebook(path)
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot load rules from {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def run_rules_command(args):
+    """Run ``eliza export-rules`` or ``eliza compile-rules``."""
+    from .core.response_patterns import DEFAULT_PATTERNS
+    from .core.rulefile import default_cache_path, dump_rules
+    
+    if args.command == 'export-rules':
+        dump_rules(DEFAULT_PATTERNS, args.output)
+        print(f"Wrote {len(DEFAULT_PATTERNS)} rules to {args.output}")
+    else:
+        rulebook = load_rules_or_exit(args.rules)
+        print(f"Compiled {len(rulebook)} rules to {default_cache_path(args.rules)}")
+
+def run_batch_command(args, rulebook: 'Rulebook'):
+    """
+    Run ``eliza batch``: replay utterances and stream the responses.
+
+    Replaying in this process uses ``rulebook``, so ``--stats`` reports
+    its cache; worker processes load the ``--rules`` file themselves.
+    """
+    from .batch import run_batch
+    
+    try:
+        source = open(args.input, 'r', encoding='utf-8') if args.input else sys.stdin
+    except FileNotFoundError:
+        print(f"Error: {args.input} not found.", file=sys.stderr)
+        sys.exit(1)
+    sink = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        rules = rulebook if args.workers <= 1 else args.rules
+        count = run_batch(source, sink, workers=args.workers, seed=args.seed, rules=rules)
+    finally:
+        if args.input:
+            source.close()
+        if args.output:
+            sink.close()
+    if args.debug:
+        print(f"Replayed {count} utterances", file=sys.stderr)
+
 if __name__ == '__main__':
     main()
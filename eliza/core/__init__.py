@@ -2,7 +2,28 @@
 Core ELIZA chatbot functionality.
 """
 
-from .chatbot import Eliza
-from .response_patterns import ResponsePattern
+from typing import TYPE_CHECKING
 
-__all__ = ['Eliza', 'ResponsePattern']
+from .._lazy import lazy_exports
+
+__all__ = ['Eliza', 'Conversation', 'ResponsePattern', 'Rulebook',
+           'default_rulebook', 'RuleFile', 'load_rulebook', 'SessionManager']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'Eliza': '.chatbot',
+    'Conversation': '.conversation',
+    'ResponsePattern': '.response_patterns',
+    'Rulebook': '.rulebook',
+    'default_rulebook': '.rulebook',
+    'RuleFile': '.rulefile',
+    'load_rulebook': '.rulefile',
+    'SessionManager': '.sessions',
+})
+
+if TYPE_CHECKING:
+    from .chatbot import Eliza
+    from .conversation import Conversation
+    from .response_patterns import ResponsePattern
+    from .rulebook import Rulebook, default_rulebook
+    from .rulefile import RuleFile, load_rulebook
+    from .sessions import SessionManager
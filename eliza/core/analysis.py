@@ -0,0 +1,46 @@
+"""
+Tokenize-once analysis of user input.
+
+The functions here analyze a single message with ``default_tracker()``:
+one ``\\w+`` tokenization followed by a dictionary lookup per word in the
+keyword index built from ``EMOTION_PATTERNS`` and ``TOPIC_PATTERNS``. The
+same tokens are what ``PatternMatcher`` matches on, so ``Eliza`` passes
+them on instead of tokenizing again.
+"""
+
+from typing import List, Optional
+
+from .context import Analysis, default_tracker
+from .matcher import WORD_PATTERN
+
+
+def analyze(text: str) -> Analysis:
+    """Analyze ``text`` with ``default_tracker()``."""
+    return default_tracker().analyze(text)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase ``text`` and reduce it to its words separated by single spaces.
+
+    Example:
+        >>> normalize_text("  I'm SO tired!! ")
+        'i m so tired'
+    """
+    return ' '.join(WORD_PATTERN.findall(text.lower()))
+
+
+def extract_keywords(text: str) -> List[str]:
+    """Return the emotion and topic keywords of ``text`` in order of first appearance."""
+    return list(analyze(text).keywords)
+
+
+def detect_emotion(text: str) -> Optional[str]:
+    """
+    Return the strongest emotion ``text`` expresses, or None.
+
+    Example:
+        >>> detect_emotion("I'm feeling really anxious about this")
+        'anxious'
+    """
+    return analyze(text).emotion
@@ -0,0 +1,118 @@
+"""
+Bounded LRU caches for repeated messages.
+
+Many messages repeat verbatim ("hi", "yes", "thanks"), and for a given
+input in a given context the rule that matches and the responses left
+after context filtering are always the same. ``ResponseCache`` remembers
+that selection so a repeated message skips the pattern scan and the
+response filtering; the random choice and formatting still happen on every
+call. ``ContextTracker`` uses the same cache for the analysis of a message,
+which only depends on its text.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# Longer messages rarely repeat and are not cached
+MAX_CACHED_TEXT = 256
+
+
+class ResponseCache:
+    """
+    Thread-safe least-recently-used mapping with hit and memory statistics.
+
+    Args:
+        maxsize: Most entries kept; 0 disables the cache
+
+    Attributes:
+        hits (int): Lookups that found an entry
+        misses (int): Lookups that did not
+        evictions (int): Entries dropped to make room
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self._memory = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the entry for ``key`` and mark it as recently used, or None."""
+        # Lookups take no lock: a dict read and move_to_end are each atomic,
+        # and an entry evicted in between is simply not moved. The hit and
+        # miss counters may then lose an update under concurrent use.
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            pass
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` under ``key``, evicting the least recently used entry if full."""
+        if self.maxsize <= 0:
+            return
+        size = _sizeof(key) + _sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._memory -= self._sizes[key]
+                self._entries.move_to_end(key)
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._memory += size
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._memory -= self._sizes.pop(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry; the statistics are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._memory = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that were hits."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the cache statistics.
+
+        ``memory_bytes`` is an upper estimate: it counts the keys and entries
+        shallowly, including tuples shared with the rules.
+        """
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hit_rate,
+                'memory_bytes': self._memory,
+            }
+
+
+def _sizeof(value: Any) -> int:
+    """Size of ``value`` and, for a tuple, of its items one level down."""
+    size = sys.getsizeof(value)
+    if isinstance(value, tuple):
+        size += sum(sys.getsizeof(item) for item in value)
+    return size
@@ -1,253 +1,205 @@
-import re
+import logging
 import random
-import json
-from datetime import datetime
-from dataclasses import dataclass
-from typing import List, Pattern
+from typing import (TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Match, Optional, Sequence,
+                    Tuple, Union)
+from .context import Analysis, ContextTracker, default_tracker
+from .conversation import Conversation
+from .history import SessionHistory
+from .journal import SessionJournal
+from .metrics import Metrics, StageTimer, default_metrics
+from .response_patterns import ResponsePattern
+from .rulebook import Rulebook, default_rulebook
+from .templates import CHANGES_TOPIC, MENTIONS_FEELINGS, Template
 
-@dataclass
-class ResponsePattern:
-    pattern: Pattern
-    responses: List[str]
-    last_used: str = ""
-    usage_count: int = 0
+if TYPE_CHECKING:
+    from .rulefile import RuleFile
+
+logger = logging.getLogger(__name__)
 
 class Eliza:
-    def __init__(self):
-        self.session_history = []
-        self.context = {
-            "current_emotion": None,
-            "current_topic": None,
-            "mentioned_family": False,
-            "mentioned_feelings": False
-        }
-        
-        self.responses = [
-            ResponsePattern(
-                re.compile(r'.*\b(sad|depressed|unhappy|down)\b.*', re.IGNORECASE),
-                [
-                    "I hear that you're feeling down. Would you like to tell me more about what's been making you feel this way?",
-                    "It sounds like you're going through a difficult time. How long have you been feeling this way?",
-                    "I'm sorry you're feeling this way. What do you think triggered these feelings?"
-                ]
-            ),
-            ResponsePattern(
-                re.compile(r'.*\b(angry|mad|pissed|furious)\b.*', re.IGNORECASE),
-                [
-                    "I can hear the anger in your words. What specifically made you feel this way?",
-                    "Your anger seems very present. When did you start feeling this intense emotion?",
-                    "It's okay to feel angry. Can you tell me more about what's causing these strong feelings?"
-                ]
-            ),
-            ResponsePattern(
-                re.compile(r'.*\b(family|mother|father|sister|brother|parent)\b.*\b(sucks|terrible|awful|bad)\b.*', re.IGNORECASE),
-                [
-                    "It sounds like you're having some difficult feelings about your family. Could you tell me more about what's been happening?",
-                    "Family relationships can be really challenging. What aspects of your family situation are most difficult for you?",
-                    "I can hear that you're struggling with your family. How long has this been affecting you?"
-                ]
-            ),
-            ResponsePattern(
-                re.compile(r'.*\b(feel|feeling|felt)\b.*', re.IGNORECASE),
-                [
-                    "Thank you for sharing your feelings with me. Could you tell me more about what led to these emotions?",
-                    "It's important to acknowledge our feelings. How do these emotions affect your daily life?",
-                    "I appreciate you opening up about your feelings. What do you think triggered these emotions?"
-                ]
-            ),
-            ResponsePattern(
-                re.compile(r'I need (.*)', re.IGNORECASE),
-                [
-                    "I understand that you need {}. Could you tell me more about why this is important to you?",
-                    "What makes you feel that you need {} right now?",
-                    "How long have you felt that you need {}?"
-                ]
-            ),
-            ResponsePattern(
-                re.compile(r'.*\b(anxious|worried|scared|afraid)\b.*', re.IGNORECASE),
-                [
-                    "Anxiety can be really overwhelming. What specifically has been causing you to feel this way?",
-                    "It's natural to feel anxious sometimes. Can you tell me more about what's worrying you?",
-                    "I hear that you're feeling anxious. When did these feelings start?"
-                ]
-            ),
-            ResponsePattern(
-                re.compile(r'.*\b(lonely|alone|isolated)\b.*', re.IGNORECASE),
-                [
-                    "Feeling lonely can be really difficult. How long have you been feeling this way?",
-                    "I hear that you're feeling isolated. What do you think has contributed to these feelings?",
-                    "It must be hard feeling so alone. Have you felt able to reach out to anyone about this?"
-                ]
-            ),
-            ResponsePattern(
-                re.compile(r'Hello|Hi|Hey', re.IGNORECASE),
-                [
-                    "Hello! I'm here to listen and support you. How are you feeling today?",
-                    "Hi there! Thank you for reaching out. What's been on your mind lately?",
-                    "Hello! I'm here to help. Would you like to tell me what brings you here today?"
-                ]
-            ),
-            ResponsePattern(
-                re.compile(r'Yes', re.IGNORECASE),
-                [
-                    "I appreciate you confirming that. Could you elaborate more on your thoughts?",
-                    "Thank you for being open. Would you like to tell me more about that?",
-                    "I see. What other thoughts or feelings come up for you about this?"
-                ]
-            ),
-            ResponsePattern(
-                re.compile(r'No', re.IGNORECASE),
-                [
-                    "I understand that you don't agree. Could you tell me more about your perspective?",
-                    "That's completely fine. What are your thoughts on this?",
-                    "I appreciate your honesty. What makes you feel that way?"
-                ]
-            ),
-            ResponsePattern(
-                re.compile(r'.*\b(help|support)\b.*', re.IGNORECASE),
-                [
-                    "I'm here to support you. What kind of help would be most useful right now?",
-                    "I want to help you in the best way I can. Could you tell me more about what you need?",
-                    "You're taking a positive step by asking for help. What's been the hardest part?"
-                ]
-            ),
-            ResponsePattern(
-                re.compile(r'.*\b(thank|thanks)\b.*', re.IGNORECASE),
-                [
-                    "You're welcome. I'm here to listen and support you.",
-                    "I appreciate you sharing your thoughts and feelings with me.",
-                    "I'm glad I could help. Is there anything else you'd like to discuss?"
-                ]
-            ),
-            ResponsePattern(
-                re.compile(r'(.*)\?', re.IGNORECASE),
-                [
-                    "That's a thoughtful question. What are your own thoughts about this?",
-                    "I sense this is something important to you. What makes you ask about this?",
-                    "This seems to be weighing on your mind. What led you to this question?"
-                ]
-            ),
-            ResponsePattern(
-                re.compile(r'quit|goodbye|bye', re.IGNORECASE),
-                [
-                    "Thank you for sharing with me today. Take care of yourself.",
-                    "I appreciate you opening up to me. Remember that it's okay to reach out for support when you need it.",
-                    "Thank you for trusting me with your thoughts and feelings. Take care, and feel free to return anytime."
-                ]
-            ),
-            ResponsePattern(
-                re.compile(r'(.*)', re.IGNORECASE),
-                [
-                    "I'm listening. Could you tell me more about that?",
-                    "That sounds important to you. Could you elaborate on what you mean?",
-                    "I'd like to understand better. Could you share more about your experience?",
-                    "Your feelings are valid. Would you like to explore this further?",
-                    "Thank you for sharing that. How does this situation affect you?"
-                ]
-            )
-        ]
+    """
+    A single ELIZA conversation.
+
+    The compiled rules come from a shared, read-only ``Rulebook``; only the
+    ``Conversation`` state is created per instance, so constructing an
+    ``Eliza`` is cheap.
+
+    Args:
+        rulebook: Rules to respond with, or a ``RuleFile`` whose current
+            rules are read once per ``respond`` call; defaults to the
+            process-wide ``default_rulebook()``
+        seed: Seed for a private random generator, making the choice of
+            response reproducible; the shared ``random`` module is used if None
+        tracker: Emotion and topic tracking settings; defaults to the
+            process-wide ``default_tracker()``
+        history: Store for the conversation's turns, e.g. a bounded
+            ``SessionHistory``; unbounded and in memory if omitted
+        metrics: Registry recording per-stage timings and rule hits when
+            enabled; defaults to the process-wide ``default_metrics()``
+    """
+
+    __slots__ = ('rulebook', 'tracker', 'metrics', 'state', 'rng')
+
+    def __init__(self, rulebook: Union[Rulebook, 'RuleFile', None] = None, seed: Any = None,
+                 tracker: Optional[ContextTracker] = None,
+                 history: Optional[SessionHistory] = None,
+                 metrics: Optional[Metrics] = None):
+        self.rulebook = rulebook if rulebook is not None else default_rulebook()
+        self.tracker = tracker if tracker is not None else default_tracker()
+        self.metrics = metrics if metrics is not None else default_metrics()
+        self.state = Conversation(history)
+        self.rng = random.Random(seed) if seed is not None else random
+
+    @property
+    def responses(self) -> Tuple[ResponsePattern, ...]:
+        """The response patterns, in priority order."""
+        return self.rulebook.current.patterns
+
+    @property
+    def session_history(self) -> List[Dict[str, Any]]:
+        """Copy of the history entries available in this conversation."""
+        return self.state.history.to_list()
+
+    @property
+    def context(self) -> Dict[str, Any]:
+        """Snapshot of the conversation context flags."""
+        return self.state.context
 
     def respond(self, user_input: str) -> str:
         """Generate a response to user input with context awareness."""
+        metrics = self.metrics
+        timer = StageTimer() if metrics.enabled else None
+        # Read once, so a rules reload never changes the rules mid-call
+        rulebook = self.rulebook.current
         try:
-            # Update context based on user input
-            self._update_context(user_input.lower())
+            # Tokenize once for both context tracking and matching
+            analysis = self.tracker.analyze(user_input)
+            self._update_context(analysis)
+            if timer:
+                timer.lap('context')
             
             # Record user input in session history
-            self.session_history.append({
-                "timestamp": datetime.now().isoformat(),
-                "speaker": "user",
-                "text": user_input
-            })
+            self.state.history.append("user", user_input)
+            if timer:
+                timer.lap('history')
 
-            # Generate response
-            for pattern in self.responses:
-                match = pattern.pattern.match(user_input)
-                if match:
-                    groups = match.groups()
-                    
-                    # Filter responses based on context
-                    available_responses = self._filter_responses_by_context(pattern.responses)
-                    if not available_responses:
-                        available_responses = pattern.responses
-                    
-                    response = random.choice(available_responses)
-                    pattern.last_used = response
-                    
-                    try:
-                        if groups:
-                            final_response = response.format(*groups)
-                        else:
-                            final_response = response
-                    except (IndexError, KeyError):
-                        final_response = self._get_contextual_fallback_response()
-                    
-                    # Record ELIZA's response
-                    self.session_history.append({
-                        "timestamp": datetime.now().isoformat(),
-                        "speaker": "eliza",
-                        "text": final_response
-                    })
-                    
-                    return final_response
-            
-            # If no pattern matches, use contextual default response
-            default_response = self._get_contextual_fallback_response()
-            self.session_history.append({
-                "timestamp": datetime.now().isoformat(),
-                "speaker": "eliza",
-                "text": default_response
-            })
-            return default_response
+            # Select the rule and its context-filtered responses
+            selection = self._select(rulebook, user_input, analysis, timer)
+            if selection:
+                rule_index, match, candidates = selection
+                pattern = rulebook.patterns[rule_index]
+                groups = match.groups()
+                
+                template = self.rng.choice(candidates)
+                self.state.record_usage(rule_index, template.text)
+                
+                fallback = False
+                try:
+                    if groups:
+                        final_response = template.render(groups)
+                    else:
+                        final_response = template.text
+                except (IndexError, KeyError):
+                    final_response = self._get_contextual_fallback_response()
+                    fallback = True
+            else:
+                # If no pattern matches, use contextual default response
+                pattern = None
+                final_response = self._get_contextual_fallback_response()
+                fallback = True
+            if timer:
+                timer.lap('format')
+                
+            # Record ELIZA's response
+            self.state.history.append("eliza", final_response)
+            if timer:
+                timer.lap('history')
+                metrics.record(timer, pattern and pattern.pattern.pattern, fallback)
+            return final_response
             
-        except Exception as e:
-            print(f"Error in respond method: {e}")
+        except Exception:
+            logger.exception("Error in respond method")
+            if timer:
+                metrics.record_error()
             return "I want to understand better. Could you rephrase that?"
 
-    def _update_context(self, user_input: str):
-        """Update conversation context based on user input."""
-        # Track emotions
-        if any(word in user_input for word in ['sad', 'depressed', 'unhappy', 'down']):
-            self.context['current_emotion'] = 'sad'
-        elif any(word in user_input for word in ['angry', 'mad', 'pissed', 'furious']):
-            self.context['current_emotion'] = 'angry'
-        elif any(word in user_input for word in ['anxious', 'worried', 'scared']):
-            self.context['current_emotion'] = 'anxious'
-        
-        # Track topics
-        if any(word in user_input for word in ['family', 'mother', 'father', 'sister', 'brother']):
-            self.context['current_topic'] = 'family'
-            self.context['mentioned_family'] = True
-        
-        if 'feel' in user_input:
-            self.context['mentioned_feelings'] = True
+    def respond_batch(self, utterances: Iterable[str]) -> Iterator[str]:
+        """
+        Respond to a sequence of utterances from this conversation, in order.
 
-    def _filter_responses_by_context(self, responses: List[str]) -> List[str]:
-        """Filter responses based on current context."""
-        if not self.context['current_emotion'] and not self.context['current_topic']:
-            return responses
-            
-        filtered = []
-        for response in responses:
-            # Avoid asking about feelings if already discussing them
-            if self.context['mentioned_feelings'] and 'feel' in response.lower():
-                continue
-            # Avoid changing topic if currently discussing something important
-            if self.context['current_topic'] and 'change focus' in response.lower():
-                continue
-            filtered.append(response)
-            
-        return filtered or responses
+        Args:
+            utterances: User inputs, e.g. lines streamed from a transcript
+
+        Yields:
+            ELIZA's response to each utterance
+        """
+        for user_input in utterances:
+            yield self.respond(user_input)
+
+    def _update_context(self, analysis: Analysis):
+        """Update conversation context from the analysis of the user input."""
+        self.tracker.update(self.state, analysis)
+
+    def _select(self, rulebook: Rulebook, user_input: str, analysis: Analysis,
+                timer: Optional[StageTimer]) -> Optional[Tuple[int, Match, Sequence[Template]]]:
+        """
+        Find the matching rule and the responses the context allows.
+
+        The rulebook caches the rule matched by each input. On a hit only
+        that rule's regex runs again, to capture groups from this exact
+        input.
+
+        Returns:
+            ``(rule_index, match, candidates)``, or None if no rule matches
+        """
+        key = rulebook.cache_key(user_input)
+        rule_index = rulebook.cache.get(key) if key is not None else None
+        match = None
+        if rule_index is not None and rule_index >= 0:
+            match = rulebook.patterns[rule_index].pattern.match(user_input)
+        if rule_index is None or rule_index >= 0 and match is None:
+            # Not cached, or (never while cache keys are sound) no longer matching
+            matched = rulebook.match(user_input, analysis.tokens)
+            if key is not None:
+                rulebook.cache.put(key, matched[0] if matched else -1)
+            rule_index, match = matched if matched else (-1, None)
+        if timer:
+            timer.lap('match')
+        if match is None:
+            return None
+        candidates = rulebook.candidates[rule_index][self._context_mask()]
+        if timer:
+            timer.lap('filter')
+        return rule_index, match, candidates
+
+    def _context_mask(self) -> int:
+        """
+        Template tags the current context rules out.
+
+        While an emotion or topic is active, responses asking about feelings
+        are avoided once feelings have been mentioned, and responses changing
+        the subject are avoided while a topic is being discussed. The emotion
+        and topic come from the decaying weights kept by the tracker, so
+        these restrictions lift once a subject has faded.
+        """
+        state = self.state
+        mask = 0
+        if state.current_topic:
+            mask |= CHANGES_TOPIC
+        if state.mentioned_feelings and (state.current_emotion or state.current_topic):
+            mask |= MENTIONS_FEELINGS
+        return mask
 
     def _get_contextual_fallback_response(self) -> str:
         """Generate a context-aware fallback response."""
-        if self.context['current_emotion'] == 'sad':
+        state = self.state
+        if state.current_emotion == 'sad':
             return "I hear that you're going through a difficult time. Would you like to tell me more about what's troubling you?"
-        elif self.context['current_emotion'] == 'angry':
+        elif state.current_emotion == 'angry':
             return "I can sense that this is really frustrating for you. Could you help me understand what's making you feel this way?"
-        elif self.context['current_emotion'] == 'anxious':
+        elif state.current_emotion == 'anxious':
             return "It sounds like you're dealing with a lot of anxiety. What do you think is contributing to these feelings?"
-        elif self.context['current_topic'] == 'family':
+        elif state.current_topic == 'family':
             return "Family situations can be complex. How are you coping with these challenges?"
         else:
             return "I'm here to listen. Could you tell me more about what's on your mind?"
@@ -256,6 +208,26 @@ class Eliza:
         """Save the current session history to a file."""
         try:
             with open(filepath, 'w') as f:
-                json.dump(self.session_history, f, indent=2)
+                self.state.history.write_json(f, indent=2)
         except Exception as e:
             print(f"Error saving session: {e}")
+
+    def journal_session(self, journal: SessionJournal, session_id: str) -> int:
+        """
+        Append the history entries not yet journaled to ``journal``.
+
+        Unlike ``save_session``, the cost only depends on the number of new
+        entries, so this can be called after every message.
+
+        Args:
+            journal: Journal to append to
+            session_id: ID to record the entries under
+
+        Returns:
+            Number of entries appended
+        """
+        history = self.state.history
+        start = max(self.state.journaled, history.first)
+        appended = journal.extend(session_id, start, history.iter_from(start))
+        self.state.journaled = history.appended
+        return appended
@@ -0,0 +1,180 @@
+"""
+Weighted, decaying emotion and topic tracking across conversation turns.
+
+Every keyword of ``EMOTION_PATTERNS`` and ``TOPIC_PATTERNS`` is compiled
+into one dictionary from word to the signals it carries, so analyzing a
+message is one ``\\w+`` tokenization and one dictionary lookup per token,
+however many categories are configured. A conversation keeps a weight per
+emotion and per topic: each turn the weights decay by a constant factor
+and the message's signals are added, so the current emotion and topic are
+those mentioned most strongly and most recently, and fade when the
+conversation moves on.
+"""
+
+import functools
+import re
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from .cache import MAX_CACHED_TEXT, ResponseCache
+from .conversation import Conversation
+from .matcher import WORD_PATTERN, keyword_groups
+from .response_patterns import EMOTION_PATTERNS, TOPIC_PATTERNS
+
+EMOTION = 'emotion'
+TOPIC = 'topic'
+
+
+class Signal(NamedTuple):
+    """Evidence a keyword gives for one category."""
+    kind: str
+    category: str
+    weight: float
+
+
+class Analysis(NamedTuple):
+    """
+    Result of one pass over a message.
+
+    Attributes:
+        tokens: Lowercase ``\\w+`` tokens, as ``PatternMatcher`` uses them
+        keywords: Emotion and topic keywords in order of first appearance
+        emotions: Detected emotions, strongest first, ties in priority order
+        topics: Detected topics, strongest first, ties in priority order
+        emotion_scores: Summed signal weight of each detected emotion
+        topic_scores: Summed signal weight of each detected topic
+        mentions_feelings: Whether a word starting with "feel" occurs
+    """
+    tokens: List[str]
+    keywords: List[str]
+    emotions: Tuple[str, ...]
+    topics: Tuple[str, ...]
+    emotion_scores: Dict[str, float]
+    topic_scores: Dict[str, float]
+    mentions_feelings: bool
+
+    @property
+    def emotion(self) -> Optional[str]:
+        """The strongest emotion, or None."""
+        return self.emotions[0] if self.emotions else None
+
+    @property
+    def topic(self) -> Optional[str]:
+        """The strongest topic, or None."""
+        return self.topics[0] if self.topics else None
+
+
+class ContextTracker:
+    """
+    Read-only keyword tables and decay settings shared by all conversations.
+
+    The per-conversation weights live in ``Conversation``.
+
+    Args:
+        emotions: Keyword rule of each emotion, in priority order
+        topics: Keyword rule of each topic, in priority order
+        decay: Factor applied to every weight at each turn
+        threshold: Weight below which a category is forgotten
+        weights: Signal weight of particular keywords; 1.0 otherwise
+        cache_size: Most analyses of repeated messages kept; 0 disables
+            the cache
+
+    Attributes:
+        signals (Dict[str, Tuple[Signal, ...]]): Keyword to the signals it
+            carries
+        cache (ResponseCache): Analyses keyed by message text; they are
+            shared, so their lists must not be modified
+    """
+
+    def __init__(self, emotions: Mapping[str, str] = EMOTION_PATTERNS,
+                 topics: Mapping[str, str] = TOPIC_PATTERNS,
+                 decay: float = 0.7, threshold: float = 0.25,
+                 weights: Optional[Mapping[str, float]] = None,
+                 cache_size: int = 4096):
+        if not 0 <= decay < 1:
+            raise ValueError("decay must be in [0, 1)")
+        self.decay = decay
+        self.threshold = threshold
+        self.cache = ResponseCache(cache_size)
+        self.signals: Dict[str, Tuple[Signal, ...]] = {}
+        self._ranks = {EMOTION: {}, TOPIC: {}}
+        weights = weights or {}
+        for kind, patterns in ((EMOTION, emotions), (TOPIC, topics)):
+            ranks = self._ranks[kind]
+            for category, pattern in patterns.items():
+                ranks[category] = len(ranks)
+                groups = keyword_groups(re.compile(pattern, re.IGNORECASE))
+                if groups is None:
+                    raise ValueError(f"Pattern of {kind} {category!r} is not a keyword rule")
+                for word in {word for group in groups for word in group}:
+                    signal = Signal(kind, category, float(weights.get(word, 1.0)))
+                    self.signals[word] = self.signals.get(word, ()) + (signal,)
+
+    def analyze(self, text: str) -> Analysis:
+        """Tokenize ``text`` once and collect its emotion and topic signals."""
+        if len(text) > MAX_CACHED_TEXT:
+            return self._analyze(text)
+        analysis = self.cache.get(text)
+        if analysis is None:
+            analysis = self._analyze(text)
+            self.cache.put(text, analysis)
+        return analysis
+
+    def _analyze(self, text: str) -> Analysis:
+        tokens = WORD_PATTERN.findall(text.lower())
+        scores = {EMOTION: {}, TOPIC: {}}
+        keywords = {}
+        signals = self.signals
+        for token in tokens:
+            carried = signals.get(token)
+            if carried:
+                keywords[token] = None
+                for kind, category, weight in carried:
+                    kind_scores = scores[kind]
+                    kind_scores[category] = kind_scores.get(category, 0.0) + weight
+        return Analysis(
+            tokens=tokens,
+            keywords=list(keywords),
+            emotions=self._ranked(EMOTION, scores[EMOTION]),
+            topics=self._ranked(TOPIC, scores[TOPIC]),
+            emotion_scores=scores[EMOTION],
+            topic_scores=scores[TOPIC],
+            mentions_feelings=any(token.startswith('feel') for token in tokens),
+        )
+
+    def update(self, state: Conversation, analysis: Analysis) -> None:
+        """
+        Fold one message into a conversation's context.
+
+        Decays the stored weights, adds the message's signals, forgets
+        categories below ``threshold`` and sets ``current_emotion`` and
+        ``current_topic`` to the heaviest remaining ones.
+        """
+        state.emotion_weights = self._fold(state.emotion_weights, analysis.emotion_scores)
+        state.topic_weights = self._fold(state.topic_weights, analysis.topic_scores)
+        state.current_emotion = self._dominant(EMOTION, state.emotion_weights)
+        state.current_topic = self._dominant(TOPIC, state.topic_weights)
+        if 'family' in analysis.topic_scores:
+            state.mentioned_family = True
+        if analysis.mentions_feelings:
+            state.mentioned_feelings = True
+
+    def _fold(self, weights: Dict[str, float], scores: Dict[str, float]) -> Dict[str, float]:
+        decay, threshold = self.decay, self.threshold
+        folded = {category: weight * decay for category, weight in weights.items()}
+        for category, score in scores.items():
+            folded[category] = folded.get(category, 0.0) + score
+        return {category: weight for category, weight in folded.items() if weight >= threshold}
+
+    def _ranked(self, kind: str, scores: Dict[str, float]) -> Tuple[str, ...]:
+        ranks = self._ranks[kind]
+        return tuple(sorted(scores, key=lambda category: (-scores[category], ranks[category])))
+
+    def _dominant(self, kind: str, weights: Dict[str, float]) -> Optional[str]:
+        ranked = self._ranked(kind, weights)
+        return ranked[0] if ranked else None
+
+
+@functools.lru_cache(maxsize=None)
+def default_tracker() -> ContextTracker:
+    """Return the process-wide tracker built from the default patterns."""
+    return ContextTracker()
@@ -0,0 +1,95 @@
+"""
+Per-conversation state for the ELIZA chatbot.
+"""
+
+from typing import Any, Dict, Optional
+
+from .history import SessionHistory
+
+
+class Conversation:
+    """
+    Mutable state of a single conversation.
+
+    Everything that differs between two users lives here; the rules
+    themselves are shared through a ``Rulebook``. The object uses
+    ``__slots__`` so that a fresh conversation takes a few hundred bytes.
+
+    Attributes:
+        current_emotion (Optional[str]): Heaviest tracked emotion
+        current_topic (Optional[str]): Heaviest tracked topic
+        emotion_weights (Dict[str, float]): Decaying weight of each recently
+            mentioned emotion, maintained by ``ContextTracker``
+        topic_weights (Dict[str, float]): Decaying weight of each recently
+            mentioned topic
+        mentioned_family (bool): Whether family has come up
+        mentioned_feelings (bool): Whether the user talked about feelings
+        history (SessionHistory): Turns of the conversation
+        usage_counts (Dict[int, int]): Times each rule (by index) was used
+        last_used (Dict[int, str]): Last response template used per rule
+        journaled (int): Number of history entries already written to a journal
+    """
+
+    __slots__ = ('current_emotion', 'current_topic', 'emotion_weights',
+                 'topic_weights', 'mentioned_family',
+                 'mentioned_feelings', 'history', 'usage_counts', 'last_used',
+                 'journaled')
+
+    def __init__(self, history: Optional[SessionHistory] = None):
+        self.current_emotion: Optional[str] = None
+        self.current_topic: Optional[str] = None
+        self.emotion_weights: Dict[str, float] = {}
+        self.topic_weights: Dict[str, float] = {}
+        self.mentioned_family = False
+        self.mentioned_feelings = False
+        self.history = history if history is not None else SessionHistory()
+        self.usage_counts: Dict[int, int] = {}
+        self.last_used: Dict[int, str] = {}
+        self.journaled = 0
+
+    @property
+    def context(self) -> Dict[str, Any]:
+        """Snapshot of the context flags as a dictionary."""
+        return {
+            "current_emotion": self.current_emotion,
+            "current_topic": self.current_topic,
+            "emotion_weights": dict(self.emotion_weights),
+            "topic_weights": dict(self.topic_weights),
+            "mentioned_family": self.mentioned_family,
+            "mentioned_feelings": self.mentioned_feelings
+        }
+
+    def snapshot(self, tail: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Return the state as JSON-serializable data, for ``restore``.
+
+        Args:
+            tail: Most recent turns of the history to include; every turn
+                in memory if None
+        """
+        return {
+            "context": self.context,
+            "history": self.history.snapshot(tail),
+            "usage_counts": [[rule, count] for rule, count in self.usage_counts.items()],
+            "last_used": [[rule, response] for rule, response in self.last_used.items()],
+            "journaled": self.journaled,
+        }
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        """Replace the state with a ``snapshot``, e.g. one saved by another process."""
+        context = snapshot["context"]
+        self.current_emotion = context["current_emotion"]
+        self.current_topic = context["current_topic"]
+        self.emotion_weights = dict(context["emotion_weights"])
+        self.topic_weights = dict(context["topic_weights"])
+        self.mentioned_family = context["mentioned_family"]
+        self.mentioned_feelings = context["mentioned_feelings"]
+        self.history.restore(snapshot["history"])
+        self.usage_counts = dict(map(tuple, snapshot["usage_counts"]))
+        self.last_used = dict(map(tuple, snapshot["last_used"]))
+        self.journaled = snapshot["journaled"]
+
+    def record_usage(self, rule_index: int, response: str) -> None:
+        """Record that ``response`` was chosen from rule ``rule_index``."""
+        self.usage_counts[rule_index] = self.usage_counts.get(rule_index, 0) + 1
+        self.last_used[rule_index] = response
@@ -0,0 +1,219 @@
+"""
+Compact, bounded session history.
+
+A conversation used to keep its history as a list of dicts with ISO
+timestamp strings, growing by two dicts per exchange for as long as the
+session lived. ``SessionHistory`` stores each turn as a ``__slots__``
+record with a float epoch timestamp and an interned speaker tag, and keeps
+at most ``window`` of them in a ring buffer. Turns pushed out of the window
+are appended to a spill file if one is configured, and dropped otherwise.
+Iteration and export read the spilled turns back, so the exported JSON is
+the same as before; the dict form with its ISO timestamp is only built
+when a turn is read.
+"""
+
+import itertools
+import json
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Union
+
+
+class Turn:
+    """
+    One recorded turn of a conversation.
+
+    Attributes:
+        timestamp (float): Seconds since the epoch
+        speaker (str): ``'user'`` or ``'eliza'``, interned
+        text (str): What was said
+    """
+
+    __slots__ = ('timestamp', 'speaker', 'text')
+
+    def __init__(self, timestamp: float, speaker: str, text: str):
+        self.timestamp = timestamp
+        self.speaker = sys.intern(speaker)
+        self.text = text
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the turn as a history entry with an ISO 8601 local timestamp."""
+        return {
+            "timestamp": datetime.fromtimestamp(self.timestamp).isoformat(),
+            "speaker": self.speaker,
+            "text": self.text
+        }
+
+
+class SessionHistory:
+    """
+    Append-only conversation history with a bounded in-memory window.
+
+    Turns are addressed by their absolute position in the conversation,
+    which does not change when older turns are spilled or dropped.
+
+    Args:
+        window: Most recent turns kept in memory; unbounded if None
+        spill_path: File that turns leaving the window are appended to as
+            JSON Lines; they are discarded if None
+        spill_every: Turns buffered before they are written to the spill file
+
+    Attributes:
+        appended (int): Number of turns recorded so far
+        first (int): Position of the oldest turn still available
+    """
+
+    def __init__(self, window: Optional[int] = None,
+                 spill_path: Optional[Union[str, Path]] = None,
+                 spill_every: int = 64):
+        if window is not None and window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.spill_path = Path(spill_path) if spill_path is not None else None
+        self.spill_every = spill_every
+        self.appended = 0
+        self.first = 0
+        self._turns: deque = deque()
+        self._pending: List[str] = []
+        self._spill_start = self._spill_size()
+
+    def __len__(self) -> int:
+        return self.appended - self.first
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter_from(self.first)
+
+    @property
+    def in_memory(self) -> int:
+        """Number of turns held in memory."""
+        return len(self._turns)
+
+    def append(self, speaker: str, text: str, timestamp: Optional[float] = None) -> Turn:
+        """
+        Record a turn, spilling the oldest one if the window is full.
+
+        Args:
+            speaker: Who spoke
+            text: What was said
+            timestamp: Epoch seconds; the current time if omitted
+
+        Returns:
+            The recorded turn
+        """
+        turn = Turn(time.time() if timestamp is None else timestamp, speaker, text)
+        self._turns.append(turn)
+        self.appended += 1
+        if self.window is not None and len(self._turns) > self.window:
+            self._evict(self._turns.popleft())
+        return turn
+
+    def iter_from(self, start: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the history entries from absolute position ``start`` on.
+
+        Positions before ``first`` are skipped. Spilled turns are read back
+        from the spill file one line at a time.
+        """
+        start = max(start, self.first)
+        memory_start = self.appended - len(self._turns)
+        if start < memory_start:
+            self._flush_spill()
+            with open(self.spill_path, 'r', encoding='utf-8') as f:
+                f.seek(self._spill_start)
+                for position, line in enumerate(f, self.first):
+                    if position >= memory_start:
+                        break
+                    if position >= start:
+                        yield Turn(*json.loads(line)).as_dict()
+            start = memory_start
+        turns = self._turns
+        for i in range(start - memory_start, len(turns)):
+            yield turns[i].as_dict()
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Return all available entries as a list of dicts."""
+        return list(self)
+
+    def write_json(self, out: IO[str], indent: int = 2) -> None:
+        """
+        Write all available entries as a JSON array.
+
+        The output is identical to ``json.dump(self.to_list(), out,
+        indent=indent)`` but entries are encoded one at a time.
+        """
+        pad = ' ' * indent
+        separator = '[\n'
+        for entry in self:
+            encoded = json.dumps(entry, indent=indent)
+            out.write(separator + pad + encoded.replace('\n', '\n' + pad))
+            separator = ',\n'
+        out.write('[]' if separator == '[\n' else '\n]')
+
+    def snapshot(self, tail: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Return the turns held in memory and the turn count as JSON-serializable data.
+
+        Spilled turns stay in the spill file and are not included.
+
+        Args:
+            tail: Most recent turns to include; every turn in memory if None
+        """
+        turns = self._turns
+        start = 0 if tail is None else max(0, len(turns) - tail)
+        return {'appended': self.appended,
+                'turns': [[turn.timestamp, turn.speaker, turn.text]
+                          for turn in itertools.islice(turns, start, None)]}
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Replace the turns in memory with those of a ``snapshot``.
+
+        The window and spill settings of this history are kept; turns that
+        do not fit the window are dropped, and turns the snapshot did not
+        include are no longer available.
+        """
+        self._flush_spill()
+        turns = [Turn(*turn) for turn in snapshot['turns']]
+        if self.window is not None:
+            turns = turns[-self.window:]
+        self._turns = deque(turns)
+        self.appended = snapshot['appended']
+        self.first = self.appended - len(self._turns)
+        self._spill_start = self._spill_size()
+
+    def clear(self) -> None:
+        """Forget every turn, including spilled ones; the spill file is kept."""
+        self._turns.clear()
+        self._pending.clear()
+        self.appended = self.first = 0
+        self._spill_start = self._spill_size()
+
+    def flush(self) -> None:
+        """Write buffered spilled turns to the spill file."""
+        self._flush_spill()
+
+    def _evict(self, turn: Turn) -> None:
+        if self.spill_path is None:
+            self.first += 1
+            return
+        self._pending.append(json.dumps([turn.timestamp, turn.speaker, turn.text],
+                                        ensure_ascii=False) + '\n')
+        if len(self._pending) >= self.spill_every:
+            self._flush_spill()
+
+    def _flush_spill(self) -> None:
+        if not self._pending:
+            return
+        # Opened per batch so that idle sessions hold no file handles
+        with open(self.spill_path, 'a', encoding='utf-8') as f:
+            f.writelines(self._pending)
+        self._pending.clear()
+
+    def _spill_size(self) -> int:
+        try:
+            return self.spill_path.stat().st_size if self.spill_path else 0
+        except FileNotFoundError:
+            return 0
@@ -0,0 +1,250 @@
+"""
+Append-only session persistence for the ELIZA chatbot.
+
+Rather than rewriting a whole session file after every message, turns are
+appended to a JSON Lines journal, one record per turn::
+
+    {"session_id": "...", "index": 3, "timestamp": "...", "speaker": "user", "text": "..."}
+
+Appends are buffered and written (and optionally fsynced) in batches, so the
+cost of persisting a message does not depend on how long the conversation is.
+A background thread writes buffered records at most ``flush_interval``
+seconds after they were appended, even when no more appends come in.
+The journal is compacted -- duplicate turns dropped and each session's turns
+grouped together -- whenever it has grown enough since the last compaction.
+
+Compaction replaces the file, so a journal file has a single writer: a
+``SessionJournal`` holds an exclusive lock on ``<path>.lock`` while it is
+open (on platforms with ``fcntl``), and ``open_journal`` gives processes
+that find it taken a journal file of their own.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class JournalInUse(RuntimeError):
+    """Raised when another open journal is already writing the same file."""
+
+
+def read_journal(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of a journal file in the order they were written.
+
+    A truncated last line (e.g. after a crash mid-write) is skipped.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        return
+
+
+class SessionJournal:
+    """
+    Thread-safe, buffered JSON Lines journal of session turns.
+
+    Args:
+        path: Journal file, created if missing
+        flush_every: Flush once this many records are buffered
+        flush_interval: Seconds after which buffered records are written by
+            a background thread
+        fsync: fsync the file after each (batched) flush
+        compact_ratio: Compact once the file is this many times larger than
+            it was after the last compaction; 0 disables compaction
+        min_compact_bytes: Never compact files smaller than this
+
+    Raises:
+        JournalInUse: If another open journal writes to ``path``
+    """
+
+    def __init__(self,
+                 path: Union[str, Path],
+                 flush_every: int = 64,
+                 flush_interval: float = 1.0,
+                 fsync: bool = True,
+                 compact_ratio: float = 4.0,
+                 min_compact_bytes: int = 1 << 20):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.compact_ratio = compact_ratio
+        self.min_compact_bytes = min_compact_bytes
+        self._buffer: List[str] = []
+        self._lock = threading.RLock()
+        self._last_flush = time.monotonic()
+        self._closed = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._writer_lock = self._lock_writer()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._compacted_size = max(self._file.tell(), min_compact_bytes)
+
+    def __enter__(self) -> 'SessionJournal':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def append(self, session_id: str, index: int, turn: Dict[str, Any]) -> None:
+        """
+        Buffer one turn of a session.
+
+        Args:
+            session_id: ID of the session the turn belongs to
+            index: Position of the turn within the session
+            turn: History entry with ``timestamp``, ``speaker`` and ``text``
+        """
+        self.extend(session_id, index, (turn,))
+
+    def extend(self, session_id: str, offset: int, turns: Iterable[Dict[str, Any]]) -> int:
+        """
+        Buffer consecutive turns of a session starting at position ``offset``.
+
+        Returns:
+            The number of turns buffered
+        """
+        lines = [json.dumps({'session_id': session_id, 'index': offset + i, **turn},
+                            ensure_ascii=False) + '\n'
+                 for i, turn in enumerate(turns)]
+        with self._lock:
+            self._buffer.extend(lines)
+            if (len(self._buffer) >= self.flush_every
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush()
+            elif self._buffer and (self._flusher is None or not self._flusher.is_alive()):
+                # Started on demand, so it also runs in a process forked from this one
+                self._flusher = threading.Thread(target=self._flush_periodically,
+                                                 name='eliza-journal-flush', daemon=True)
+                self._flusher.start()
+        return len(lines)
+
+    def flush(self) -> None:
+        """Write all buffered records to disk."""
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        """Flush and close the journal."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush()
+            self._file.close()
+            self._writer_lock.close()
+            self._closed.set()
+        flusher = self._flusher
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join()
+
+    def sessions(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Replay the journal into per-session histories.
+
+        Returns:
+            Mapping of session ID to its turns, ordered by index, with later
+            records for the same index replacing earlier ones
+        """
+        self.flush()
+        return {session_id: [turns[i] for i in sorted(turns)]
+                for session_id, turns in _replay(read_journal(self.path)).items()}
+
+    def export(self, session_id: str, filepath: Union[str, Path]) -> None:
+        """Write one session as a JSON array, the format of ``Eliza.save_session``."""
+        turns = self.sessions().get(session_id, [])
+        with open(filepath, 'w') as f:
+            json.dump(turns, f, indent=2)
+
+    def compact(self) -> None:
+        """Rewrite the journal without duplicates, grouping each session's turns."""
+        with self._lock:
+            self._flush()
+            sessions = _replay(read_journal(self.path))
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for session_id, turns in sessions.items():
+                    for index in sorted(turns):
+                        f.write(json.dumps({'session_id': session_id, 'index': index,
+                                            **turns[index]}, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self._compacted_size = max(self._file.tell(), self.min_compact_bytes)
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            with self._lock:
+                if self._closed.is_set():
+                    return
+                self._flush()
+
+    def _lock_writer(self):
+        lock_file = open(self.path.with_name(self.path.name + '.lock'), 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                raise JournalInUse(f"{self.path} is already being written by another journal")
+        return lock_file
+
+    def _flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        self._file.write(''.join(self._buffer))
+        self._buffer.clear()
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        if self.compact_ratio and self._file.tell() > self._compacted_size * self.compact_ratio:
+            self.compact()
+
+
+def worker_journal_path(path: Union[str, Path], pid: int) -> str:
+    """Journal file of one process among several sharing ``path``."""
+    root, extension = os.path.splitext(str(path))
+    return f'{root}.{pid}{extension}'
+
+
+def open_journal(path: Union[str, Path], **options) -> SessionJournal:
+    """
+    Open the journal at ``path``, or a journal of this process's own.
+
+    When another process (e.g. another server worker) is already writing
+    ``path``, the journal is opened at ``worker_journal_path(path, pid)``
+    instead, so no two processes ever write the same file.
+
+    Args:
+        path: Preferred journal file
+        **options: Passed to ``SessionJournal``
+    """
+    try:
+        return SessionJournal(path, **options)
+    except JournalInUse:
+        return SessionJournal(worker_journal_path(path, os.getpid()), **options)
+
+
+def _replay(records: Iterable[Dict[str, Any]]) -> Dict[str, Dict[int, Dict[str, Any]]]:
+    """Group records by session and index; later records win."""
+    by_session: Dict[str, Dict[int, Dict[str, Any]]] = {}
+    for record in records:
+        session_id = record.pop('session_id')
+        index = record.pop('index')
+        by_session.setdefault(session_id, {})[index] = record
+    return by_session
@@ -0,0 +1,111 @@
+"""
+Single-pass pattern matching for the ELIZA chatbot.
+
+The default rules are mostly of the form ``.*\\b(sad|unhappy|...)\\b.*``.
+Trying each of them in turn means every rule rescans the whole message
+before the catch-all is reached. ``PatternMatcher`` compiles the keyword
+groups of all such rules into a single word index, tokenizes the input once
+and only runs the regexes of rules whose keywords actually occur. Rules it
+cannot analyse are always tried, so priority order and capture groups are
+exactly those of the linear scan.
+"""
+
+import re
+from typing import Dict, List, Match, Optional, Sequence, Tuple
+
+# Rules of the form ``.*\b(a|b)\b.*`` or ``.*\b(a|b)\b.*\b(c|d)\b.*``
+_KEYWORD_RULE = re.compile(r'(?:\.\*\\b\((\w+(?:\|\w+)*)\)\\b)+\.\*')
+_KEYWORD_GROUP = re.compile(r'\\b\((\w+(?:\|\w+)*)\)\\b')
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def keyword_groups(pattern: re.Pattern) -> Optional[List[Tuple[str, ...]]]:
+    """
+    Extract the keyword groups a pattern requires.
+
+    Args:
+        pattern: Compiled rule pattern
+
+    Returns:
+        One tuple of alternative keywords per ``\\b(...)\\b`` group, or None
+        if the pattern is not a plain keyword rule and must always be tried.
+    """
+    if not pattern.flags & re.IGNORECASE:
+        return None
+    if not _KEYWORD_RULE.fullmatch(pattern.pattern):
+        return None
+    return [tuple(word.lower() for word in group.split('|'))
+            for group in _KEYWORD_GROUP.findall(pattern.pattern)]
+
+
+class PatternMatcher:
+    """
+    First-match-wins matcher over an ordered sequence of response patterns.
+
+    Attributes:
+        patterns (Tuple): The response patterns, in priority order
+    """
+
+    def __init__(self, patterns: Sequence):
+        self.patterns = tuple(patterns)
+        # word -> (bitmask of keyword groups, ids of rules using the word)
+        self._index: Dict[str, Tuple[int, Tuple[int, ...]]] = {}
+        self._masks: List[int] = []
+        self._always: List[int] = []
+
+        group_bit = 1
+        for rule_id, response_pattern in enumerate(self.patterns):
+            groups = keyword_groups(response_pattern.pattern)
+            if groups is None:
+                self._always.append(rule_id)
+                self._masks.append(0)
+                continue
+            mask = 0
+            for group in groups:
+                for word in group:
+                    bits, rule_ids = self._index.get(word, (0, ()))
+                    if rule_id not in rule_ids:
+                        rule_ids += (rule_id,)
+                    self._index[word] = (bits | group_bit, rule_ids)
+                mask |= group_bit
+                group_bit <<= 1
+            self._masks.append(mask)
+
+    def match(self, text: str,
+              tokens: Optional[Sequence[str]] = None) -> Optional[Tuple[int, Match]]:
+        """
+        Find the first pattern matching ``text``.
+
+        Args:
+            text: The user input
+            tokens: ``WORD_PATTERN`` tokens of ``text.lower()``, if already
+                computed, e.g. by ``analyze``
+
+        Returns:
+            A ``(pattern_index, match)`` tuple, or None if nothing matches
+        """
+        # Keywords are compared lowercased, which only agrees with the
+        # regex engine's IGNORECASE folding for ASCII input.
+        if text.isascii():
+            index = self._index
+            present = 0
+            touched = set(self._always)
+            if tokens is None:
+                tokens = WORD_PATTERN.findall(text.lower())
+            for word in tokens:
+                entry = index.get(word)
+                if entry:
+                    present |= entry[0]
+                    touched.update(entry[1])
+            masks = self._masks
+            candidates = sorted(rule_id for rule_id in touched
+                                if present & masks[rule_id] == masks[rule_id])
+        else:
+            candidates = range(len(self.patterns))
+
+        patterns = self.patterns
+        for rule_id in candidates:
+            match = patterns[rule_id].pattern.match(text)
+            if match:
+                return rule_id, match
+        return None
@@ -0,0 +1,233 @@
+"""
+Low-overhead instrumentation of the response pipeline.
+
+``Eliza.respond`` times each of its stages with ``time.perf_counter`` and
+hands the timings to a ``Metrics`` registry once per message, together with
+the rule that answered and whether a fallback was used. The registry keeps
+a fixed-bucket latency histogram per stage, hit counts per response
+pattern and fallback and error counts, and exports them as Prometheus text
+or a plain-text summary.
+
+A disabled registry is never called: ``respond`` checks ``enabled`` once
+per message and then skips every timer, so instrumentation that is off
+costs one attribute lookup and a handful of truth tests.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+# Stages of Eliza.respond, in pipeline order
+STAGES = ('context', 'match', 'filter', 'format', 'history')
+
+# Upper bounds in seconds of the latency buckets: 1us, 2us, 4us, ... ~1s
+LATENCY_BUCKETS = tuple(1e-6 * 2 ** k for k in range(21))
+
+
+class Histogram:
+    """
+    Cumulative-style histogram over fixed bucket bounds.
+
+    Args:
+        bounds: Increasing upper bounds of the buckets; values above the
+            last bound fall in an implicit ``+Inf`` bucket
+
+    Attributes:
+        counts (List[int]): Observations per bucket, ``+Inf`` last
+        count (int): Number of observations
+        sum (float): Sum of the observed values
+    """
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum')
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one value."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate the ``q`` quantile as the upper bound of its bucket.
+
+        Returns:
+            The bound, infinity if it falls in the ``+Inf`` bucket, or NaN
+            if nothing was observed
+        """
+        if not self.count:
+            return float('nan')
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    @property
+    def mean(self) -> float:
+        """Mean of the observed values, or NaN if there are none."""
+        return self.sum / self.count if self.count else float('nan')
+
+
+class StageTimer:
+    """Collects the stage timings of one message for ``Metrics.record``."""
+
+    __slots__ = ('start', 'last', 'timings')
+
+    def __init__(self):
+        self.start = self.last = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+
+    def lap(self, stage: str) -> None:
+        """
+        Close ``stage``, timing it from the end of the previous one.
+
+        Time from several laps of the same stage is added up.
+        """
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + now - self.last
+        self.last = now
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metrics:
+    """
+    Thread-safe registry of response pipeline statistics.
+
+    Args:
+        enabled: Whether conversations using this registry record into it
+
+    Attributes:
+        stages (Dict[str, Histogram]): Latency of each stage, and of the
+            whole ``respond`` call under ``'total'``
+        pattern_hits (Dict[str, int]): Responses produced by each rule,
+            keyed by its regex
+        responses (int): Messages answered
+        fallbacks (int): Messages answered with a contextual fallback
+        errors (int): Messages whose processing raised an exception
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self) -> None:
+        """Start recording."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording; collected data is kept."""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Discard everything recorded so far."""
+        with self._lock:
+            self.stages: Dict[str, Histogram] = {
+                stage: Histogram() for stage in STAGES + ('total',)}
+            self.pattern_hits: Dict[str, int] = {}
+            self.responses = 0
+            self.fallbacks = 0
+            self.errors = 0
+
+    @property
+    def fallback_rate(self) -> float:
+        """Fraction of responses that were fallbacks."""
+        return self.fallbacks / self.responses if self.responses else 0.0
+
+    def record(self, timer: StageTimer, pattern: Optional[str], fallback: bool) -> None:
+        """
+        Record one answered message.
+
+        Args:
+            timer: Stage timings of the message
+            pattern: Regex of the rule that answered, or None
+            fallback: Whether the answer was a contextual fallback
+        """
+        total = time.perf_counter() - timer.start
+        with self._lock:
+            stages = self.stages
+            for stage, seconds in timer.timings.items():
+                stages[stage].observe(seconds)
+            stages['total'].observe(total)
+            if pattern is not None:
+                self.pattern_hits[pattern] = self.pattern_hits.get(pattern, 0) + 1
+            self.responses += 1
+            if fallback:
+                self.fallbacks += 1
+
+    def record_error(self) -> None:
+        """Count a message whose processing raised an exception."""
+        with self._lock:
+            self.errors += 1
+
+    def render_prometheus(self, prefix: str = 'eliza') -> str:
+        """Return the statistics in the Prometheus text exposition format."""
+        lines = [f'# HELP {prefix}_stage_seconds Time spent in each stage of respond',
+                 f'# TYPE {prefix}_stage_seconds histogram']
+        with self._lock:
+            for stage, histogram in self.stages.items():
+                cumulative = 0
+                for bound, count in zip(histogram.bounds + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} '
+                                 f'{cumulative}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {histogram.sum!r}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            lines += [f'# HELP {prefix}_pattern_hits_total Responses produced by each rule',
+                      f'# TYPE {prefix}_pattern_hits_total counter']
+            lines += [f'{prefix}_pattern_hits_total{{pattern="{_escape(pattern)}"}} {hits}'
+                      for pattern, hits in self.pattern_hits.items()]
+            for name, value, help_text in (
+                    ('responses', self.responses, 'Messages answered'),
+                    ('fallbacks', self.fallbacks, 'Messages answered with a fallback'),
+                    ('errors', self.errors, 'Messages that raised an exception')):
+                lines += [f'# HELP {prefix}_{name}_total {help_text}',
+                          f'# TYPE {prefix}_{name}_total counter',
+                          f'{prefix}_{name}_total {value}']
+        return '\n'.join(lines) + '\n'
+
+    def summary(self, top: int = 10) -> str:
+        """Return a human-readable summary of the statistics."""
+        lines = [f"{'stage':<10}{'count':>8}{'mean us':>10}{'p50 us':>10}"
+                 f"{'p95 us':>10}{'p99 us':>10}"]
+        with self._lock:
+            for stage, histogram in self.stages.items():
+                values = [histogram.mean] + [histogram.quantile(q) for q in (0.5, 0.95, 0.99)]
+                lines.append(f"{stage:<10}{histogram.count:>8}"
+                             + ''.join(f"{value * 1e6:>10.1f}" for value in values))
+            lines.append(f"responses: {self.responses}  fallbacks: {self.fallbacks} "
+                         f"({self.fallback_rate:.1%})  errors: {self.errors}")
+            hits = sorted(self.pattern_hits.items(), key=lambda item: -item[1])[:top]
+        if hits:
+            lines.append("top patterns:")
+            lines += [f"{count:>8}  {pattern}" for pattern, count in hits]
+        return '\n'.join(lines)
+
+
+def render_cache_stats(stats: Dict[str, float], prefix: str = 'eliza') -> str:
+    """Return ``ResponseCache.stats()`` as Prometheus gauges."""
+    lines = []
+    for name, value in stats.items():
+        lines += [f'# TYPE {prefix}_response_cache_{name} gauge',
+                  f'{prefix}_response_cache_{name} {value!r}']
+    return '\n'.join(lines) + '\n'
+
+
+@functools.lru_cache(maxsize=None)
+def default_metrics() -> Metrics:
+    """Return the process-wide registry, disabled until ``enable`` is called."""
+    return Metrics()
@@ -3,24 +3,152 @@ Response pattern definitions for the ELIZA chatbot.
 """
 
 from dataclasses import dataclass
-from typing import List, Pattern
+from typing import Pattern, Sequence
 import re
 
-@dataclass
+@dataclass(frozen=True)
 class ResponsePattern:
     """
-    A dataclass representing a response pattern with its associated responses.
+    An immutable response rule: a pattern and its response templates.
+    
+    Per-conversation usage (last response used, usage counts) is tracked by
+    ``Conversation``, so one pattern can be shared by every session.
     
     Attributes:
         pattern (Pattern): Compiled regex pattern for matching user input
-        responses (List[str]): List of possible response templates
-        last_used (str): The last response used from this pattern
-        usage_count (int): Number of times this pattern has been used
+        responses (Sequence[str]): Possible response templates, stored as a tuple
     """
     pattern: Pattern
-    responses: List[str]
-    last_used: str = ""
-    usage_count: int = 0
+    responses: Sequence[str]
+
+    def __post_init__(self):
+        object.__setattr__(self, 'responses', tuple(self.responses))
+
+# Default rules, in priority order. Compiled once at import.
+DEFAULT_PATTERNS = (
+    ResponsePattern(
+        re.compile(r'.*\b(sad|depressed|unhappy|down)\b.*', re.IGNORECASE),
+        [
+            "I hear that you're feeling down. Would you like to tell me more about what's been making you feel this way?",
+            "It sounds like you're going through a difficult time. How long have you been feeling this way?",
+            "I'm sorry you're feeling this way. What do you think triggered these feelings?"
+        ]
+    ),
+    ResponsePattern(
+        re.compile(r'.*\b(angry|mad|pissed|furious)\b.*', re.IGNORECASE),
+        [
+            "I can hear the anger in your words. What specifically made you feel this way?",
+            "Your anger seems very present. When did you start feeling this intense emotion?",
+            "It's okay to feel angry. Can you tell me more about what's causing these strong feelings?"
+        ]
+    ),
+    ResponsePattern(
+        re.compile(r'.*\b(family|mother|father|sister|brother|parent)\b.*\b(sucks|terrible|awful|bad)\b.*', re.IGNORECASE),
+        [
+            "It sounds like you're having some difficult feelings about your family. Could you tell me more about what's been happening?",
+            "Family relationships can be really challenging. What aspects of your family situation are most difficult for you?",
+            "I can hear that you're struggling with your family. How long has this been affecting you?"
+        ]
+    ),
+    ResponsePattern(
+        re.compile(r'.*\b(feel|feeling|felt)\b.*', re.IGNORECASE),
+        [
+            "Thank you for sharing your feelings with me. Could you tell me more about what led to these emotions?",
+            "It's important to acknowledge our feelings. How do these emotions affect your daily life?",
+            "I appreciate you opening up about your feelings. What do you think triggered these emotions?"
+        ]
+    ),
+    ResponsePattern(
+        re.compile(r'I need (.*)', re.IGNORECASE),
+        [
+            "I understand that you need {}. Could you tell me more about why this is important to you?",
+            "What makes you feel that you need {} right now?",
+            "How long have you felt that you need {}?"
+        ]
+    ),
+    ResponsePattern(
+        re.compile(r'.*\b(anxious|worried|scared|afraid)\b.*', re.IGNORECASE),
+        [
+            "Anxiety can be really overwhelming. What specifically has been causing you to feel this way?",
+            "It's natural to feel anxious sometimes. Can you tell me more about what's worrying you?",
+            "I hear that you're feeling anxious. When did these feelings start?"
+        ]
+    ),
+    ResponsePattern(
+        re.compile(r'.*\b(lonely|alone|isolated)\b.*', re.IGNORECASE),
+        [
+            "Feeling lonely can be really difficult. How long have you been feeling this way?",
+            "I hear that you're feeling isolated. What do you think has contributed to these feelings?",
+            "It must be hard feeling so alone. Have you felt able to reach out to anyone about this?"
+        ]
+    ),
+    ResponsePattern(
+        re.compile(r'Hello|Hi|Hey', re.IGNORECASE),
+        [
+            "Hello! I'm here to listen and support you. How are you feeling today?",
+            "Hi there! Thank you for reaching out. What's been on your mind lately?",
+            "Hello! I'm here to help. Would you like to tell me what brings you here today?"
+        ]
+    ),
+    ResponsePattern(
+        re.compile(r'Yes', re.IGNORECASE),
+        [
+            "I appreciate you confirming that. Could you elaborate more on your thoughts?",
+            "Thank you for being open. Would you like to tell me more about that?",
+            "I see. What other thoughts or feelings come up for you about this?"
+        ]
+    ),
+    ResponsePattern(
+        re.compile(r'No', re.IGNORECASE),
+        [
+            "I understand that you don't agree. Could you tell me more about your perspective?",
+            "That's completely fine. What are your thoughts on this?",
+            "I appreciate your honesty. What makes you feel that way?"
+        ]
+    ),
+    ResponsePattern(
+        re.compile(r'.*\b(help|support)\b.*', re.IGNORECASE),
+        [
+            "I'm here to support you. What kind of help would be most useful right now?",
+            "I want to help you in the best way I can. Could you tell me more about what you need?",
+            "You're taking a positive step by asking for help. What's been the hardest part?"
+        ]
+    ),
+    ResponsePattern(
+        re.compile(r'.*\b(thank|thanks)\b.*', re.IGNORECASE),
+        [
+            "You're welcome. I'm here to listen and support you.",
+            "I appreciate you sharing your thoughts and feelings with me.",
+            "I'm glad I could help. Is there anything else you'd like to discuss?"
+        ]
+    ),
+    ResponsePattern(
+        re.compile(r'(.*)\?', re.IGNORECASE),
+        [
+            "That's a thoughtful question. What are your own thoughts about this?",
+            "I sense this is something important to you. What makes you ask about this?",
+            "This seems to be weighing on your mind. What led you to this question?"
+        ]
+    ),
+    ResponsePattern(
+        re.compile(r'quit|goodbye|bye', re.IGNORECASE),
+        [
+            "Thank you for sharing with me today. Take care of yourself.",
+            "I appreciate you opening up to me. Remember that it's okay to reach out for support when you need it.",
+            "Thank you for trusting me with your thoughts and feelings. Take care, and feel free to return anytime."
+        ]
+    ),
+    ResponsePattern(
+        re.compile(r'(.*)', re.IGNORECASE),
+        [
+            "I'm listening. Could you tell me more about that?",
+            "That sounds important to you. Could you elaborate on what you mean?",
+            "I'd like to understand better. Could you share more about your experience?",
+            "Your feelings are valid. Would you like to explore this further?",
+            "Thank you for sharing that. How does this situation affect you?"
+        ]
+    )
+)
 
 # Common regex patterns
 EMOTION_PATTERNS = {
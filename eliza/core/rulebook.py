@@ -0,0 +1,131 @@
+"""
+Compiled, read-only rule tables shared by all conversations.
+"""
+
+import functools
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Match, Optional, Sequence, Tuple
+
+from .cache import MAX_CACHED_TEXT, ResponseCache
+from .matcher import PatternMatcher
+from .response_patterns import DEFAULT_PATTERNS, ResponsePattern
+from .templates import Template, candidate_table
+
+
+@dataclass(frozen=True)
+class Rulebook:
+    """
+    An immutable, ordered set of response patterns and their compiled matcher.
+
+    A rulebook holds no per-conversation state, so a single instance is built
+    once per process and referenced by every ``Eliza`` conversation.
+
+    Each rule's responses are compiled into ``Template`` objects, and the
+    subset allowed under every context mask is precomputed, so no response
+    string is scanned while responding.
+
+    It also owns the cache of rules matched by repeated inputs. Changing the
+    rules means building a new rulebook, which starts with an empty cache,
+    so cached matches never outlive the rules they came from.
+
+    Attributes:
+        patterns (Tuple[ResponsePattern, ...]): Rules in priority order
+        cache_size (int): Most cached matches; 0 disables the cache
+        matcher (PatternMatcher): Single-pass matcher over ``patterns``
+        templates (Tuple[Tuple[Template, ...], ...]): Compiled responses of
+            each rule
+        candidates (Tuple[Tuple[Tuple[Template, ...], ...], ...]): For each
+            rule, its ``candidate_table``
+        cache (ResponseCache): Rule index matched by each ``cache_key``,
+            -1 for no match
+    """
+    patterns: Tuple[ResponsePattern, ...]
+    cache_size: int = field(default=4096, compare=False)
+    matcher: PatternMatcher = field(init=False, repr=False, compare=False)
+    templates: Tuple[Tuple[Template, ...], ...] = field(init=False, repr=False, compare=False)
+    candidates: Tuple[Tuple[Tuple[Template, ...], ...], ...] = field(
+        init=False, repr=False, compare=False)
+    cache: ResponseCache = field(init=False, repr=False, compare=False)
+    _case_insensitive: bool = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'patterns', tuple(self.patterns))
+        object.__setattr__(self, 'matcher', PatternMatcher(self.patterns))
+        object.__setattr__(self, 'templates', tuple(
+            tuple(Template(response) for response in rule.responses) for rule in self.patterns))
+        object.__setattr__(self, 'candidates', tuple(
+            candidate_table(templates) for templates in self.templates))
+        object.__setattr__(self, 'cache', ResponseCache(self.cache_size))
+        object.__setattr__(self, '_case_insensitive', all(
+            rule.pattern.flags & re.IGNORECASE for rule in self.patterns))
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def __getstate__(self):
+        # Cached selections are not worth persisting, and the lock cannot be
+        state = dict(self.__dict__)
+        del state['cache']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        object.__setattr__(self, 'cache', ResponseCache(self.cache_size))
+
+    @property
+    def current(self) -> 'Rulebook':
+        """This rulebook, so it can be used wherever a ``RuleFile`` can."""
+        return self
+
+    def match(self, text: str,
+              tokens: Optional[Sequence[str]] = None) -> Optional[Tuple[int, Match]]:
+        """
+        Find the first rule matching ``text``.
+
+        Args:
+            text: The user input
+            tokens: Lowercase word tokens of ``text``, if already computed
+
+        Returns:
+            A ``(rule_index, match)`` tuple, or None if no rule matches
+        """
+        return self.matcher.match(text, tokens)
+
+    def cache_key(self, text: str) -> Optional[str]:
+        """
+        Return the key of the cached match for ``text``.
+
+        When every rule ignores case, ASCII input is lowercased, since the
+        same rule then matches whatever its case; capture groups are taken
+        from the actual input by the caller.
+
+        Args:
+            text: The user input
+
+        Returns:
+            The key, or None if ``text`` should not be cached
+        """
+        if len(text) > MAX_CACHED_TEXT or self.cache_size <= 0:
+            return None
+        if self._case_insensitive and text.isascii():
+            return text.lower()
+        return text
+
+    def extend(self, patterns: Iterable[ResponsePattern]) -> 'Rulebook':
+        """
+        Return a new rulebook with ``patterns`` taking priority over these rules.
+
+        Args:
+            patterns: Additional rules, in priority order
+
+        Returns:
+            A new Rulebook; this one is left unchanged
+        """
+        return Rulebook(tuple(patterns) + self.patterns, self.cache_size)
+
+
+@functools.lru_cache(maxsize=None)
+def default_rulebook() -> Rulebook:
+    """Return the process-wide rulebook built from ``DEFAULT_PATTERNS``."""
+    return Rulebook(DEFAULT_PATTERNS)
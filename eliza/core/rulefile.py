@@ -0,0 +1,260 @@
+"""
+Rules loaded from a file, with a compiled cache and hot reloading.
+
+A rules file is JSON::
+
+    {
+      "version": 1,
+      "rules": [
+        {"pattern": "I need (.*)", "flags": ["IGNORECASE"],
+         "responses": ["Why do you need {}?", "Would {} really help?"]}
+      ]
+    }
+
+Rules are listed in priority order. ``load_rulebook`` keeps the built
+``Rulebook`` -- its keyword index, templates and candidate tables -- in a
+pickle next to the file, stamped with a format version, the Python version,
+a hash of the file and the response cache size. Later processes load that
+instead of rebuilding, and rebuild (and rewrite it) whenever the stamp does
+not match. Compiled regexes are pickled as their source, so they are still
+compiled by ``re`` on load.
+
+``RuleFile`` serves a rules file to running conversations and swaps in a
+new ``Rulebook`` when the file changes. The swap is a single attribute
+assignment: each ``respond`` call reads ``current`` once, so calls already
+running finish with the rules they started with and none of them waits.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Optional, Tuple, Union
+
+from .response_patterns import ResponsePattern
+from .rulebook import Rulebook, default_rulebook
+
+logger = logging.getLogger(__name__)
+
+RULES_VERSION = 1
+# Bumped whenever what a pickled Rulebook contains changes
+CACHE_VERSION = 1
+
+FLAGS = {flag: getattr(re, flag) for flag in
+         ('IGNORECASE', 'MULTILINE', 'DOTALL', 'VERBOSE', 'ASCII')}
+
+
+def parse_rules(data: Mapping[str, Any]) -> Tuple[ResponsePattern, ...]:
+    """
+    Build response patterns from the parsed contents of a rules file.
+
+    Raises:
+        ValueError: If the data is not a valid rules document
+    """
+    if not isinstance(data, Mapping) or data.get('version') != RULES_VERSION:
+        raise ValueError(f"Expected a rules document with version {RULES_VERSION}")
+    rules = data.get('rules')
+    if not isinstance(rules, list):
+        raise ValueError("'rules' must be a list")
+    patterns = []
+    for position, rule in enumerate(rules):
+        try:
+            flags = 0
+            for name in rule.get('flags', ()):
+                flags |= FLAGS[name]
+            responses = rule['responses']
+            if not responses or not all(isinstance(response, str) for response in responses):
+                raise ValueError("'responses' must be a non-empty list of strings")
+            patterns.append(ResponsePattern(re.compile(rule['pattern'], flags), responses))
+        except (AttributeError, KeyError, TypeError, ValueError, re.error) as e:
+            raise ValueError(f"Invalid rule #{position}: {e!r}") from e
+    return tuple(patterns)
+
+
+def load_rules(path: Union[str, Path]) -> Tuple[ResponsePattern, ...]:
+    """Read and parse a rules file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_rules(json.load(f))
+
+
+def dump_rules(patterns: Iterable[ResponsePattern], path: Union[str, Path]) -> None:
+    """
+    Write response patterns as a rules file, e.g. to start from ``DEFAULT_PATTERNS``.
+
+    Args:
+        patterns: Rules in priority order
+        path: File to write
+    """
+    rules = [{'pattern': rule.pattern.pattern,
+              'flags': [name for name, flag in FLAGS.items() if rule.pattern.flags & flag],
+              'responses': list(rule.responses)} for rule in patterns]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': RULES_VERSION, 'rules': rules}, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+
+def default_cache_path(path: Union[str, Path]) -> Path:
+    """Where ``load_rulebook`` keeps the compiled cache of ``path``."""
+    path = Path(path)
+    return path.with_name(path.name + '.cache')
+
+
+def load_rulebook(path: Union[str, Path], cache_path: Union[str, Path, None] = None,
+                  cache_size: int = 4096) -> Rulebook:
+    """
+    Load a rules file, through its compiled cache when that is current.
+
+    Args:
+        path: Rules file
+        cache_path: Compiled cache; ``default_cache_path(path)`` if omitted
+        cache_size: Response cache size of the rulebook
+
+    Returns:
+        The rulebook
+
+    Raises:
+        OSError: If the rules file cannot be read
+        ValueError: If it is not a valid rules file
+    """
+    source = Path(path).read_bytes()
+    stamp = {'cache': CACHE_VERSION, 'python': sys.version_info[:2],
+             'source': hashlib.sha256(source).hexdigest(), 'cache_size': cache_size}
+    cache_path = Path(cache_path) if cache_path is not None else default_cache_path(path)
+    try:
+        with open(cache_path, 'rb') as f:
+            if pickle.load(f) == stamp:
+                return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception:
+        logger.warning("Ignoring unreadable rules cache %s", cache_path, exc_info=True)
+
+    try:
+        data = json.loads(source.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"{path} is not a JSON rules file: {e}") from e
+    rulebook = Rulebook(parse_rules(data), cache_size)
+    temporary = cache_path.with_name(f'{cache_path.name}.{os.getpid()}.tmp')
+    try:
+        with open(temporary, 'wb') as f:
+            pickle.dump(stamp, f, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(rulebook, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, cache_path)
+    except OSError:
+        logger.warning("Could not write rules cache %s", cache_path, exc_info=True)
+        try:
+            temporary.unlink()
+        except OSError:
+            pass
+    return rulebook
+
+
+class RuleFile:
+    """
+    A rules file served to conversations, reloaded when it changes.
+
+    Pass it to ``Eliza`` in place of a ``Rulebook``. A file that fails to
+    load is logged and the previous rules stay in use.
+
+    Args:
+        path: Rules file
+        interval: Seconds between checks of the file once ``start`` is called
+        cache_path: Compiled cache, as for ``load_rulebook``
+        cache_size: Response cache size of each loaded rulebook
+
+    Attributes:
+        current (Rulebook): The rules in use
+        reloads (int): Times new rules were swapped in
+
+    Raises:
+        OSError, ValueError: If the file cannot be loaded initially
+    """
+
+    def __init__(self, path: Union[str, Path], interval: float = 2.0,
+                 cache_path: Union[str, Path, None] = None, cache_size: int = 4096):
+        self.path = Path(path)
+        self.interval = interval
+        self.cache_path = cache_path
+        self.cache_size = cache_size
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._signature = self._stat()
+        self.current = load_rulebook(self.path, cache_path, cache_size)
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self) -> bool:
+        """
+        Reload the rules if the file changed since it was last loaded.
+
+        Returns:
+            Whether new rules were swapped in
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        with self._lock:
+            if signature == self._signature:
+                return False
+            self._signature = signature
+            try:
+                rulebook = load_rulebook(self.path, self.cache_path, self.cache_size)
+            except (OSError, ValueError):
+                logger.exception("Keeping the current rules; failed to reload %s", self.path)
+                return False
+            self.current = rulebook
+            self.reloads += 1
+        logger.info("Reloaded %d rules from %s", len(rulebook), self.path)
+        return True
+
+    def start(self) -> 'RuleFile':
+        """
+        Check the file every ``interval`` seconds in a daemon thread.
+
+        Threads do not survive ``fork``, so a pre-forking server calls this
+        again in each worker.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name='eliza-rules', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop checking the file."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+
+@functools.lru_cache(maxsize=None)
+def default_rules() -> Union[RuleFile, Rulebook]:
+    """
+    Return the process-wide rules for servers.
+
+    A watched ``RuleFile`` of ``ELIZA_RULES`` (checked every
+    ``ELIZA_RULES_POLL`` seconds, 2 by default) if that is set, and
+    ``default_rulebook()`` otherwise.
+    """
+    path = os.environ.get('ELIZA_RULES')
+    if not path:
+        return default_rulebook()
+    return RuleFile(path, interval=float(os.environ.get('ELIZA_RULES_POLL', 2))).start()
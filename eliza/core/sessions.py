@@ -0,0 +1,236 @@
+"""
+Session management for serving many concurrent ELIZA conversations.
+"""
+
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Optional, Tuple, Union
+
+from .chatbot import Eliza
+from .history import SessionHistory
+from .rulebook import Rulebook
+from .store import SessionStore, SqliteSessionStore
+
+if TYPE_CHECKING:
+    from .rulefile import RuleFile
+
+SESSION_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{8,64}')
+
+# Turns a server conversation keeps in memory unless ELIZA_HISTORY_WINDOW says otherwise
+DEFAULT_HISTORY_WINDOW = 64
+
+
+def windowed_factory(window: Optional[int],
+                     rulebook: Union[Rulebook, 'RuleFile', None] = None) -> Callable[[], Eliza]:
+    """
+    Return a factory of conversations keeping at most ``window`` turns in memory.
+
+    Older turns are dropped, so this suits servers that journal turns as
+    they happen. ``window`` None keeps every turn. ``rulebook`` is passed
+    to each ``Eliza``; ``Eliza`` itself is returned if both are None.
+    """
+    if window is None:
+        return Eliza if rulebook is None else lambda: Eliza(rulebook)
+    return lambda: Eliza(rulebook, history=SessionHistory(window))
+
+
+class Session:
+    """
+    A single conversation and the lock serializing access to it.
+
+    Attributes:
+        session_id (str): Identifier of the conversation
+        eliza (Eliza): The conversation state
+        lock (threading.Lock): Held while the conversation is being updated
+        last_seen (float): Monotonic time of the last access
+        saved_turns (int): Number of client-side turns persisted so far
+    """
+
+    __slots__ = ('session_id', 'eliza', 'lock', 'last_seen', 'saved_turns')
+
+    def __init__(self, session_id: str, eliza: Eliza, last_seen: float):
+        self.session_id = session_id
+        self.eliza = eliza
+        self.lock = threading.Lock()
+        self.last_seen = last_seen
+        self.saved_turns = 0
+
+
+class SessionManager:
+    """
+    Thread-safe registry of conversations keyed by session ID.
+
+    Sessions are kept in least-recently-used order. Sessions idle for longer
+    than ``idle_timeout`` seconds are dropped, and once ``max_sessions`` is
+    reached the least recently used session is evicted to make room, which
+    bounds the memory held by one worker.
+
+    With a ``store``, conversations are shared with other processes using
+    the same store: each message first loads the conversation if another
+    process saved a newer version, and the conversation is saved after the
+    response. Snapshots hold the context, the rule usage and only the last
+    ``STORED_TURNS`` turns, so saving costs the same however long the
+    conversation gets; the full history is kept by the session journal.
+    If another process saved the conversation in the meantime, the
+    response is discarded and the message answered again from the saved
+    state, so no turn is lost. Sessions evicted from memory are then
+    loaded back from the store when their next message arrives.
+
+    Args:
+        factory: Callable creating the state for a new conversation
+        max_sessions: Maximum number of live sessions
+        idle_timeout: Seconds of inactivity after which a session is dropped
+        clock: Monotonic time source, mainly for tests
+        store: Store shared with other worker processes, if any
+    """
+
+    # Attempts at answering a message before giving up on a conversation
+    # that other processes keep changing
+    STORE_ATTEMPTS = 8
+    # Most recent turns saved with each snapshot in the store
+    STORED_TURNS = 16
+
+    def __init__(self,
+                 factory: Callable[[], Eliza] = Eliza,
+                 max_sessions: int = 10000,
+                 idle_timeout: float = 1800.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 store: Optional[SessionStore] = None):
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1")
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.store = store
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_session_id() -> str:
+        """Generate a new random session ID."""
+        return uuid.uuid4().hex
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def get(self, session_id: Optional[str] = None) -> Session:
+        """
+        Return the session for ``session_id``, creating it if needed.
+
+        Args:
+            session_id: Client-supplied ID; a new one is issued if it is
+                missing or malformed
+
+        Returns:
+            The (possibly new) session
+        """
+        if not session_id or not SESSION_ID_PATTERN.fullmatch(session_id):
+            session_id = self.new_session_id()
+
+        now = self.clock()
+        with self._lock:
+            self._evict_idle(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                while len(self._sessions) >= self.max_sessions:
+                    self._sessions.popitem(last=False)
+                session = Session(session_id, self.factory(), now)
+                self._sessions[session_id] = session
+            else:
+                session.last_seen = now
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def respond(self, session_id: Optional[str], message: str) -> Tuple[str, str]:
+        """
+        Route a message to its conversation.
+
+        Args:
+            session_id: ID of the conversation, or None to start a new one
+            message: The user's message
+
+        Returns:
+            A ``(session_id, response)`` tuple
+
+        Raises:
+            RuntimeError: If other processes sharing the store kept changing
+                the conversation while it was being answered
+        """
+        session = self.get(session_id)
+        store = self.store
+        with session.lock:
+            if store is None:
+                return session.session_id, session.eliza.respond(message)
+            # The number of turns recorded is the conversation's version
+            saved = store.load(session.session_id, session.eliza.state.history.appended)
+            for _ in range(self.STORE_ATTEMPTS):
+                if saved is not None:
+                    session.eliza.state.restore(saved[1])
+                state = session.eliza.state
+                previous = state.history.appended
+                response = session.eliza.respond(message)
+                snapshot = state.snapshot(self.STORED_TURNS)
+                if store.save(session.session_id, state.history.appended, snapshot, previous):
+                    return session.session_id, response
+                saved = store.load(session.session_id)
+                if saved is None:
+                    # Discarded by another process in the meantime
+                    session.eliza = self.factory()
+            raise RuntimeError(f"Session {session.session_id} kept changing in another process")
+
+    def discard(self, session_id: str) -> None:
+        """Forget a session if it exists, including in the store."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        if self.store is not None:
+            self.store.delete(session_id)
+
+    def evict_idle(self) -> int:
+        """Drop all idle sessions and return how many were removed."""
+        with self._lock:
+            return self._evict_idle(self.clock())
+
+    def _evict_idle(self, now: float) -> int:
+        removed = 0
+        cutoff = now - self.idle_timeout
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.last_seen > cutoff:
+                break
+            self._sessions.popitem(last=False)
+            removed += 1
+        return removed
+
+
+def sessions_from_env(rulebook: Union[Rulebook, 'RuleFile', None] = None) -> SessionManager:
+    """
+    Create the session manager of a web server, configured from the environment.
+
+    ``ELIZA_HISTORY_WINDOW`` is the number of turns each conversation keeps
+    in memory (``DEFAULT_HISTORY_WINDOW``) and ``ELIZA_MAX_SESSIONS`` the
+    number of live sessions (10000), which together bound the memory held
+    by conversations. ``ELIZA_SESSION_TIMEOUT`` is the seconds after which
+    an idle session is dropped (1800). ``ELIZA_SESSION_STORE`` names
+    a SQLite file shared with other worker processes, whose conversations
+    expire after the same timeout.
+
+    Args:
+        rulebook: Rules each conversation responds with
+    """
+    window = int(os.environ.get('ELIZA_HISTORY_WINDOW') or DEFAULT_HISTORY_WINDOW)
+    timeout = float(os.environ.get('ELIZA_SESSION_TIMEOUT', 1800))
+    store = os.environ.get('ELIZA_SESSION_STORE')
+    return SessionManager(
+        factory=windowed_factory(window, rulebook),
+        max_sessions=int(os.environ.get('ELIZA_MAX_SESSIONS', 10000)),
+        idle_timeout=timeout,
+        store=SqliteSessionStore(store, max_age=timeout) if store else None,
+    )
@@ -0,0 +1,147 @@
+"""
+Conversation state shared between worker processes.
+
+``SessionManager`` keeps conversations in the memory of one process, which
+is all a single server needs. When several pre-forked workers serve the
+same clients, consecutive messages of one conversation can reach different
+workers, so the manager can be given a ``SessionStore``: before responding
+it loads the conversation if another worker saved a newer version of it,
+and after responding it saves it. While a client keeps hitting the same
+worker, the load finds nothing newer and returns without decoding anything.
+If two workers answer the same conversation at once, the save of the
+second one fails and it answers again from the state the first one saved.
+
+``SqliteSessionStore`` keeps the snapshots in a SQLite database file that
+every worker on the host opens.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+
+class SessionStore(ABC):
+    """
+    Interface of a store of conversation snapshots.
+
+    Each snapshot is saved with a version that only grows over the life of
+    a conversation; ``SessionManager`` uses the number of turns recorded.
+    Saves are compare-and-swap on the version the snapshot was derived
+    from, so a process working from an outdated copy cannot overwrite the
+    turns another process saved in the meantime.
+    """
+
+    @abstractmethod
+    def load(self, session_id: str, newer_than: int = -1) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Return ``(version, snapshot)`` of a conversation if newer than ``newer_than``.
+
+        Returns:
+            The saved version and snapshot, or None if there is none newer
+        """
+
+    @abstractmethod
+    def save(self, session_id: str, version: int, snapshot: Dict[str, Any],
+             previous: int) -> bool:
+        """
+        Save a snapshot if the stored version is still ``previous``.
+
+        Args:
+            session_id: ID of the conversation
+            version: Version of the snapshot
+            snapshot: State of the conversation
+            previous: Version the snapshot was derived from
+
+        Returns:
+            True if saved; False if another version was stored in the
+            meantime, in which case the caller should load it and retry
+        """
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Forget a conversation."""
+
+    def close(self) -> None:
+        """Release the resources of the calling thread."""
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    Session store in a local SQLite database.
+
+    The database is opened in WAL mode, so workers read concurrently while
+    one of them writes. Connections are opened per thread and per process,
+    on first use, so a store created before the server forks is safe to use
+    in every worker.
+
+    Args:
+        path: Database file, created if missing
+        max_age: Seconds after which a conversation that has not been saved
+            is deleted; kept forever if None
+        timeout: Seconds to wait for another process's write to finish
+    """
+
+    # Saves between two deletions of expired conversations, per process
+    PRUNE_EVERY = 1024
+
+    def __init__(self, path: Union[str, Path], max_age: Optional[float] = None,
+                 timeout: float = 5.0):
+        self.path = str(path)
+        self.max_age = max_age
+        self.timeout = timeout
+        self._local = threading.local()
+        self._saves = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS sessions ('
+                               'id TEXT PRIMARY KEY, version INTEGER NOT NULL, '
+                               'state TEXT NOT NULL, updated REAL NOT NULL)')
+            local.connection, local.pid = connection, os.getpid()
+        return local.connection
+
+    def load(self, session_id: str, newer_than: int = -1) -> Optional[Tuple[int, Dict[str, Any]]]:
+        row = self._connection().execute(
+            'SELECT version, state FROM sessions WHERE id = ? AND version > ?',
+            (session_id, newer_than)).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def save(self, session_id: str, version: int, snapshot: Dict[str, Any],
+             previous: int) -> bool:
+        now = time.time()
+        state = json.dumps(snapshot, ensure_ascii=False)
+        connection = self._connection()
+        saved = connection.execute(
+            'UPDATE sessions SET version = ?, state = ?, updated = ? WHERE id = ? AND version = ?',
+            (version, state, now, session_id, previous)).rowcount == 1
+        if not saved:
+            # A conversation that is not stored yet, or no longer, starts afresh
+            saved = connection.execute(
+                'INSERT INTO sessions (id, version, state, updated) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(id) DO NOTHING', (session_id, version, state, now)).rowcount == 1
+        self._saves += 1
+        if self.max_age is not None and self._saves % self.PRUNE_EVERY == 0:
+            connection.execute('DELETE FROM sessions WHERE updated < ?', (now - self.max_age,))
+        return saved
+
+    def delete(self, session_id: str) -> None:
+        self._connection().execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+    def close(self) -> None:
+        if getattr(self._local, 'pid', None) == os.getpid():
+            self._local.connection.close()
+        self._local.pid = None
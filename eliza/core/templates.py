@@ -0,0 +1,121 @@
+"""
+Response templates compiled once, when a ``Rulebook`` is built.
+
+Whether a response mentions feelings or changes the topic, and where its
+placeholders are, are properties of a static string. ``Template`` records
+them as a bitmask of tags and a format plan, so choosing among a rule's
+responses in a given context is a lookup in a table of precomputed subsets
+(``candidate_table``) and formatting is a few string concatenations.
+"""
+
+import string
+from typing import Optional, Sequence, Tuple
+
+MENTIONS_FEELINGS = 1
+CHANGES_TOPIC = 2
+HAS_PLACEHOLDER = 4
+
+# Tags a context can exclude, and the marker setting each one
+FILTER_MARKERS = ((MENTIONS_FEELINGS, 'feel'), (CHANGES_TOPIC, 'change focus'))
+FILTER_TAGS = MENTIONS_FEELINGS | CHANGES_TOPIC
+
+
+class Template:
+    """
+    A response template with its tags and format plan.
+
+    Args:
+        text: The template, with positional ``{}`` or ``{0}`` placeholders
+
+    Attributes:
+        text (str): The template as written
+        tags (int): Bitwise OR of ``MENTIONS_FEELINGS``, ``CHANGES_TOPIC``
+            and ``HAS_PLACEHOLDER``
+    """
+
+    __slots__ = ('text', 'tags', '_head', '_steps')
+
+    def __init__(self, text: str):
+        self.text = text
+        lowered = text.lower()
+        tags = 0
+        for tag, marker in FILTER_MARKERS:
+            if marker in lowered:
+                tags |= tag
+        self._head, self._steps = _compile(text)
+        if self._steps is None or self._steps:
+            tags |= HAS_PLACEHOLDER
+        self.tags = tags
+
+    def __repr__(self) -> str:
+        return f"Template({self.text!r})"
+
+    def render(self, groups: Sequence[Optional[str]]) -> str:
+        """
+        Return ``text.format(*groups)``.
+
+        Raises:
+            IndexError: If a placeholder has no group, as ``str.format`` does
+        """
+        steps = self._steps
+        if steps is None:
+            return self.text.format(*groups)
+        text = self._head
+        for index, literal in steps:
+            text += str(groups[index]) + literal
+        return text
+
+
+def _compile(text: str) -> Tuple[str, Optional[Tuple[Tuple[int, str], ...]]]:
+    """
+    Split ``text`` into a leading literal and ``(group_index, literal)`` steps.
+
+    Templates using anything but plain positional placeholders (names,
+    conversions, format specs) get no plan and are left to ``str.format``.
+    """
+    try:
+        parsed = list(string.Formatter().parse(text))
+    except ValueError:
+        return text, None
+    head = ''
+    steps = []
+    auto = manual = False
+    for literal, field, spec, conversion in parsed:
+        if steps:
+            index, previous = steps[-1]
+            steps[-1] = (index, previous + literal)
+        else:
+            head += literal
+        if field is None:
+            continue
+        if spec or conversion:
+            return text, None
+        if field == '':
+            auto = True
+            steps.append((len(steps), ''))
+        elif field.isdigit():
+            manual = True
+            steps.append((int(field), ''))
+        else:
+            return text, None
+    if auto and manual:
+        return text, None
+    return head, tuple(steps)
+
+
+def candidate_table(templates: Tuple[Template, ...]) -> Tuple[Tuple[Template, ...], ...]:
+    """
+    Precompute the responses a rule offers under each context mask.
+
+    Args:
+        templates: The rule's templates, in order
+
+    Returns:
+        A tuple indexed by a mask of ``FILTER_TAGS`` bits: the templates
+        carrying none of those tags, or all templates if that leaves none
+    """
+    table = []
+    for mask in range(FILTER_TAGS + 1):
+        allowed = tuple(template for template in templates if not template.tags & mask)
+        table.append(allowed if allowed and len(allowed) < len(templates) else templates)
+    return tuple(table)
@@ -1,7 +1,42 @@
 """
 N-gram language model implementation for text analysis.
+
+NumPy and the submodules are imported when one of the names below is first
+used.
 """
 
-from .model import calculate_perplexity, train_ngram_model
+from typing import TYPE_CHECKING
+
+from .._lazy import lazy_exports
+
+__all__ = ['KneserNeyModel', 'NgramComparison', 'NgramTable', 'PerplexityScorer',
+           'StreamingNgramCounter', 'Vocabulary', 'build_ngram_model', 'calculate_perplexity',
+           'compare_ngrams', 'count_ngrams', 'count_ngrams_stream', 'generate_ngrams',
+           'load_model', 'save_model', 'train_ngram_model']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'NgramComparison': '.compare',
+    'compare_ngrams': '.compare',
+    'NgramTable': '.counting',
+    'Vocabulary': '.counting',
+    'count_ngrams': '.counting',
+    'PerplexityScorer': '.scoring',
+    'KneserNeyModel': '.smoothing',
+    'load_model': '.storage',
+    'save_model': '.storage',
+    'StreamingNgramCounter': '.streaming',
+    'count_ngrams_stream': '.streaming',
+    'build_ngram_model': '.model',
+    'calculate_perplexity': '.model',
+    'generate_ngrams': '.model',
+    'train_ngram_model': '.model',
+})
 
-__all__ = ['calculate_perplexity', 'train_ngram_model']
+if TYPE_CHECKING:
+    from .compare import NgramComparison, compare_ngrams
+    from .counting import NgramTable, Vocabulary, count_ngrams
+    from .scoring import PerplexityScorer
+    from .smoothing import KneserNeyModel
+    from .storage import load_model, save_model
+    from .streaming import StreamingNgramCounter, count_ngrams_stream
+    from .model import build_ngram_model, calculate_perplexity, generate_ngrams, train_ngram_model
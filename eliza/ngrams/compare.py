@@ -0,0 +1,213 @@
+"""
+Comparison of the n-gram distributions of two corpora.
+
+Both count tables are re-encoded against one shared vocabulary and joined
+on their packed keys with a sorted union and ``searchsorted``, so the
+comparison is a handful of NumPy arrays over the union of n-grams rather
+than a Python record per n-gram. Rankings use ``argpartition`` to select
+the top k before sorting only those, and results are streamed out as
+delimited text in batches.
+"""
+
+import csv
+import math
+from typing import IO, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .counting import KeyCodec, Ngram, NgramTable, Vocabulary
+
+COLUMNS = ('ngram', 'count_1', 'prob_1', 'count_2', 'prob_2', 'abs_diff', 'log_ratio')
+METRICS = ('abs_diff', 'log_ratio', 'counts_1', 'counts_2', 'prob_1', 'prob_2')
+
+# (ngram, count_1, prob_1, count_2, prob_2, abs_diff, log_ratio)
+Row = Tuple[Ngram, int, float, int, float, float, float]
+
+
+def _plogq(p: np.ndarray, q: np.ndarray) -> float:
+    """Sum of ``p * log2(p / q)`` over entries with ``p > 0``."""
+    mask = p > 0
+    return float(np.dot(p[mask], np.log2(p[mask] / q[mask])))
+
+
+class NgramComparison:
+    """
+    Aligned n-gram statistics of two corpora over the union of their n-grams.
+
+    Args:
+        first: Counts of the first corpus
+        second: Counts of the second corpus
+        smoothing: Pseudo-count added to every n-gram of the union for the
+            log-ratio and KL divergences, which are undefined for n-grams
+            missing from one corpus
+
+    Attributes:
+        n (int): Size of the n-grams
+        vocab (Vocabulary): Vocabulary the keys are encoded against
+        codec (KeyCodec): Key packing used by ``keys``
+        keys (np.ndarray): Sorted keys of the union of n-grams
+        counts_1 (np.ndarray): Count of each n-gram in the first corpus
+        counts_2 (np.ndarray): Count of each n-gram in the second corpus
+    """
+
+    def __init__(self, first: NgramTable, second: NgramTable, smoothing: float = 0.5):
+        if first.n != second.n:
+            raise ValueError(f"Cannot compare {first.n}-grams with {second.n}-grams")
+        self.n = first.n
+        self.smoothing = smoothing
+        if first.vocab is second.vocab:
+            self.vocab = first.vocab
+            second_windows = second.codec.unpack(second.keys)
+        else:
+            self.vocab = Vocabulary(first.vocab.tokens)
+            remap = self.vocab.encode(second.vocab.tokens)
+            second_windows = remap[second.codec.unpack(second.keys)]
+        self.codec = KeyCodec(self.n, len(self.vocab))
+        first_keys = first.keys if first.codec.same_layout(self.codec) else \
+            self.codec.pack(first.codec.unpack(first.keys))
+        second_keys = self.codec.pack(second_windows)
+
+        self.keys = np.union1d(first_keys, second_keys)
+        self.counts_1 = np.zeros(len(self.keys), dtype=np.int64)
+        self.counts_1[np.searchsorted(self.keys, first_keys)] = first.counts
+        self.counts_2 = np.zeros(len(self.keys), dtype=np.int64)
+        self.counts_2[np.searchsorted(self.keys, second_keys)] = second.counts
+        self.total_1 = int(self.counts_1.sum())
+        self.total_2 = int(self.counts_2.sum())
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def prob_1(self) -> np.ndarray:
+        """Relative frequency of each n-gram in the first corpus."""
+        return self.counts_1 / max(self.total_1, 1)
+
+    @property
+    def prob_2(self) -> np.ndarray:
+        """Relative frequency of each n-gram in the second corpus."""
+        return self.counts_2 / max(self.total_2, 1)
+
+    @property
+    def abs_diff(self) -> np.ndarray:
+        """Absolute difference of the relative frequencies."""
+        return np.abs(self.prob_1 - self.prob_2)
+
+    @property
+    def log_ratio(self) -> np.ndarray:
+        """log2 of the smoothed first-corpus probability over the second's."""
+        return self._log_ratio(self.counts_1, self.counts_2)
+
+    def kl_divergence(self, reverse: bool = False) -> float:
+        """
+        KL divergence in bits of the smoothed distributions.
+
+        Args:
+            reverse: Return KL(second || first) instead of KL(first || second)
+        """
+        smoothed_1, smoothed_2 = self._smoothed()
+        if reverse:
+            smoothed_1, smoothed_2 = smoothed_2, smoothed_1
+        return _plogq(smoothed_1, smoothed_2)
+
+    def js_divergence(self) -> float:
+        """Jensen-Shannon divergence in bits (between 0 and 1) of the raw frequencies."""
+        if not self.total_1 or not self.total_2:
+            return math.nan
+        prob_1, prob_2 = self.prob_1, self.prob_2
+        mixture = (prob_1 + prob_2) / 2
+        return (_plogq(prob_1, mixture) + _plogq(prob_2, mixture)) / 2
+
+    def top(self, metric: str = 'abs_diff', k: int = 10, largest: bool = True) -> List[Row]:
+        """
+        Return the k n-grams ranking highest (or lowest) by a metric.
+
+        Args:
+            metric: One of ``METRICS``
+            k: Number of rows
+            largest: Rank by descending value; ascending when False
+
+        Returns:
+            Rows in rank order, ties broken by key order
+        """
+        return self.rows(self.top_indices(metric, k, largest))
+
+    def top_indices(self, metric: str = 'abs_diff', k: int = 10,
+                    largest: bool = True) -> np.ndarray:
+        """Positions of the k n-grams ranking highest (or lowest) by a metric."""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}; expected one of {METRICS}")
+        values = getattr(self, metric)
+        values = -values if largest else values
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        if k < len(values):
+            # Keep every value tied with the k-th so ties are broken by key order
+            kth = np.partition(values, k - 1)[k - 1]
+            candidates = np.flatnonzero(values <= kth)
+        else:
+            candidates = np.arange(len(values))
+        return candidates[np.lexsort((candidates, values[candidates]))][:k]
+
+    def rows(self, indices: Optional[Sequence[int]] = None) -> List[Row]:
+        """Return the rows at ``indices`` (all rows in key order if omitted)."""
+        return list(self._iter_rows(np.arange(len(self)) if indices is None
+                                    else np.asarray(indices, dtype=np.intp)))
+
+    def write(self, out: IO[str], delimiter: str = ',',
+              indices: Optional[Sequence[int]] = None, batch_size: int = 65536) -> int:
+        """
+        Stream rows as delimited text with a header line.
+
+        Args:
+            out: Text stream to write to
+            delimiter: ``','`` for CSV, ``'\\t'`` for TSV
+            indices: Rows to write, in order; all rows in key order if omitted
+            batch_size: Rows decoded and written at a time
+
+        Returns:
+            Number of rows written
+        """
+        writer = csv.writer(out, delimiter=delimiter, lineterminator='\n')
+        writer.writerow(COLUMNS)
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices, dtype=np.intp)
+        written = 0
+        for start in range(0, len(indices), batch_size):
+            batch = indices[start:start + batch_size]
+            writer.writerows((' '.join(ngram), count_1, f'{prob_1:.6g}', count_2,
+                              f'{prob_2:.6g}', f'{abs_diff:.6g}', f'{log_ratio:.6g}')
+                             for ngram, count_1, prob_1, count_2, prob_2, abs_diff, log_ratio
+                             in self._iter_rows(batch))
+            written += len(batch)
+        return written
+
+    def _smoothed(self, counts_1: Optional[np.ndarray] = None,
+                  counts_2: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        counts_1 = self.counts_1 if counts_1 is None else counts_1
+        counts_2 = self.counts_2 if counts_2 is None else counts_2
+        alpha, size = self.smoothing, len(self)
+        return ((counts_1 + alpha) / (self.total_1 + alpha * size),
+                (counts_2 + alpha) / (self.total_2 + alpha * size))
+
+    def _log_ratio(self, counts_1: np.ndarray, counts_2: np.ndarray) -> np.ndarray:
+        smoothed_1, smoothed_2 = self._smoothed(counts_1, counts_2)
+        return np.log2(smoothed_1 / smoothed_2)
+
+    def _iter_rows(self, indices: np.ndarray) -> Iterator[Row]:
+        if not len(indices):
+            return
+        counts_1, counts_2 = self.counts_1[indices], self.counts_2[indices]
+        prob_1 = counts_1 / max(self.total_1, 1)
+        prob_2 = counts_2 / max(self.total_2, 1)
+        log_ratio = self._log_ratio(counts_1, counts_2)
+        decode = self.vocab.decode
+        windows = self.codec.unpack(self.keys[indices]).tolist()
+        for i, ids in enumerate(windows):
+            yield (decode(ids), int(counts_1[i]), float(prob_1[i]), int(counts_2[i]),
+                   float(prob_2[i]), float(abs(prob_1[i] - prob_2[i])), float(log_ratio[i]))
+
+
+def compare_ngrams(first: NgramTable, second: NgramTable,
+                   smoothing: float = 0.5) -> NgramComparison:
+    """Compare the n-gram distributions of two count tables."""
+    return NgramComparison(first, second, smoothing)
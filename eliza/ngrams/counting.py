@@ -0,0 +1,372 @@
+"""
+Compact, integer-encoded n-gram counting.
+
+Tokens are interned into a ``Vocabulary`` of consecutive integer IDs and each
+n-gram is packed into one fixed-width key: the IDs are concatenated bit-wise
+into a ``uint64`` when they fit, and stored as a row of big-endian ``uint32``
+IDs (a NumPy void scalar) otherwise. Both layouts sort lexicographically by
+token ID, so a table is a sorted key array plus a parallel count array, and
+counting, merging and lookup are NumPy sorts and binary searches instead of
+Python dicts of tuples.
+"""
+
+import re
+from collections import Counter
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+Ngram = Tuple[str, ...]
+
+
+def iter_tokens(text: str) -> Iterator[str]:
+    """Yield the lowercased word tokens of ``text`` without building a list."""
+    return (match.group() for match in TOKEN_PATTERN.finditer(text.lower()))
+
+
+class Vocabulary:
+    """
+    Interns tokens as consecutive integer IDs.
+
+    Attributes:
+        tokens (List[str]): Tokens indexed by ID
+    """
+
+    def __init__(self, tokens: Iterable[str] = ()):
+        self.tokens: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for token in tokens:
+            self.add(token)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._ids
+
+    def add(self, token: str) -> int:
+        """Return the ID of ``token``, assigning a new one if needed."""
+        token_id = self._ids.get(token)
+        if token_id is None:
+            token_id = self._ids[token] = len(self.tokens)
+            self.tokens.append(token)
+        return token_id
+
+    def get(self, token: str) -> Optional[int]:
+        """Return the ID of ``token``, or None if it is unknown."""
+        return self._ids.get(token)
+
+    def encode(self, tokens: Iterable[str]) -> np.ndarray:
+        """Intern ``tokens`` and return their IDs as a ``uint32`` array."""
+        ids = self._ids
+        vocab = self.tokens
+        def intern(token):
+            token_id = ids.get(token)
+            if token_id is None:
+                token_id = ids[token] = len(vocab)
+                vocab.append(token)
+            return token_id
+        return np.fromiter(map(intern, tokens), dtype=np.uint32)
+
+    def lookup(self, tokens: Iterable[str]) -> np.ndarray:
+        """Return the IDs of ``tokens`` as ``int64``, with -1 for unknown tokens."""
+        get = self._ids.get
+        return np.fromiter((get(token, -1) for token in tokens), dtype=np.int64)
+
+    def decode(self, ids: Iterable[int]) -> Ngram:
+        """Map IDs back to a tuple of tokens."""
+        tokens = self.tokens
+        return tuple(tokens[i] for i in ids)
+
+
+class KeyCodec:
+    """
+    Packs rows of n token IDs into sortable fixed-width keys.
+
+    Args:
+        n: Number of tokens per key
+        vocab_size: Number of distinct token IDs the keys must represent
+    """
+
+    def __init__(self, n: int, vocab_size: int):
+        self.n = n
+        self.bits = max(1, (max(vocab_size, 1) - 1).bit_length())
+        self.packed = n * self.bits <= 64
+        if self.packed:
+            self.dtype = np.dtype(np.uint64)
+            self.id_limit = 1 << self.bits
+        else:
+            self.dtype = np.dtype((np.void, 4 * n))
+            self.id_limit = 1 << 32
+
+    def same_layout(self, other: 'KeyCodec') -> bool:
+        """Whether keys of ``other`` can be compared with keys of this codec."""
+        return self.n == other.n and self.packed == other.packed and (
+            not self.packed or self.bits == other.bits)
+
+    def fits(self, vocab_size: int) -> bool:
+        """Whether keys of this codec can hold IDs of a vocabulary this size."""
+        return vocab_size <= self.id_limit
+
+    def pack(self, windows: np.ndarray) -> np.ndarray:
+        """Pack a ``(m, n)`` array of token IDs into ``m`` keys."""
+        if self.packed:
+            keys = np.zeros(len(windows), dtype=np.uint64)
+            for column in range(self.n):
+                keys <<= np.uint64(self.bits)
+                keys |= windows[:, column].astype(np.uint64)
+            return keys
+        rows = np.ascontiguousarray(windows, dtype='>u4')
+        return rows.view(self.dtype).reshape(len(windows))
+
+    def unpack(self, keys: np.ndarray) -> np.ndarray:
+        """Unpack keys into a ``(m, n)`` ``uint32`` array of token IDs."""
+        if self.packed:
+            mask = np.uint64((1 << self.bits) - 1)
+            windows = np.empty((len(keys), self.n), dtype=np.uint32)
+            for column in range(self.n):
+                shift = np.uint64(self.bits * (self.n - 1 - column))
+                windows[:, column] = (keys >> shift) & mask
+            return windows
+        rows = np.ascontiguousarray(keys).view('>u4').reshape(len(keys), self.n)
+        return rows.astype(np.uint32)
+
+
+def ngram_windows(ids: np.ndarray, n: int) -> np.ndarray:
+    """Return a read-only ``(len(ids) - n + 1, n)`` view of all n-gram windows."""
+    if len(ids) < n:
+        return np.empty((0, n), dtype=np.uint32)
+    return np.lib.stride_tricks.sliding_window_view(ids, n)
+
+
+def reduce_counts(keys: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sort ``keys`` and sum the counts of equal keys."""
+    if len(keys) == 0:
+        return keys, counts.astype(np.int64)
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    counts = counts[order]
+    starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+    return keys[starts], np.add.reduceat(counts, starts).astype(np.int64)
+
+
+class NgramTable(Mapping):
+    """
+    Sorted, integer-keyed n-gram counts with a ``Counter``-like interface.
+
+    Looking up a missing n-gram returns 0, as with ``collections.Counter``.
+
+    Attributes:
+        n (int): Size of the n-grams
+        vocab (Vocabulary): Vocabulary the keys are encoded against
+        codec (KeyCodec): Key packing used by ``keys``
+        keys (np.ndarray): Sorted, unique n-gram keys
+        counts (np.ndarray): ``int64`` count of each key
+    """
+
+    def __init__(self, n: int, vocab: Vocabulary, codec: KeyCodec,
+                 keys: np.ndarray, counts: np.ndarray, total: Optional[int] = None):
+        self.n = n
+        self.vocab = vocab
+        self.codec = codec
+        self.keys = keys
+        self.counts = counts
+        self._total = total
+
+    @classmethod
+    def from_ids(cls, n: int, ids: np.ndarray, vocab: Vocabulary) -> 'NgramTable':
+        """Count the n-grams of a token ID sequence."""
+        codec = KeyCodec(n, len(vocab))
+        keys, counts = np.unique(codec.pack(ngram_windows(ids, n)), return_counts=True)
+        return cls(n, vocab, codec, keys, counts.astype(np.int64))
+
+    @classmethod
+    def from_counts(cls, counts: Mapping, n: Optional[int] = None,
+                    vocab: Optional[Vocabulary] = None) -> 'NgramTable':
+        """
+        Build a table from a mapping of token tuples to counts, e.g. a ``Counter``.
+
+        Args:
+            counts: N-gram counts
+            n: Size of the n-grams; taken from the first n-gram if omitted
+            vocab: Vocabulary to intern tokens into; a new one if omitted
+        """
+        vocab = vocab if vocab is not None else Vocabulary()
+        if n is None:
+            n = len(next(iter(counts), ('',)))
+        ngrams = list(counts)
+        ids = vocab.encode(token for ngram in ngrams for token in ngram).reshape(len(ngrams), n)
+        codec = KeyCodec(n, len(vocab))
+        values = np.fromiter((counts[ngram] for ngram in ngrams), dtype=np.int64, count=len(ngrams))
+        keys, values = reduce_counts(codec.pack(ids), values)
+        return cls(n, vocab, codec, keys, values)
+
+    @classmethod
+    def empty(cls, n: int, vocab: Optional[Vocabulary] = None) -> 'NgramTable':
+        """Return a table with no n-grams."""
+        vocab = vocab if vocab is not None else Vocabulary()
+        codec = KeyCodec(n, len(vocab))
+        return cls(n, vocab, codec, np.empty(0, dtype=codec.dtype), np.empty(0, dtype=np.int64))
+
+    @property
+    def total(self) -> int:
+        """Total number of n-gram occurrences."""
+        if self._total is None:
+            self._total = int(self.counts.sum())
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __iter__(self) -> Iterator[Ngram]:
+        decode = self.vocab.decode
+        for row in self.codec.unpack(self.keys).tolist():
+            yield decode(row)
+
+    def __contains__(self, ngram: object) -> bool:
+        return self._position(ngram) is not None
+
+    def __getitem__(self, ngram: Ngram) -> int:
+        position = self._position(ngram)
+        return 0 if position is None else int(self.counts[position])
+
+    def get(self, ngram: Ngram, default=None):
+        position = self._position(ngram)
+        return default if position is None else int(self.counts[position])
+
+    def values(self) -> Iterator[int]:
+        return iter(self.counts.tolist())
+
+    def items(self) -> Iterator[Tuple[Ngram, int]]:
+        return zip(iter(self), self.counts.tolist())
+
+    def most_common(self, k: Optional[int] = None) -> List[Tuple[Ngram, int]]:
+        """Return the ``k`` most frequent n-grams, like ``Counter.most_common``."""
+        if k is None or k >= len(self):
+            top = np.argsort(-self.counts, kind='stable')
+        elif k <= 0:
+            return []
+        else:
+            # Every n-gram tied with the k-th is a candidate, so ties at the
+            # cutoff are broken by key order like the rest
+            kth = np.partition(self.counts, len(self) - k)[len(self) - k]
+            top = np.flatnonzero(self.counts >= kth)
+            top = top[np.lexsort((top, -self.counts[top]))][:k]
+        rows = self.codec.unpack(self.keys[top]).tolist()
+        return [(self.vocab.decode(row), int(self.counts[i])) for row, i in zip(rows, top)]
+
+    def encode(self, ngrams: Sequence[Ngram]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Encode n-grams as keys of this table without adding to the vocabulary.
+
+        Returns:
+            ``(keys, known)``: the keys and a mask of n-grams whose tokens are
+            all in the vocabulary (keys of the others are meaningless)
+        """
+        ids = self.vocab.lookup(token for ngram in ngrams for token in ngram)
+        ids = ids.reshape(len(ngrams), self.n)
+        # IDs added to a shared vocabulary after this table was built cannot
+        # occur in it and may not fit its key width
+        valid = (ids >= 0) & (ids < self.codec.id_limit)
+        return self.codec.pack(np.where(valid, ids, 0)), valid.all(axis=1)
+
+    def lookup(self, keys: np.ndarray) -> np.ndarray:
+        """Return the count of each key, 0 for keys not in the table."""
+        if len(self.keys) == 0:
+            return np.zeros(len(keys), dtype=np.int64)
+        positions = np.searchsorted(self.keys, keys)
+        positions[positions == len(self.keys)] = 0
+        found = self.keys[positions] == keys
+        return np.where(found, self.counts[positions], 0)
+
+    def lookup_table(self, other: 'NgramTable') -> np.ndarray:
+        """Return the count in this table of each n-gram of ``other``, in its key order."""
+        ids = other.codec.unpack(other.keys).astype(np.int64)
+        if other.vocab is not self.vocab:
+            ids = self.vocab.lookup(other.vocab.tokens)[ids]
+        valid = ((ids >= 0) & (ids < self.codec.id_limit)).all(axis=1)
+        keys = self.codec.pack(np.where(valid[:, None], ids, 0))
+        return np.where(valid, self.lookup(keys), 0)
+
+    def merge(self, other: 'NgramTable') -> 'NgramTable':
+        """
+        Return a table with the summed counts of this table and ``other``.
+
+        The result uses this table's vocabulary, extended with any tokens
+        only ``other`` knows about.
+        """
+        return merge_tables([self, other])
+
+    def to_counter(self) -> Counter:
+        """Convert to a ``collections.Counter`` of token tuples."""
+        return Counter(dict(self.items()))
+
+    def _position(self, ngram: object) -> Optional[int]:
+        if not isinstance(ngram, tuple) or len(ngram) != self.n or not len(self.keys):
+            return None
+        ids = [self.vocab.get(token) for token in ngram]
+        if None in ids or max(ids) >= self.codec.id_limit:
+            return None
+        key = self.codec.pack(np.array([ids], dtype=np.uint32))
+        position = int(np.searchsorted(self.keys, key)[0])
+        if position < len(self.keys) and self.keys[position] == key[0]:
+            return position
+        return None
+
+
+def merge_tables(tables: Sequence[NgramTable]) -> NgramTable:
+    """
+    Sum the counts of several tables of the same n.
+
+    The result uses the first table's vocabulary, extended with the tokens of
+    the others, and a key width wide enough for the grown vocabulary.
+    """
+    first = tables[0]
+    n, vocab = first.n, first.vocab
+    windows = []
+    for table in tables:
+        if table.n != n:
+            raise ValueError(f"Cannot merge {n}-grams with {table.n}-grams")
+        if table.vocab is not vocab:
+            remap = vocab.encode(table.vocab.tokens)
+            windows.append(remap[table.codec.unpack(table.keys)])
+        else:
+            windows.append(None)
+    codec = first.codec if first.codec.fits(len(vocab)) else KeyCodec(n, len(vocab))
+    keys = []
+    for table, remapped in zip(tables, windows):
+        if remapped is not None:
+            keys.append(codec.pack(remapped))
+        elif table.codec.same_layout(codec):
+            keys.append(table.keys)
+        else:
+            keys.append(codec.pack(table.codec.unpack(table.keys)))
+    if len(tables) == 1:
+        return NgramTable(n, vocab, codec, keys[0], first.counts)
+    keys, counts = reduce_counts(np.concatenate(keys),
+                                 np.concatenate([table.counts for table in tables]))
+    return NgramTable(n, vocab, codec, keys, counts)
+
+
+def count_ngrams(n: int, text: Union[str, Iterable[str]],
+                 vocab: Optional[Vocabulary] = None) -> NgramTable:
+    """
+    Count the n-grams of a text without materializing them.
+
+    Args:
+        n: Size of n-grams
+        text: Raw text (tokenized like ``build_ngram_model``) or an iterable
+            of tokens
+        vocab: Vocabulary to intern tokens into; a new one if omitted
+
+    Returns:
+        An NgramTable of the counts
+    """
+    if n < 1:
+        raise ValueError("n must be at least 1")
+    vocab = vocab if vocab is not None else Vocabulary()
+    tokens = iter_tokens(text) if isinstance(text, str) else text
+    return NgramTable.from_ids(n, vocab.encode(tokens), vocab)
@@ -1,24 +1,46 @@
 import sys
-import re
-import collections
-import math
-from typing import List, Tuple, Dict
+from typing import List, Optional, Tuple, Dict
 import argparse
+import os
+
+from .counting import NgramTable, Vocabulary, iter_tokens
+from .parallel import count_ngrams_parallel
+from .scoring import PerplexityScorer
+from .smoothing import KneserNeyModel
+from .storage import load_model, save_model
+from .streaming import count_ngrams_stream, read_chunks, split_counts
 
 def generate_ngrams(n, words):
     """Generate n-grams from a list of words."""
     print(f"Generating {n}-grams from {len(words)} words...")
     return [tuple(words[i:i+n]) for i in range(len(words) - n + 1)]
 
-def build_ngram_model(n, text):
-    """Build an unsmoothed n-gram model (frequency count) from the given text."""
+def build_ngram_model(n, text) -> NgramTable:
+    """
+    Build an unsmoothed n-gram model (frequency count) from the given text.
+    
+    Tokens are interned to integer IDs and n-grams counted as packed integer
+    keys, so no per-n-gram Python objects are created. The result supports
+    the ``collections.Counter`` interface used elsewhere in this module.
+    """
     print("Tokenizing text...")
     # Tokenize text: convert to lowercase and extract words
-    tokens = re.findall(r'\w+', text.lower())
-    print(f"Generated {len(tokens)} tokens.")
-    ngrams = generate_ngrams(n, tokens)
-    print(f"Generated {len(ngrams)} {n}-grams.")
-    return collections.Counter(ngrams)
+    vocab = Vocabulary()
+    ids = vocab.encode(iter_tokens(text))
+    print(f"Generated {len(ids)} tokens.")
+    model = NgramTable.from_ids(n, ids, vocab)
+    print(f"Generated {max(len(ids) - n + 1, 0)} {n}-grams.")
+    return model
+
+def train_ngram_model(n, text) -> KneserNeyModel:
+    """
+    Train an interpolated Kneser-Ney language model of order n on the given text.
+    
+    Unlike the frequency counts of ``build_ngram_model``, the model gives
+    conditional probabilities P(word | previous n-1 words) interpolated
+    across all orders 1..n, so its perplexities can be used to rank texts.
+    """
+    return KneserNeyModel(build_ngram_model(n, text))
 
 def calculate_probabilities(model: Dict[Tuple[str, ...], int]) -> Dict[Tuple[str, ...], float]:
     """Calculate probabilities from n-gram counts."""
@@ -31,6 +53,9 @@ def calculate_perplexity(test_text: str, model: Dict[Tuple[str, ...], int], n: i
     Calculate perplexity of test_text given the n-gram model.
     Uses a small smoothing value for unseen n-grams to avoid infinite perplexity.
     
+    To score many texts against one model, build a ``PerplexityScorer``
+    once and call ``score`` or ``score_many`` instead.
+    
     Args:
         test_text: Text to calculate perplexity for
         model: N-gram frequency counts
@@ -40,79 +65,119 @@ def calculate_perplexity(test_text: str, model: Dict[Tuple[str, ...], int], n: i
     Returns:
         Perplexity value
     """
-    # Get probabilities from counts
-    probs = calculate_probabilities(model)
-    
-    # Tokenize test text
-    tokens = re.findall(r'\w+', test_text.lower())
-    test_ngrams = generate_ngrams(n, tokens)
-    
-    if not test_ngrams:
-        return float('inf')
-    
-    # Calculate log probability
-    total_log_prob = 0
-    total_ngrams = len(test_ngrams)
-    
-    for ngram in test_ngrams:
-        # Use smoothing_value for unseen n-grams
-        prob = probs.get(ngram, smoothing_value)
-        total_log_prob += math.log2(prob)
-    
-    # Calculate perplexity: 2^(-1/N * sum(log2(P(wi|w1...wi-1))))
-    avg_log_prob = total_log_prob / total_ngrams
-    perplexity = math.pow(2, -avg_log_prob)
+    return PerplexityScorer(model, n, smoothing_value).score(test_text)
+
+def calculate_table_perplexity(test_counts: NgramTable, model: NgramTable,
+                               smoothing_value: float = 1e-10) -> float:
+    """
+    Calculate perplexity of held-out n-gram counts given the n-gram model.
+
+    Equivalent to ``calculate_perplexity`` on the text ``test_counts`` was
+    counted from, without needing the text.
+
+    Args:
+        test_counts: N-gram counts of the test text
+        model: N-gram frequency counts
+        smoothing_value: Small value to use for unseen n-grams
+
+    Returns:
+        Perplexity value
+    """
+    return PerplexityScorer(model, smoothing_value=smoothing_value).score_counts(test_counts)
+
+def print_top_ngrams(model: NgramTable, n: int, k: int = 10) -> None:
+    """Print the total count and the ``k`` most common n-grams of a model."""
+    total = model.total
+    print(f"\nTotal {n}-grams: {total}\n")
     
-    return perplexity
+    print(f"Top {k} most common n-grams (unsmoothed probabilities):\n")
+    for gram, count in model.most_common(k):
+        prob = count / total
+        print(f"{gram}: {prob:.4f} ({count} occurrences)")
+
+def train(argv: Optional[List[str]] = None):
+    """Count the n-grams of a corpus file, optionally across worker processes."""
+    parser = argparse.ArgumentParser(prog='train', description='Count n-grams of a corpus file')
+    parser.add_argument('n', type=int, nargs='?', default=2, help='Size of n-grams')
+    parser.add_argument('--file', '-f', type=str, required=True, help='Input file')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes (default: all cores)')
+    parser.add_argument('--output', '-o', type=str, help='Save the model to this file')
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(args.file):
+        print(f"Error: {args.file} not found.")
+        sys.exit(1)
+
+    print(f"Counting {args.n}-grams with {args.workers} worker(s)...")
+    model = count_ngrams_parallel(args.file, args.n, workers=args.workers)
+    if args.output:
+        save_model(model, args.output)
+        print(f"Saved model to {args.output}")
+    print_top_ngrams(model, args.n)
+
+def score(argv: Optional[List[str]] = None):
+    """Report the perplexity of a text under a saved model, without retraining."""
+    parser = argparse.ArgumentParser(prog='score', description='Score text with a saved model')
+    parser.add_argument('--model', '-m', type=str, required=True, help='Model file from train -o')
+    parser.add_argument('--file', '-f', type=str, help='Input file (default: stdin)')
+    args = parser.parse_args(argv)
+
+    try:
+        model = load_model(args.model)
+        source = open(args.file, 'r', encoding='utf-8') if args.file else sys.stdin
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    with source:
+        test_counts = count_ngrams_stream(model.n, read_chunks(source))
+    perplexity = calculate_table_perplexity(test_counts, model)
+    print(f"Perplexity: {perplexity:.2f}")
+
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['train']:
+        return train(argv[1:])
+    if argv[:1] == ['score']:
+        return score(argv[1:])
 
-def main():
     # Parse arguments
     parser = argparse.ArgumentParser(description='Analyze n-grams in text')
     parser.add_argument('n', type=int, nargs='?', default=2, help='Size of n-grams')
     parser.add_argument('--file', '-f', type=str, help='Input file (default: stdin)')
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
-    # Read input
+    # Stream the input in chunks instead of reading it whole
     if args.file:
         try:
-            with open(args.file, 'r', encoding='utf-8') as f:
-                text = f.read()
+            source = open(args.file, 'r', encoding='utf-8')
         except FileNotFoundError:
             print(f"Error: {args.file} not found.")
             sys.exit(1)
     else:
         # Read from stdin
-        text = sys.stdin.read()
+        source = sys.stdin
+
+    print("Building the n-gram model...")
+    # Split tokens into training (90%) and test (10%) sets by position
+    with source:
+        counts = split_counts(args.n, read_chunks(source))
 
-    if not text:
+    if not counts.characters:
         print("Error: No input text provided.")
         sys.exit(1)
 
-    print(f"Read {len(text)} characters.")
-    print("Building the n-gram model...")
-    
-    # Split text into training (90%) and test (10%) sets
-    words = re.findall(r'\w+', text.lower())
-    split_point = int(len(words) * 0.9)
-    train_text = ' '.join(words[:split_point])
-    test_text = ' '.join(words[split_point:])
-    
-    # Build model on training text
-    train_model = build_ngram_model(args.n, train_text)
-    
-    # Calculate perplexity on test text
-    perplexity = calculate_perplexity(test_text, train_model, args.n)
+    print(f"Read {counts.characters} characters.")
+    print(f"Generated {counts.tokens} tokens.")
+
+    # Calculate perplexity on test set with the model built on training set
+    perplexity = calculate_table_perplexity(counts.test, counts.train)
     print(f"\nPerplexity on test set: {perplexity:.2f}")
+    kn_perplexity = KneserNeyModel(counts.train).score_counts(counts.test)
+    print(f"Kneser-Ney perplexity on test set: {kn_perplexity:.2f}")
     
-    model = build_ngram_model(args.n, text)
-    total = sum(model.values())
-    print(f"\nTotal {args.n}-grams: {total}\n")
-    
-    print("Top 10 most common n-grams (unsmoothed probabilities):\n")
-    probs = calculate_probabilities(model)
-    for gram, count in model.most_common(10):
-        prob = probs[gram]
-        print(f"{gram}: {prob:.4f} ({count} occurrences)")
+    print_top_ngrams(counts.full, args.n)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,120 @@
+"""
+Multi-process n-gram counting over byte-range shards of a corpus file.
+
+The file is cut into byte ranges whose boundaries are moved forward to the
+next ASCII non-word byte. Such a byte is never part of a token and never
+inside a multi-byte UTF-8 character, so every token lies wholly inside one
+shard. Each worker counts the n-grams *starting* in its shard, reading up
+to n-1 tokens past its end to complete them, so every n-gram is counted by
+exactly one worker. Merging the per-shard tables in shard order interns the
+tokens in the same order as a serial pass, so the merged table is
+identical to ``count_ngrams`` on the whole text.
+"""
+
+import codecs
+import itertools
+import multiprocessing
+import os
+import re
+from typing import Iterator, List, Optional, Tuple
+
+from .counting import NgramTable, merge_tables
+from .streaming import DEFAULT_CHUNK_SIZE, StreamingNgramCounter, iter_chunk_tokens
+
+# ASCII bytes outside [A-Za-z0-9_]
+_SEPARATOR = re.compile(rb'[^A-Za-z0-9_\x80-\xff]')
+
+
+def shard_offsets(path: str, shards: int) -> List[int]:
+    """
+    Split a file into at most ``shards`` byte ranges aligned on token boundaries.
+
+    Returns:
+        Increasing offsets ``[0, ..., size]``; shard ``i`` is the range
+        ``offsets[i]:offsets[i + 1]``
+    """
+    size = os.path.getsize(path)
+    offsets = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, shards):
+            position = max(size * i // shards, offsets[-1])
+            f.seek(position)
+            while True:
+                block = f.read(1 << 16)
+                if not block:
+                    position = size
+                    break
+                separator = _SEPARATOR.search(block)
+                if separator:
+                    position += separator.start()
+                    break
+                position += len(block)
+            if position > offsets[-1]:
+                offsets.append(position)
+    if size > offsets[-1]:
+        offsets.append(size)
+    return offsets
+
+
+def read_text_range(path: str, start: int, end: Optional[int] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Yield the decoded text of the bytes ``start:end`` of a UTF-8 file in chunks."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = None if end is None else end - start
+        while remaining is None or remaining > 0:
+            block = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not block:
+                break
+            if remaining is not None:
+                remaining -= len(block)
+            yield decoder.decode(block)
+    yield decoder.decode(b'', final=True)
+
+
+def count_shard(path: str, start: int, end: int, n: int) -> NgramTable:
+    """Count the n-grams of a file starting in the byte range ``start:end``."""
+    counter = StreamingNgramCounter(n)
+    for tokens in iter_chunk_tokens(read_text_range(path, start, end)):
+        counter.update(tokens)
+    if n > 1:
+        lookahead = itertools.chain.from_iterable(
+            iter_chunk_tokens(read_text_range(path, end, chunk_size=1 << 12)))
+        counter.update(itertools.islice(lookahead, n - 1))
+    return counter.table()
+
+
+def _count_shard(args: Tuple[str, int, int, int]) -> NgramTable:
+    return count_shard(*args)
+
+
+def count_ngrams_parallel(path: str, n: int, workers: Optional[int] = None,
+                          shards: Optional[int] = None) -> NgramTable:
+    """
+    Count the n-grams of a UTF-8 text file across worker processes.
+
+    Args:
+        path: Corpus file
+        n: Size of n-grams
+        workers: Number of processes; all cores if omitted, and 1 counts
+            in this process
+        shards: Number of byte ranges; four per worker if omitted, which
+            evens out shards that tokenize at different speeds
+
+    Returns:
+        An NgramTable identical to counting the whole file serially
+    """
+    if n < 1:
+        raise ValueError("n must be at least 1")
+    workers = workers or os.cpu_count() or 1
+    if shards is None:
+        shards = 4 * workers if workers > 1 else 1
+    offsets = shard_offsets(path, shards)
+    tasks = [(path, start, end, n) for start, end in zip(offsets, offsets[1:])]
+    if not tasks:
+        return NgramTable.empty(n)
+    if workers == 1 or len(tasks) == 1:
+        return merge_tables([_count_shard(task) for task in tasks])
+    with multiprocessing.get_context().Pool(min(workers, len(tasks))) as pool:
+        return merge_tables(pool.map(_count_shard, tasks))
@@ -0,0 +1,111 @@
+"""
+Batch perplexity scoring against a fixed n-gram model.
+
+Scoring a text with ``PerplexityScorer`` only tokenizes it, maps tokens to
+IDs and looks up all of its n-grams with one ``searchsorted``; scoring a
+list of documents does the same for all of them at once and splits the
+sums per document with ``np.bincount``. Log probabilities are computed for
+the n-grams found only, so a memory-mapped model (see ``load_model``) is
+read where it is looked up instead of being copied into every process.
+"""
+
+import math
+from collections.abc import Mapping
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .counting import TOKEN_PATTERN, NgramTable, ngram_windows
+
+
+class PerplexityScorer:
+    """
+    Scores texts by the perplexity of their n-grams under a frequency model.
+
+    Uses the same unsmoothed joint n-gram probabilities as
+    ``calculate_perplexity``, with ``smoothing_value`` for unseen n-grams.
+
+    Args:
+        model: N-gram counts, as an NgramTable or a mapping of token tuples
+            to counts
+        n: Size of the n-grams; taken from the model if omitted
+        smoothing_value: Probability assigned to unseen n-grams
+
+    Attributes:
+        model (NgramTable): The model being scored against
+        n (int): Size of the n-grams
+        total (int): Number of n-grams in the model, at least 1
+        unseen_log_prob (float): log2 probability of an unseen n-gram
+    """
+
+    def __init__(self, model: Mapping, n: Optional[int] = None,
+                 smoothing_value: float = 1e-10):
+        if not isinstance(model, NgramTable):
+            model = NgramTable.from_counts(model, n)
+        self.model = model
+        self.n = model.n if n is None else n
+        if self.n != model.n:
+            raise ValueError(f"Cannot score {self.n}-grams with a {model.n}-gram model")
+        self.total = max(model.total, 1)
+        self.unseen_log_prob = math.log2(smoothing_value)
+
+    def score(self, text: str) -> float:
+        """Return the perplexity of ``text``, or infinity if it has no n-grams."""
+        return float(self.score_many([text])[0])
+
+    def score_many(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Score many documents in one batch.
+
+        N-grams never span two documents.
+
+        Args:
+            texts: Documents to score
+
+        Returns:
+            ``float64`` perplexity of each document, infinity for documents
+            with fewer than n tokens
+        """
+        documents = [TOKEN_PATTERN.findall(text.lower()) for text in texts]
+        lengths = np.fromiter(map(len, documents), dtype=np.int64, count=len(documents))
+        ids = self.model.vocab.lookup(token for document in documents for token in document)
+        document_of = np.repeat(np.arange(len(documents)), lengths)
+
+        windows = ngram_windows(ids, self.n)
+        starts = np.arange(len(windows))
+        inside = document_of[starts] == document_of[starts + self.n - 1]
+        log_probs = self._log_probs(windows[inside])
+        owners = document_of[starts[inside]]
+
+        sums = np.bincount(owners, weights=log_probs, minlength=len(documents))
+        counts = np.bincount(owners, minlength=len(documents))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            perplexities = np.exp2(-sums / counts)
+        perplexities[counts == 0] = np.inf
+        return perplexities
+
+    def score_counts(self, test_counts: NgramTable) -> float:
+        """Return the perplexity of a text given as its n-gram counts."""
+        if not test_counts.total:
+            return float('inf')
+        ids = test_counts.codec.unpack(test_counts.keys).astype(np.int64)
+        if test_counts.vocab is not self.model.vocab:
+            ids = self.model.vocab.lookup(test_counts.vocab.tokens)[ids]
+        total_log_prob = float(np.dot(test_counts.counts, self._log_probs(ids)))
+        return math.pow(2, -total_log_prob / test_counts.total)
+
+    def _log_probs(self, windows: np.ndarray) -> np.ndarray:
+        """log2 probability of each row of token IDs; -1 marks unknown tokens."""
+        model = self.model
+        result = np.full(len(windows), self.unseen_log_prob)
+        if not len(model.keys) or not len(windows):
+            return result
+        known = ((windows >= 0) & (windows < model.codec.id_limit)).all(axis=1)
+        keys = model.codec.pack(windows[known])
+        positions = np.searchsorted(model.keys, keys)
+        positions[positions == len(model.keys)] = 0
+        found = model.keys[positions] == keys
+        known_log_probs = np.full(len(keys), self.unseen_log_prob)
+        known_log_probs[found] = np.log2(model.counts[positions[found]] / self.total)
+        result[known] = known_log_probs
+        return result
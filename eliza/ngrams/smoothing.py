@@ -0,0 +1,204 @@
+"""
+Interpolated Kneser-Ney n-gram language model.
+
+The model keeps one count table per order 1..n, all encoded against the
+same vocabulary: raw counts for the highest order and continuation counts
+(the number of distinct words seen before each lower-order n-gram) for the
+others, all derived from the highest-order table. For each order it also
+keeps, per history, the total count and the number of distinct words that
+follow it. Because every table is sorted by token ID, those per-history
+figures are contiguous runs and are found without hashing.
+
+A conditional probability is built bottom-up from the unigram
+distribution, one ``searchsorted`` per order, and whole batches of tokens
+are scored at once.
+"""
+
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from .counting import TOKEN_PATTERN, KeyCodec, NgramTable, reduce_counts
+
+# Marks history positions before the start of a document
+_PAD = -2
+
+
+def _search(sorted_keys: np.ndarray, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the positions of ``keys`` in ``sorted_keys`` and which were found."""
+    if not len(sorted_keys):
+        return np.zeros(len(keys), dtype=np.intp), np.zeros(len(keys), dtype=bool)
+    positions = np.searchsorted(sorted_keys, keys)
+    positions[positions == len(sorted_keys)] = 0
+    return positions, sorted_keys[positions] == keys
+
+
+def _discount(counts: np.ndarray) -> float:
+    """Absolute discount ``n1 / (n1 + 2 * n2)`` from the count-of-counts."""
+    n1 = int(np.count_nonzero(counts == 1))
+    n2 = int(np.count_nonzero(counts == 2))
+    if n1 == 0 or n1 + 2 * n2 == 0:
+        return 0.5
+    return n1 / (n1 + 2 * n2)
+
+
+class _Histories:
+    """Total count and number of distinct continuations of each history."""
+
+    def __init__(self, table: NgramTable):
+        windows = table.codec.unpack(table.keys)
+        history = windows[:, :-1]
+        changes = (history[1:] != history[:-1]).any(axis=1)
+        starts = np.concatenate(([0], np.flatnonzero(changes) + 1)) if len(windows) else \
+            np.empty(0, dtype=np.intp)
+        self.codec = KeyCodec(table.n - 1, len(table.vocab))
+        self.keys = self.codec.pack(history[starts])
+        self.totals = np.add.reduceat(table.counts, starts) if len(starts) else \
+            np.empty(0, dtype=np.int64)
+        self.types = np.diff(np.append(starts, len(windows)))
+
+
+class KneserNeyModel:
+    """
+    Interpolated Kneser-Ney language model over orders 1..n.
+
+    Args:
+        table: Counts of the highest-order n-grams, e.g. from ``count_ngrams``
+
+    Attributes:
+        n (int): Highest order
+        vocab (Vocabulary): Vocabulary shared by all orders
+        orders (List[NgramTable]): Count table of each order, lowest first;
+            continuation counts below the highest order
+        discounts (List[float]): Absolute discount of each order
+        unigram_probs (np.ndarray): Probability of each token ID, with the
+            unknown-token probability last
+    """
+
+    def __init__(self, table: NgramTable):
+        self.n = table.n
+        self.vocab = table.vocab
+        self.vocab_size = len(table.vocab)
+
+        orders = [table]
+        for k in range(self.n - 1, 0, -1):
+            higher = orders[0]
+            codec = KeyCodec(k, self.vocab_size)
+            keys = codec.pack(higher.codec.unpack(higher.keys)[:, 1:])
+            keys, counts = reduce_counts(keys, np.ones(len(keys), dtype=np.int64))
+            orders.insert(0, NgramTable(k, self.vocab, codec, keys, counts))
+        self.orders: List[NgramTable] = orders
+        self.discounts = [_discount(order.counts) for order in orders]
+        self._histories = [None] + [_Histories(order) for order in orders[1:]]
+
+        unigrams = orders[0]
+        total = max(unigrams.total, 1)
+        discount = self.discounts[0]
+        counts = np.zeros(self.vocab_size, dtype=np.float64)
+        counts[unigrams.codec.unpack(unigrams.keys)[:, 0]] = unigrams.counts
+        uniform = discount * len(unigrams) / total / (self.vocab_size + 1)
+        if not unigrams.total:
+            uniform = 1.0 / (self.vocab_size + 1)
+        self.unigram_probs = np.append(np.maximum(counts - discount, 0) / total, 0.0) + uniform
+
+    def prob(self, word: str, context: Sequence[str] = ()) -> float:
+        """
+        Return P(word | context).
+
+        Args:
+            word: Predicted token
+            context: Preceding tokens; only the last n-1 are used
+        """
+        history = list(context)[-(self.n - 1):] if self.n > 1 else []
+        ids = self._ids(history + [word])
+        row = np.full((1, self.n), _PAD, dtype=np.int64)
+        row[0, self.n - len(ids):] = ids
+        return float(np.exp2(self._log_probs(row)[0]))
+
+    def score(self, text: str) -> float:
+        """Return the perplexity of ``text``, or infinity if it has no tokens."""
+        return float(self.score_many([text])[0])
+
+    def score_many(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Return the perplexity of each document.
+
+        Every token is predicted from the up to n-1 tokens before it in the
+        same document.
+        """
+        documents = [TOKEN_PATTERN.findall(text.lower()) for text in texts]
+        lengths = np.fromiter(map(len, documents), dtype=np.int64, count=len(documents))
+        ids = self._ids(token for document in documents for token in document)
+        document_of = np.repeat(np.arange(len(documents)), lengths)
+
+        positions = np.arange(len(ids))
+        contexts = np.empty((len(ids), self.n), dtype=np.int64)
+        for column in range(self.n):
+            source = positions - (self.n - 1 - column)
+            clipped = np.maximum(source, 0)
+            same = (source >= 0) & (document_of[clipped] == document_of)
+            contexts[:, column] = np.where(same, ids[clipped] if len(ids) else 0, _PAD)
+
+        log_probs = self._log_probs(contexts)
+        sums = np.bincount(document_of, weights=log_probs, minlength=len(documents))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            perplexities = np.exp2(-sums / lengths)
+        perplexities[lengths == 0] = np.inf
+        return perplexities
+
+    def score_counts(self, test_counts: NgramTable) -> float:
+        """
+        Return the perplexity of held-out n-gram counts of this model's order.
+
+        Each n-gram contributes the probability of its last token given the
+        others, so the first n-1 tokens of the held-out text are not scored.
+        """
+        if test_counts.n != self.n:
+            raise ValueError(f"Cannot score {test_counts.n}-grams with a {self.n}-gram model")
+        if not test_counts.total:
+            return float('inf')
+        windows = test_counts.codec.unpack(test_counts.keys).astype(np.int64)
+        if test_counts.vocab is not self.vocab:
+            windows = self._ids(test_counts.vocab.tokens)[windows]
+        else:
+            windows[windows >= self.vocab_size] = -1
+        log_prob = float(np.dot(test_counts.counts, self._log_probs(windows)))
+        return float(np.exp2(-log_prob / test_counts.total))
+
+    def _ids(self, tokens: Iterable[str]) -> np.ndarray:
+        ids = self.vocab.lookup(tokens)
+        ids[ids >= self.vocab_size] = -1
+        return ids
+
+    def _log_probs(self, contexts: np.ndarray) -> np.ndarray:
+        """
+        log2 P(last column | other columns) for rows of token IDs.
+
+        Unknown tokens are -1 and history positions before the start of the
+        text are ``_PAD``.
+        """
+        words = contexts[:, -1]
+        probs = self.unigram_probs[np.where(words >= 0, words, self.vocab_size)]
+        for k in range(2, self.n + 1):
+            grams = contexts[:, self.n - k:]
+            usable = (grams[:, :-1] >= 0).all(axis=1)
+            if not usable.any():
+                continue
+            rows = np.flatnonzero(usable)
+            grams = grams[rows]
+            histories = self._histories[k - 1]
+            positions, found = _search(histories.keys, histories.codec.pack(grams[:, :-1]))
+            rows, grams, positions = rows[found], grams[found], positions[found]
+
+            order = self.orders[k - 1]
+            # IDs added to a shared vocabulary after the counts were taken
+            # cannot occur in them and may not fit the table's key width
+            known = (grams[:, -1] >= 0) & (grams < order.codec.id_limit).all(axis=1)
+            counts = np.zeros(len(rows), dtype=np.float64)
+            counts[known] = order.lookup(order.codec.pack(grams[known]))
+            totals = histories.totals[positions].astype(np.float64)
+            types = histories.types[positions]
+            discount = self.discounts[k - 1]
+            probs[rows] = (np.maximum(counts - discount, 0) / totals
+                           + discount * types / totals * probs[rows])
+        return np.log2(probs)
@@ -0,0 +1,193 @@
+"""
+Compact binary n-gram model files, memory-mapped on load.
+
+Layout (little-endian, sections 8-byte aligned)::
+
+    header     magic, version, n, key layout, vocabulary size, number of
+               keys, total count and token blob size (64 bytes)
+    offsets    uint64[vocab_size + 1] byte offsets of each token in the blob
+    tokens     UTF-8 tokens sorted bytewise; a token's ID is its rank
+    keys       sorted n-gram keys, packed as by ``KeyCodec``
+    counts     int64 count of each key
+
+Loading parses the header and wraps the sections in NumPy arrays backed by
+a read-only ``mmap``, so it takes constant time whatever the model size,
+and processes scoring with the same file share its pages through the OS
+page cache. Tokens are found by binary search over the sorted blob.
+"""
+
+import bisect
+import mmap
+import os
+import struct
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from .counting import KeyCodec, Ngram, NgramTable
+
+MAGIC = b'ELIZANGM'
+VERSION = 1
+
+_HEADER = struct.Struct('<8sIIIIQQQQ')
+_HEADER_SIZE = 64
+
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class _TokenBytes(Sequence):
+    """The sorted token blob as a sequence of ``bytes``, for ``bisect``."""
+
+    def __init__(self, buffer, offsets: np.ndarray, start: int):
+        self._buffer = buffer
+        self._offsets = offsets
+        self._start = start
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        start = self._start + int(self._offsets[index])
+        end = self._start + int(self._offsets[index + 1])
+        return self._buffer[start:end]
+
+
+class _TokenStrings(Sequence):
+    """Decoded view of ``_TokenBytes``, standing in for ``Vocabulary.tokens``."""
+
+    def __init__(self, blob: _TokenBytes):
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._blob)
+
+    def __getitem__(self, index: int) -> str:
+        if not 0 <= index < len(self._blob):
+            raise IndexError(index)
+        return self._blob[index].decode('utf-8')
+
+
+class MappedVocabulary:
+    """
+    Read-only vocabulary stored as a sorted token blob in a mapped file.
+
+    Offers the lookup side of ``Vocabulary``; new tokens cannot be added.
+
+    Attributes:
+        tokens (Sequence[str]): Tokens indexed by ID, decoded on access
+    """
+
+    def __init__(self, buffer, offsets: np.ndarray, start: int):
+        self._blob = _TokenBytes(buffer, offsets, start)
+        self.tokens = _TokenStrings(self._blob)
+
+    def __len__(self) -> int:
+        return len(self._blob)
+
+    def __contains__(self, token: str) -> bool:
+        return self.get(token) is not None
+
+    def get(self, token: str) -> Optional[int]:
+        """Return the ID of ``token``, or None if it is unknown."""
+        encoded = token.encode('utf-8')
+        index = bisect.bisect_left(self._blob, encoded)
+        if index < len(self._blob) and self._blob[index] == encoded:
+            return index
+        return None
+
+    def lookup(self, tokens: Iterable[str]) -> np.ndarray:
+        """Return the IDs of ``tokens`` as ``int64``, with -1 for unknown tokens."""
+        get = self.get
+        ids = (get(token) for token in tokens)
+        return np.fromiter((-1 if i is None else i for i in ids), dtype=np.int64)
+
+    def decode(self, ids: Iterable[int]) -> Ngram:
+        """Map IDs back to a tuple of tokens."""
+        tokens = self.tokens
+        return tuple(tokens[i] for i in ids)
+
+    def encode(self, tokens: Iterable[str]) -> np.ndarray:
+        raise TypeError("A mapped vocabulary is read-only")
+
+    def add(self, token: str) -> int:
+        raise TypeError("A mapped vocabulary is read-only")
+
+
+def save_model(table: NgramTable, path: str) -> None:
+    """
+    Write an n-gram table to a binary model file.
+
+    Token IDs are renumbered in bytewise token order and the keys re-sorted
+    accordingly. The file is written next to ``path`` and moved into place,
+    so readers never see a partial model.
+
+    Args:
+        table: Counts to save
+        path: Destination file
+    """
+    encoded = [token.encode('utf-8') for token in table.vocab.tokens]
+    order = sorted(range(len(encoded)), key=encoded.__getitem__)
+    rank = np.empty(len(encoded), dtype=np.uint32)
+    rank[order] = np.arange(len(encoded), dtype=np.uint32)
+
+    codec = KeyCodec(table.n, len(encoded))
+    keys = codec.pack(rank[table.codec.unpack(table.keys)])
+    sort = np.argsort(keys, kind='stable')
+    keys, counts = keys[sort], table.counts[sort]
+
+    offsets = np.zeros(len(encoded) + 1, dtype='<u8')
+    np.cumsum([len(encoded[i]) for i in order], out=offsets[1:])
+    blob = b''.join(encoded[i] for i in order)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        header = _HEADER.pack(MAGIC, VERSION, table.n, int(codec.packed), codec.bits,
+                              len(encoded), len(keys), table.total, len(blob))
+        f.write(header.ljust(_HEADER_SIZE, b'\0'))
+        f.write(offsets.tobytes())
+        f.write(blob)
+        f.write(b'\0' * (_aligned(f.tell()) - f.tell()))
+        f.write(keys.astype('<u8').tobytes() if codec.packed else keys.tobytes())
+        f.write(counts.astype('<i8').tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_model(path: str) -> NgramTable:
+    """
+    Memory-map a model file written by ``save_model``.
+
+    Args:
+        path: Model file
+
+    Returns:
+        A read-only NgramTable whose vocabulary, keys and counts live in
+        the mapped file
+
+    Raises:
+        ValueError: If the file is not a model file of a supported version
+    """
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(buffer) < _HEADER_SIZE:
+        raise ValueError(f"{path} is not an n-gram model file")
+    magic, version, n, packed, bits, vocab_size, size, total, blob_size = \
+        _HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not an n-gram model file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported model file version {version}")
+    codec = KeyCodec(n, vocab_size)
+    if codec.packed != bool(packed) or (codec.packed and codec.bits != bits):
+        raise ValueError(f"{path} has an inconsistent key layout")
+
+    offsets = np.frombuffer(buffer, dtype='<u8', count=vocab_size + 1, offset=_HEADER_SIZE)
+    blob_start = _HEADER_SIZE + offsets.nbytes
+    keys_start = _aligned(blob_start + blob_size)
+    keys = np.frombuffer(buffer, dtype='<u8' if codec.packed else codec.dtype,
+                         count=size, offset=keys_start)
+    counts = np.frombuffer(buffer, dtype='<i8', count=size, offset=keys_start + keys.nbytes)
+
+    vocab = MappedVocabulary(buffer, offsets, blob_start)
+    return NgramTable(n, vocab, codec, keys, counts, total=total)
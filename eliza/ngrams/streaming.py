@@ -0,0 +1,197 @@
+"""
+Streaming n-gram counting for corpora larger than memory.
+
+Text is read in fixed-size chunks and tokenized chunk by chunk; a word cut
+by a chunk boundary is carried over and completed by the next chunk. Token
+IDs are counted incrementally by ``StreamingNgramCounter``, which keeps the
+last n-1 IDs of each update so n-grams spanning updates are counted exactly
+once. The counts are identical to tokenizing the whole text at once.
+"""
+
+import re
+import tempfile
+from typing import IO, Iterable, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from .counting import TOKEN_PATTERN, NgramTable, Vocabulary, merge_tables
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# A word touching the end of a chunk may continue in the next one
+_TRAILING_WORD = re.compile(r'\w+\Z')
+
+
+def read_chunks(source: IO[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Yield successive chunks of at most ``chunk_size`` characters from ``source``."""
+    return iter(lambda: source.read(chunk_size), '')
+
+
+def iter_chunk_tokens(chunks: Iterable[str]) -> Iterator[List[str]]:
+    """
+    Tokenize a stream of text chunks like ``iter_tokens`` tokenizes one text.
+
+    Args:
+        chunks: Consecutive pieces of the text
+
+    Yields:
+        The lowercased tokens completed by each chunk
+    """
+    carry = ''
+    for chunk in chunks:
+        text = carry + chunk.lower()
+        trailing = _TRAILING_WORD.search(text)
+        if trailing:
+            carry = trailing.group()
+            text = text[:trailing.start()]
+        else:
+            carry = ''
+        yield TOKEN_PATTERN.findall(text)
+    if carry:
+        yield [carry]
+
+
+class StreamingNgramCounter:
+    """
+    Counts n-grams of a token stream fed in pieces.
+
+    Per-update counts are buffered and merged into the running table once
+    the buffer outgrows it, so merging costs amortized linear time.
+
+    Args:
+        n: Size of n-grams
+        vocab: Vocabulary to intern tokens into; a new one if omitted
+
+    Attributes:
+        n (int): Size of n-grams
+        vocab (Vocabulary): Vocabulary the counts are encoded against
+        tokens (int): Number of tokens seen
+        head (np.ndarray): The first n-1 token IDs seen
+        carry (np.ndarray): The last n-1 token IDs seen
+    """
+
+    def __init__(self, n: int, vocab: Optional[Vocabulary] = None):
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        self.n = n
+        self.vocab = vocab if vocab is not None else Vocabulary()
+        self.tokens = 0
+        self.head = np.empty(0, dtype=np.uint32)
+        self.carry = np.empty(0, dtype=np.uint32)
+        self._table = NgramTable.empty(n, self.vocab)
+        self._pending: List[NgramTable] = []
+        self._pending_size = 0
+
+    def update(self, tokens: Iterable[str]) -> None:
+        """Count the n-grams ending in ``tokens``."""
+        self.update_ids(self.vocab.encode(tokens))
+
+    def update_ids(self, ids: np.ndarray) -> None:
+        """Count the n-grams ending in a sequence of token IDs."""
+        if not len(ids):
+            return
+        self.tokens += len(ids)
+        if len(self.head) < self.n - 1:
+            self.head = np.concatenate([self.head, ids[:self.n - 1 - len(self.head)]])
+        ids = np.concatenate([self.carry, ids]) if len(self.carry) else ids
+        self.carry = ids[-(self.n - 1):].copy() if self.n > 1 else self.carry
+        if len(ids) < self.n:
+            return
+        counts = NgramTable.from_ids(self.n, ids, self.vocab)
+        self._pending.append(counts)
+        self._pending_size += len(counts)
+        if self._pending_size >= max(len(self._table), 1 << 16):
+            self._flush()
+
+    def table(self) -> NgramTable:
+        """Return the counts so far."""
+        self._flush()
+        return self._table
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._table = merge_tables([self._table] + self._pending)
+            self._pending = []
+            self._pending_size = 0
+
+
+def count_ngrams_stream(n: int, chunks: Iterable[str],
+                        vocab: Optional[Vocabulary] = None) -> NgramTable:
+    """
+    Count the n-grams of a text given as a stream of chunks.
+
+    Args:
+        n: Size of n-grams
+        chunks: Consecutive pieces of the text, e.g. from ``read_chunks``
+        vocab: Vocabulary to intern tokens into; a new one if omitted
+
+    Returns:
+        An NgramTable of the counts
+    """
+    counter = StreamingNgramCounter(n, vocab)
+    for tokens in iter_chunk_tokens(chunks):
+        counter.update(tokens)
+    return counter.table()
+
+
+class SplitCounts(NamedTuple):
+    """N-gram counts of a corpus split into training and test tokens."""
+
+    train: NgramTable
+    test: NgramTable
+    full: NgramTable
+    characters: int
+    tokens: int
+
+
+def split_counts(n: int, chunks: Iterable[str], train_fraction: float = 0.9,
+                 chunk_tokens: int = DEFAULT_CHUNK_SIZE) -> SplitCounts:
+    """
+    Count n-grams of the first ``train_fraction`` of a text's tokens and of the rest.
+
+    The text is tokenized once; the token IDs are spilled to a temporary
+    file (4 bytes per token) because the split point is only known once the
+    whole input has been read, which also makes this work for stdin. The
+    full-text counts are the train and test counts plus the n-1 n-grams
+    spanning the split.
+
+    Args:
+        n: Size of n-grams
+        chunks: Consecutive pieces of the text
+        train_fraction: Fraction of tokens to count as training data
+        chunk_tokens: Token IDs read back from the spill file at a time
+
+    Returns:
+        A SplitCounts whose tables share one vocabulary
+    """
+    vocab = Vocabulary()
+    characters = tokens = 0
+
+    def measured(chunks):
+        nonlocal characters
+        for chunk in chunks:
+            characters += len(chunk)
+            yield chunk
+
+    with tempfile.TemporaryFile() as spill:
+        for words in iter_chunk_tokens(measured(chunks)):
+            ids = vocab.encode(words)
+            tokens += len(ids)
+            spill.write(ids.tobytes())
+        spill.seek(0)
+
+        split = int(tokens * train_fraction)
+        train = StreamingNgramCounter(n, vocab)
+        test = StreamingNgramCounter(n, vocab)
+        position = 0
+        while position < tokens:
+            ids = np.fromfile(spill, dtype=np.uint32, count=chunk_tokens)
+            if position < split:
+                train.update_ids(ids[:split - position])
+            test.update_ids(ids[max(split - position, 0):])
+            position += len(ids)
+
+    boundary = NgramTable.from_ids(n, np.concatenate([train.carry, test.head]), vocab)
+    train_table, test_table = train.table(), test.table()
+    full = merge_tables([train_table, test_table, boundary])
+    return SplitCounts(train_table, test_table, full, characters, tokens)
@@ -2,6 +2,21 @@
 Utility functions for the ELIZA chatbot.
 """
 
-from .text_processing import normalize_text, extract_keywords, detect_emotion
+from typing import TYPE_CHECKING
 
-__all__ = ['normalize_text', 'extract_keywords', 'detect_emotion']
+from .._lazy import lazy_exports
+
+__all__ = ['normalize_text', 'extract_keywords', 'detect_emotion', 'Corpus',
+           'load_corpus_text']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'normalize_text': '..core.analysis',
+    'extract_keywords': '..core.analysis',
+    'detect_emotion': '..core.analysis',
+    'Corpus': '.text_processing',
+    'load_corpus_text': '.text_processing',
+})
+
+if TYPE_CHECKING:
+    from ..core.analysis import detect_emotion, extract_keywords, normalize_text
+    from .text_processing import Corpus, load_corpus_text
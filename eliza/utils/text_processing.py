@@ -1,11 +1,14 @@
-from typing import List, Union, Pattern
+from typing import Dict, Iterator, List, Optional, Tuple, Union, Pattern, Match
 import re
+import mmap
+import itertools
 from pathlib import Path
 import functools
 
 # Cache compiled patterns
 ALPHA_PATTERN = re.compile(r"[a-zA-Z]+")
 WORD_START_PATTERN = re.compile(r'^[A-Za-z]+')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
 
 @functools.lru_cache(maxsize=128)
 def compile_pattern(pattern: str) -> Pattern:
@@ -44,33 +47,292 @@ def load_corpus_text(filepath: Union[str, Path] = "shakes.txt",
         return text.splitlines()
     return text.split()
 
-def get_alphabetic_strings(file_path: Union[str, Path] = "shakes.txt") -> List[str]:
+class Corpus:
+    """
+    A text file loaded at most once, with its word and line views cached.
+    
+    Views are built on first use. With ``use_mmap``, the file is mapped
+    instead of read, and ``iter_lines`` streams lines straight from the
+    mapping without ever decoding the whole text, so a query that only
+    scans lines needs memory for one line at a time.
+    
+    Args:
+        filepath: Path to the text file
+        use_mmap: Map the file instead of reading it
+        encoding: Text encoding of the file
+    
+    Raises:
+        FileNotFoundError: If file doesn't exist
+    """
+    
+    def __init__(self, filepath: Union[str, Path] = "shakes.txt",
+                 use_mmap: bool = False, encoding: str = 'utf-8'):
+        self.filepath = Path(filepath)
+        if not self.filepath.is_file():
+            raise FileNotFoundError(f"File not found: {filepath}")
+        self.use_mmap = use_mmap
+        self.encoding = encoding
+        self._text: Optional[str] = None
+        self._words: Optional[List[str]] = None
+        self._lines: Optional[List[str]] = None
+    
+    @classmethod
+    def from_text(cls, text: str) -> 'Corpus':
+        """Create a corpus from an in-memory string."""
+        corpus = cls.__new__(cls)
+        corpus.filepath = None
+        corpus.use_mmap = False
+        corpus.encoding = 'utf-8'
+        corpus._text = text
+        corpus._words = None
+        corpus._lines = None
+        return corpus
+    
+    @property
+    def text(self) -> str:
+        """The raw text, read on first access."""
+        if self._text is None:
+            try:
+                if self.use_mmap:
+                    with self._mapped() as data:
+                        # Same universal newlines as reading in text mode
+                        text = str(data, self.encoding)
+                        self._text = text.replace('\r\n', '\n').replace('\r', '\n')
+                else:
+                    self._text = self.filepath.read_text(encoding=self.encoding)
+            except IOError as e:
+                raise IOError(f"Error reading file {self.filepath}: {e}")
+        return self._text
+    
+    @property
+    def words(self) -> List[str]:
+        """Whitespace-separated words, as ``load_corpus_text(filepath)``."""
+        if self._words is None:
+            self._words = self.text.split()
+        return self._words
+    
+    @property
+    def lines(self) -> List[str]:
+        """Lines, as ``load_corpus_text(filepath, lines=True)``."""
+        if self._lines is None:
+            self._lines = self.text.splitlines()
+        return self._lines
+    
+    def iter_lines(self) -> Iterator[str]:
+        """
+        Yield the lines of the text in order.
+        
+        Uses the cached lines or text when available; otherwise, with
+        ``use_mmap``, lines are decoded one at a time from the mapping.
+        """
+        if self._lines is not None:
+            return iter(self._lines)
+        if self._text is not None or not self.use_mmap:
+            return iter(self.lines)
+        return self._iter_mapped_lines()
+    
+    def iter_words(self) -> Iterator[str]:
+        """
+        Yield the words of the text in order.
+        
+        Uses the cached words when available; otherwise splits the lines
+        from ``iter_lines`` one at a time.
+        """
+        if self._words is not None:
+            return iter(self._words)
+        return (word for line in self.iter_lines() for word in line.split())
+    
+    def search_lines(self, patterns: Dict[str, Union[str, Pattern]]) -> Iterator[Tuple[str, str, Match]]:
+        """
+        Run several regex queries in a single pass over the lines.
+        
+        Args:
+            patterns: Query names mapped to patterns, applied with ``search``
+        
+        Yields:
+            ``(name, line, match)`` for every line a query matches, in line
+            order and, within a line, in query order
+        """
+        compiled = [(name, compile_pattern(p) if isinstance(p, str) else p)
+                    for name, p in patterns.items()]
+        for line in self.iter_lines():
+            for name, pattern in compiled:
+                match = pattern.search(line)
+                if match:
+                    yield name, line, match
+    
+    def match_words(self, patterns: Dict[str, Union[str, Pattern]]) -> Iterator[Tuple[str, str, Match]]:
+        """
+        Run several regex queries in a single pass over the words.
+        
+        Args:
+            patterns: Query names mapped to patterns, applied with ``fullmatch``
+        
+        Yields:
+            ``(name, word, match)`` for every word a query matches
+        """
+        compiled = [(name, compile_pattern(p) if isinstance(p, str) else p)
+                    for name, p in patterns.items()]
+        for word in self.iter_words():
+            for name, pattern in compiled:
+                match = pattern.fullmatch(word)
+                if match:
+                    yield name, word, match
+    
+    def _mapped(self) -> Union[mmap.mmap, memoryview]:
+        with open(self.filepath, 'rb') as f:
+            if f.seek(0, 2) == 0:
+                # Empty files cannot be mapped
+                return memoryview(b'')
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def _iter_mapped_lines(self) -> Iterator[str]:
+        with self._mapped() as data:
+            start, size = 0, len(data)
+            while start < size:
+                end = data.find(b'\n', start)
+                end = size if end == -1 else end + 1
+                # splitlines per newline-terminated segment matches
+                # splitlines on the whole text, including \r\n and \r
+                yield from str(data[start:end], self.encoding).splitlines()
+                start = end
+
+def _as_corpus(source: Union[str, Path, Corpus]) -> Corpus:
+    """Return ``source`` if it is a Corpus, otherwise load it as one."""
+    return source if isinstance(source, Corpus) else Corpus(source)
+
+def _open_text(filepath: Union[str, Path]):
+    try:
+        return open(filepath, "r", encoding='utf-8')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {filepath}")
+
+def _iter_file_segments(filepath: Union[str, Path]) -> Iterator[str]:
+    """Yield a file's lines with their line endings, in universal newlines mode."""
+    with _open_text(filepath) as f:
+        yield from f
+
+def iter_corpus_lines(source: Union[str, Path, Corpus] = "shakes.txt") -> Iterator[str]:
+    """
+    Lazily yield the lines of a file or corpus, as ``load_corpus_text(lines=True)``.
+    
+    A file is read one line at a time, so memory use does not depend on
+    its size.
+    """
+    if isinstance(source, Corpus):
+        yield from source.iter_lines()
+        return
+    for segment in _iter_file_segments(source):
+        yield from segment.splitlines()
+
+def iter_corpus_words(source: Union[str, Path, Corpus] = "shakes.txt") -> Iterator[str]:
+    """Lazily yield the words of a file or corpus, as ``load_corpus_text()``."""
+    if isinstance(source, Corpus):
+        yield from source.iter_words()
+        return
+    for line in iter_corpus_lines(source):
+        yield from line.split()
+
+def iter_alphabetic_strings(file_path: Union[str, Path, Corpus] = "shakes.txt",
+                            limit: Optional[int] = None) -> Iterator[str]:
+    """Yields words that contain only alphabetic characters, up to ``limit`` of them."""
+    words = (word for word in iter_corpus_words(file_path) if ALPHA_PATTERN.fullmatch(word))
+    return itertools.islice(words, limit)
+
+def iter_alphabetic_strings_lower(file_path: Union[str, Path, Corpus] = "shakes.txt",
+                                  ending: str = "b",
+                                  limit: Optional[int] = None) -> Iterator[str]:
+    """Yields lowercase words ending with a specified letter, up to ``limit`` of them."""
+    pattern = compile_pattern(fr"^[a-z]+{ending}$")
+    lowered = (word.lower() for word in iter_corpus_words(file_path))
+    return itertools.islice((word for word in lowered if pattern.fullmatch(word)), limit)
+
+def iter_alphabet_words_pair(file_path: Union[str, Path, Corpus] = "shakes.txt",
+                             preceding: str = "a",
+                             following: str = "b",
+                             limit: Optional[int] = None) -> Iterator[str]:
+    """Yields words starting with ``preceding`` and ending with ``following``, up to ``limit``."""
+    pattern = compile_pattern(fr"^{preceding}[a-zA-Z]*{following}$")
+    words = (word for word in iter_corpus_words(file_path) if pattern.match(word))
+    return itertools.islice(words, limit)
+
+def iter_consecutive_repeated_words(file_path: Union[str, Path, Corpus] = "shakes.txt",
+                                    limit: Optional[int] = None) -> Iterator[str]:
+    """Yields lines with consecutive repeated words, up to ``limit`` of them."""
+    pattern = compile_pattern(r"(\b\w+\b)\s+\1\b")
+    lines = (line for line in iter_corpus_lines(file_path) if pattern.search(line))
+    return itertools.islice(lines, limit)
+
+def iter_integer_start_word_end(file_path: Union[str, Path, Corpus] = "shakes.txt",
+                                max_lines: int = 500) -> Iterator[str]:
+    """
+    Yields lines that start with a number and end with a word.
+    
+    Stops reading after the first ``max_lines`` lines.
+    """
+    # Equivalent to r"^[0-9]+(\b.*\b)+[A-Za-z]+$" (one repetition of the
+    # group matches whenever several do) without its exponential backtracking
+    pattern = compile_pattern(r"^[0-9]+\b.*\b[A-Za-z]+$")
+    lines = itertools.islice(iter_corpus_lines(file_path), max_lines)
+    return (line for line in lines if pattern.match(line))
+
+def iter_find_words(file_path: Union[str, Path, Corpus] = "shakes.txt",
+                    words: tuple = ("raven", "raven"),
+                    limit: Optional[int] = None) -> Iterator[str]:
+    """Yields lines containing the specified words, up to ``limit`` of them."""
+    pattern = compile_pattern(fr"\b({'|'.join(words)})\b.*\b({'|'.join(words)})*\b")
+    lines = (line for line in iter_corpus_lines(file_path) if pattern.search(line))
+    return itertools.islice(lines, limit)
+
+def iter_capture_first_word(file_path: Union[str, Path, Corpus] = "shakes.txt",
+                            limit: Optional[int] = None) -> Iterator[str]:
+    """Yields the first word of each line that starts with one, matching each line once."""
+    matches = map(WORD_START_PATTERN.match, iter_corpus_lines(file_path))
+    return itertools.islice((match.group() for match in matches if match), limit)
+
+def iter_capture_first_word_punc(file_path: Union[str, Path, Corpus] = "shakes.txt",
+                                 limit: Optional[int] = None) -> Iterator[str]:
+    """
+    Yields the text between punctuation marks, stripped, as ``capture_first_word_punc``.
+    
+    A file is read line by line; the piece after the last punctuation mark
+    of a line is carried over, since it may continue on the next line.
+    """
+    if isinstance(file_path, Corpus):
+        segments = iter([file_path.text])
+    else:
+        segments = _iter_file_segments(file_path)
+
+    def pieces():
+        carry = ''
+        for segment in segments:
+            *complete, carry = PUNCTUATION_PATTERN.split(carry + segment)
+            yield from complete
+        yield carry
+
+    stripped = (piece.strip() for piece in pieces())
+    return itertools.islice((piece for piece in stripped if piece), limit)
+
+def get_alphabetic_strings(file_path: Union[str, Path, Corpus] = "shakes.txt") -> List[str]:
     """Returns a list of words that contain only alphabetic characters."""
-    text = load_corpus_text(file_path)
-    return [word for word in text if ALPHA_PATTERN.fullmatch(word)]
+    return list(iter_alphabetic_strings(file_path))
 
-def get_alphabetic_strings_lower(file_path: Union[str, Path] = "shakes.txt", 
+def get_alphabetic_strings_lower(file_path: Union[str, Path, Corpus] = "shakes.txt", 
                                ending: str = "b") -> List[str]:
     """Returns a list of lowercase words ending with a specified letter."""
-    text = load_corpus_text(file_path)
-    pattern = compile_pattern(fr"^[a-z]+{ending}$")
-    return [word.lower() for word in text if pattern.fullmatch(word.lower())]
+    return list(iter_alphabetic_strings_lower(file_path, ending))
 
-def get_alphabet_words_pair(file_path: Union[str, Path] = "shakes.txt", 
+def get_alphabet_words_pair(file_path: Union[str, Path, Corpus] = "shakes.txt", 
                           preceding: str = "a", 
                           following: str = "b") -> List[str]:
     """Finds words that start with a specified preceding letter and end with a specified following letter."""
-    text = load_corpus_text(file_path)
-    pattern = compile_pattern(fr"^{preceding}[a-zA-Z]*{following}$")
-    return [word for word in text if pattern.match(word)]
+    return list(iter_alphabet_words_pair(file_path, preceding, following))
 
-def consecutive_repeated_words(file_path: Union[str, Path] = "shakes.txt") -> List[str]:
+def consecutive_repeated_words(file_path: Union[str, Path, Corpus] = "shakes.txt") -> List[str]:
     """Finds lines with consecutive repeated words."""
-    text = load_corpus_text(file_path, lines=True)
-    pattern = compile_pattern(r"(\b\w+\b)\s+\1\b")
-    return [line for line in text if pattern.search(line)]
+    return list(iter_consecutive_repeated_words(file_path))
 
-def integer_start_word_end(file_path: Union[str, Path] = "shakes.txt", 
+def integer_start_word_end(file_path: Union[str, Path, Corpus] = "shakes.txt", 
                          max_lines: int = 500) -> List[str]:
     """
     Finds lines that start with a number and end with a word.
@@ -82,11 +344,9 @@ def integer_start_word_end(file_path: Union[str, Path] = "shakes.txt",
     Returns:
         List of matching lines
     """
-    text = load_corpus_text(file_path, lines=True)
-    pattern = compile_pattern(r"^[0-9]+(\b.*\b)+[A-Za-z]+$")
-    return [line for line in text[:max_lines] if pattern.match(line)]
+    return list(iter_integer_start_word_end(file_path, max_lines))
 
-def find_words(file_path: Union[str, Path] = "shakes.txt", 
+def find_words(file_path: Union[str, Path, Corpus] = "shakes.txt", 
               words: tuple = ("raven", "raven")) -> List[str]:
     """
     Finds lines containing specified words.
@@ -98,41 +358,35 @@ def find_words(file_path: Union[str, Path] = "shakes.txt",
     Returns:
         List of lines containing the specified words
     """
-    text = load_corpus_text(file_path, lines=True)
-    pattern = compile_pattern(fr"\b({'|'.join(words)})\b.*\b({'|'.join(words)})*\b")
-    return [line for line in text if pattern.search(line)]
+    return list(iter_find_words(file_path, words))
 
-def capture_first_word(file_path: Union[str, Path] = "shakes.txt") -> List[str]:
+def capture_first_word(file_path: Union[str, Path, Corpus] = "shakes.txt") -> List[str]:
     """Captures the first word in each line using pre-compiled pattern."""
-    text = load_corpus_text(file_path, lines=True)
-    return [WORD_START_PATTERN.match(line).group() 
-            for line in text 
-            if WORD_START_PATTERN.match(line)]
+    return list(iter_capture_first_word(file_path))
 
-def capture_first_word_punc(file_path: Union[str, Path] = "shakes.txt") -> List[str]:
+def capture_first_word_punc(file_path: Union[str, Path, Corpus] = "shakes.txt") -> List[str]:
     """Extracts words from text, ignoring punctuation."""
-    text = load_corpus_text(file_path, lines=True, raw=True)
-    words = re.split(r'[^\w\s]', text)
-    return [word.strip() for word in words if word.strip()]
+    return list(iter_capture_first_word_punc(file_path))
 
 if __name__ == "__main__":
     try:
-        # Test all functions with error handling
-        shakespare_text = load_corpus_text()
-        print("First 10 words:", shakespare_text[:10])
+        # Test all functions with error handling; the corpus is read once
+        # and its word and line views shared by every query
+        corpus = Corpus()
+        print("First 10 words:", corpus.words[:10])
         
         print("\nTesting various word patterns:")
         for func in [
             get_alphabetic_strings,
-            lambda: get_alphabetic_strings_lower(ending='b'),
-            lambda: get_alphabet_words_pair(preceding='a', following='b'),
+            lambda c: get_alphabetic_strings_lower(c, ending='b'),
+            lambda c: get_alphabet_words_pair(c, preceding='a', following='b'),
             consecutive_repeated_words,
             integer_start_word_end,
-            lambda: find_words(words=('raven', 'raven')),
+            lambda c: find_words(c, words=('raven', 'raven')),
             capture_first_word
         ]:
             try:
-                result = func()[:5]  # Get first 5 results
+                result = func(corpus)[:5]  # Get first 5 results
                 print(f"\n{func.__name__}:", result)
             except Exception as e:
                 print(f"Error in {func.__name__}: {e}")
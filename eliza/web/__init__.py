@@ -0,0 +1,3 @@
+"""
+Web interfaces for the ELIZA chatbot.
+"""
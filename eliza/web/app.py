@@ -1,85 +1,161 @@
 """
 Web application for the ELIZA chatbot.
+
+Importing this module has no side effects: Flask and Flask-SocketIO are
+imported, and the sessions and metrics set up, by ``create_app``. The
+module's ``app`` and ``socketio`` are created on first access, which is
+what ``flask run`` or a WSGI server given ``eliza.web.app:app`` does.
 """
 
-from flask import Flask, render_template, request, jsonify, send_from_directory
-from flask_socketio import SocketIO
 from datetime import datetime
-import json
+import atexit
+import functools
 import os
 from pathlib import Path
-from ..core.chatbot import Eliza
+from typing import TYPE_CHECKING
+from ..core.journal import SessionJournal, open_journal
+from ..core.metrics import default_metrics, render_cache_stats
+from ..core.rulefile import default_rules
+from ..core.sessions import SESSION_ID_PATTERN, sessions_from_env
 
-app = Flask(__name__)
-socketio = SocketIO(app)
-eliza = Eliza()
+if TYPE_CHECKING:
+    from flask import Flask
 
-# Ensure the static and templates directories exist
 STATIC_DIR = Path(__file__).parent / 'static'
 TEMPLATES_DIR = Path(__file__).parent / 'templates'
-STATIC_DIR.mkdir(parents=True, exist_ok=True)
-(STATIC_DIR / 'css').mkdir(exist_ok=True)
-(STATIC_DIR / 'js').mkdir(exist_ok=True)
-TEMPLATES_DIR.mkdir(parents=True, exist_ok=True)
-
-@app.route('/')
-def home():
-    """Render the main chat interface."""
-    try:
-        return render_template('index.html')
-    except Exception as e:
-        app.logger.error(f"Error rendering template: {e}")
-        return "Error loading the chat interface", 500
-
-@app.route('/static/<path:filename>')
-def serve_static(filename):
-    """Serve static files."""
-    return send_from_directory('static', filename)
-
-@app.route('/api/chat', methods=['POST'])
-def chat():
-    """Handle chat messages."""
-    try:
-        data = request.json
-        user_message = data.get('message', '')
-        
-        if user_message.lower() in ['quit', 'exit', 'bye']:
+_journal = None
+
+def get_journal() -> SessionJournal:
+    """Open the session journal on first use, one file per process."""
+    global _journal
+    if _journal is None:
+        _journal = open_journal(os.environ.get('ELIZA_SESSION_JOURNAL', 'eliza_sessions.jsonl'))
+        atexit.register(_journal.close)
+    return _journal
+
+def create_app() -> 'Flask':
+    """
+    Create the Flask application, configured from the environment.
+
+    Returns:
+        The app, with its ``SocketIO`` in ``app.extensions['socketio']``
+    """
+    from flask import Flask, Response, render_template, request, jsonify, send_from_directory
+    from flask_socketio import SocketIO
+    
+    app = Flask(__name__)
+    SocketIO(app)
+    sessions = sessions_from_env(default_rules())
+    metrics = default_metrics()
+    if os.environ.get('ELIZA_METRICS', '1') != '0':
+        metrics.enable()
+    
+    # Ensure the static and templates directories exist
+    STATIC_DIR.mkdir(parents=True, exist_ok=True)
+    (STATIC_DIR / 'css').mkdir(exist_ok=True)
+    (STATIC_DIR / 'js').mkdir(exist_ok=True)
+    TEMPLATES_DIR.mkdir(parents=True, exist_ok=True)
+    
+    @app.route('/')
+    def home():
+        """Render the main chat interface."""
+        try:
+            return render_template('index.html')
+        except Exception as e:
+            app.logger.error(f"Error rendering template: {e}")
+            return "Error loading the chat interface", 500
+
+    @app.route('/static/<path:filename>')
+    def serve_static(filename):
+        """Serve static files."""
+        return send_from_directory('static', filename)
+
+    @app.route('/api/chat', methods=['POST'])
+    def chat():
+        """Handle chat messages."""
+        try:
+            data = request.json
+            user_message = data.get('message', '')
+            session_id = data.get('session_id')
+
+            if user_message.lower() in ['quit', 'exit', 'bye']:
+                return jsonify({
+                    'response': 'Goodbye! Take care of yourself.',
+                    'session_id': session_id,
+                    'timestamp': datetime.now().isoformat()
+                })
+
+            session_id, response = sessions.respond(session_id, user_message)
+
             return jsonify({
-                'response': 'Goodbye! Take care of yourself.',
+                'response': response,
+                'session_id': session_id,
                 'timestamp': datetime.now().isoformat()
             })
-        
-        response = eliza.respond(user_message)
-        
-        return jsonify({
-            'response': response,
-            'timestamp': datetime.now().isoformat()
-        })
-    except Exception as e:
-        app.logger.error(f"Error in chat endpoint: {e}")
-        return jsonify({
-            'error': 'An error occurred processing your message',
-            'timestamp': datetime.now().isoformat()
-        }), 500
-
-@app.route('/api/save-session', methods=['POST'])
-def save_session():
-    """Save the current chat session."""
-    try:
-        data = request.json
-        session_data = data.get('session', [])
-        
-        with open('eliza_session.json', 'w') as f:
-            json.dump(session_data, f, indent=2)
-        
-        return jsonify({'status': 'success'})
-    except Exception as e:
-        app.logger.error(f"Error saving session: {e}")
-        return jsonify({'error': 'Failed to save session'}), 500
+        except Exception as e:
+            app.logger.error(f"Error in chat endpoint: {e}")
+            return jsonify({
+                'error': 'An error occurred processing your message',
+                'timestamp': datetime.now().isoformat()
+            }), 500
+
+    @app.route('/api/save-session', methods=['POST'])
+    def save_session():
+        """
+        Persist new turns of a chat session.
+
+        Expects ``{"session_id", "offset", "turns"}`` where ``turns`` are the
+        entries from position ``offset`` on. Turns the server already has are
+        skipped, so only new turns are appended to the journal. The older
+        ``{"session": [...]}`` full-history payload is still accepted.
+        """
+        try:
+            data = request.json
+            session_id = data.get('session_id')
+            if not session_id or not SESSION_ID_PATTERN.fullmatch(session_id):
+                return jsonify({'error': 'A valid session_id is required'}), 400
+            if 'turns' in data:
+                offset = int(data.get('offset', 0))
+                turns = data['turns']
+            else:
+                offset = 0
+                turns = data.get('session', [])
+
+            session = sessions.get(session_id)
+            with session.lock:
+                skip = max(0, session.saved_turns - offset)
+                get_journal().extend(session_id, offset + skip, turns[skip:])
+                session.saved_turns = max(session.saved_turns, offset + len(turns))
+                saved = session.saved_turns
+
+            return jsonify({'status': 'success', 'saved': saved})
+        except Exception as e:
+            app.logger.error(f"Error saving session: {e}")
+            return jsonify({'error': 'Failed to save session'}), 500
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        """Expose response pipeline statistics in the Prometheus text format."""
+        body = metrics.render_prometheus() + render_cache_stats(default_rules().current.cache.stats())
+        return Response(body, mimetype='text/plain; version=0.0.4')
+    
+    return app
+
+@functools.lru_cache(maxsize=None)
+def default_app() -> 'Flask':
+    """Return the process-wide app, creating it on first use."""
+    return create_app()
+
+def __getattr__(name):
+    if name == 'app':
+        return default_app()
+    if name == 'socketio':
+        return default_app().extensions['socketio']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def main():
     """Main entry point for the web application."""
-    app.run(debug=True, port=5000)
+    default_app().run(debug=True, port=5000)
 
 if __name__ == '__main__':
     main()
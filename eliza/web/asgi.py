@@ -0,0 +1,238 @@
+"""
+Asynchronous (ASGI) serving mode for the ELIZA web interface.
+
+Chat runs over one persistent WebSocket per browser tab at ``/ws``: every
+client frame is a plain-text user message and every server frame is the
+plain-text reply, so there is no per-message HTTP request or JSON envelope.
+The page and its static assets are served from the same application, and
+``/metrics`` exposes response pipeline statistics for Prometheus.
+Since the server sees every turn, it appends them to the session journal
+itself instead of waiting for the client to post them.
+
+Run with ``eliza-asgi`` or any ASGI server, e.g.::
+
+    uvicorn eliza.web.asgi:app
+
+The module-level ``app`` is created on first access, so importing this
+module sets nothing up.
+"""
+
+import argparse
+import asyncio
+import functools
+import mimetypes
+import os
+from pathlib import Path
+from typing import Optional, Union
+from urllib.parse import parse_qs
+
+from ..core.journal import SessionJournal, open_journal
+from ..core.metrics import Metrics, default_metrics, render_cache_stats
+from ..core.rulefile import default_rules
+from ..core.sessions import SESSION_ID_PATTERN, SessionManager, sessions_from_env
+
+STATIC_DIR = Path(__file__).parent / 'static'
+TEMPLATES_DIR = Path(__file__).parent / 'templates'
+QUIT_WORDS = ('quit', 'exit', 'bye')
+GOODBYE = 'Goodbye! Take care of yourself.'
+
+# Close code for connections without a valid session_id (RFC 6455 policy violation)
+POLICY_VIOLATION = 1008
+
+
+async def respond_async(sessions: SessionManager, session_id: str, message: str) -> str:
+    """
+    Answer one chat message for the given session.
+
+    ``Eliza.respond`` is a few microseconds of pure-Python work, so without
+    a session store it runs inline on the event loop rather than paying for
+    a thread hand-off. With a store, answering reads and writes SQLite and
+    may wait for other processes' writes, so it runs in the loop's default
+    executor to keep the loop serving other connections.
+
+    Args:
+        sessions: Session registry to route the message through
+        session_id: ID of the conversation
+        message: The user's message
+
+    Returns:
+        ELIZA's reply
+    """
+    if message.strip().lower() in QUIT_WORDS:
+        return GOODBYE
+    if sessions.store is None:
+        return sessions.respond(session_id, message)[1]
+    loop = asyncio.get_running_loop()
+    return (await loop.run_in_executor(None, sessions.respond, session_id, message))[1]
+
+
+def render_index() -> bytes:
+    """Render the chat page with static URLs resolved for this app."""
+    html = (TEMPLATES_DIR / 'index.html').read_text(encoding='utf-8')
+    for asset in ('css/style.css', 'js/app.js'):
+        html = html.replace("{{ url_for('static', filename='%s') }}" % asset,
+                            '/static/' + asset)
+    return html.encode('utf-8')
+
+
+class ElizaASGI:
+    """
+    Minimal ASGI application serving the chat page, static files and ``/ws``.
+
+    Args:
+        sessions: Session registry; a new one is created if omitted
+        journal: Journal new turns are appended to; opened from
+            ``ELIZA_SESSION_JOURNAL`` on first use if omitted, or disabled
+            when False
+        metrics: Registry served at ``/metrics``; defaults to
+            ``default_metrics()``, enabled unless ``ELIZA_METRICS`` is 0
+    """
+
+    def __init__(self, sessions: Optional[SessionManager] = None,
+                 journal: Union[SessionJournal, bool, None] = None,
+                 metrics: Optional[Metrics] = None):
+        self.sessions = sessions if sessions is not None else sessions_from_env(default_rules())
+        if metrics is None:
+            metrics = default_metrics()
+            if os.environ.get('ELIZA_METRICS', '1') != '0':
+                metrics.enable()
+        self.metrics = metrics
+        self._journal = journal
+        self._index: Optional[bytes] = None
+
+    @property
+    def journal(self) -> Optional[SessionJournal]:
+        """
+        The session journal, opened on first use.
+
+        Under ``uvicorn --workers N`` every worker gets a journal file of
+        its own, since only one process may write a journal file.
+        """
+        if self._journal is None:
+            self._journal = open_journal(
+                os.environ.get('ELIZA_SESSION_JOURNAL', 'eliza_sessions.jsonl'))
+        return self._journal or None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'websocket':
+            if scope['path'] == '/ws':
+                await self.websocket_chat(scope, receive, send)
+            else:
+                await send({'type': 'websocket.close', 'code': POLICY_VIOLATION})
+        elif scope['type'] == 'http':
+            await self.http(scope, send)
+        elif scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+
+    async def websocket_chat(self, scope, receive, send):
+        """Serve one WebSocket chat connection until the client disconnects."""
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        session_id = query.get('session_id', [''])[0]
+
+        event = await receive()
+        if event['type'] != 'websocket.connect':
+            return
+        if not SESSION_ID_PATTERN.fullmatch(session_id):
+            await send({'type': 'websocket.close', 'code': POLICY_VIOLATION})
+            return
+        await send({'type': 'websocket.accept'})
+
+        while True:
+            event = await receive()
+            if event['type'] == 'websocket.disconnect':
+                return
+            message = event.get('text')
+            if message is None:
+                message = (event.get('bytes') or b'').decode('utf-8', 'replace')
+            reply = await respond_async(self.sessions, session_id, message)
+            await send({'type': 'websocket.send', 'text': reply})
+            journal = self.journal
+            if journal is not None:
+                # Journal writes may fsync or compact, so they run off the loop too
+                eliza = self.sessions.get(session_id).eliza
+                await asyncio.get_running_loop().run_in_executor(
+                    None, eliza.journal_session, journal, session_id)
+
+    async def http(self, scope, send):
+        """Serve the chat page, static assets and metrics."""
+        path = scope['path']
+        if scope['method'] not in ('GET', 'HEAD'):
+            await self._send_response(send, 405, b'Method Not Allowed')
+        elif path == '/':
+            if self._index is None:
+                self._index = render_index()
+            await self._send_response(send, 200, self._index, 'text/html; charset=utf-8')
+        elif path.startswith('/static/'):
+            await self._send_static(send, path[len('/static/'):])
+        elif path == '/metrics':
+            body = (self.metrics.render_prometheus()
+                    + render_cache_stats(default_rules().current.cache.stats()))
+            await self._send_response(send, 200, body.encode('utf-8'),
+                                      'text/plain; version=0.0.4; charset=utf-8')
+        else:
+            await self._send_response(send, 404, b'Not Found')
+
+    async def lifespan(self, receive, send):
+        """Acknowledge ASGI lifespan startup and shutdown events."""
+        while True:
+            event = await receive()
+            if event['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif event['type'] == 'lifespan.shutdown':
+                if self._journal:
+                    self._journal.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _send_static(self, send, filename: str):
+        root = STATIC_DIR.resolve()
+        path = (root / filename).resolve()
+        if root not in path.parents or not path.is_file():
+            await self._send_response(send, 404, b'Not Found')
+            return
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        body = await asyncio.get_running_loop().run_in_executor(None, path.read_bytes)
+        await self._send_response(send, 200, body, content_type)
+
+    @staticmethod
+    async def _send_response(send, status: int, body: bytes,
+                             content_type: str = 'text/plain; charset=utf-8'):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', content_type.encode('latin-1')),
+                (b'content-length', str(len(body)).encode('latin-1')),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+@functools.lru_cache(maxsize=None)
+def default_app() -> ElizaASGI:
+    """Return the process-wide application, creating it on first use."""
+    return ElizaASGI()
+
+
+def __getattr__(name):
+    if name == 'app':
+        return default_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main():
+    """Run the ASGI application under uvicorn."""
+    parser = argparse.ArgumentParser(description='Serve ELIZA over WebSockets')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("The ASGI mode needs uvicorn: pip install 'modern-eliza[asgi]'")
+    uvicorn.run(default_app(), host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Production serving of the ELIZA web interface with pre-forked workers.
+
+``eliza-serve`` runs the Flask app under gunicorn. The app -- and with it
+the compiled rulebook -- is built once in the master process before the
+workers are forked, and the objects it created are moved out of the
+garbage collector's reach with ``gc.freeze()``, so the workers share those
+memory pages copy-on-write instead of each compiling their own copy.
+
+Conversations live in the memory of whichever worker handles a message,
+so with more than one worker they are shared through a SQLite session store
+(``--session-store``, see ``eliza.core.store``): a worker picks up the
+latest state of a conversation even when the previous message went to
+another worker, and conversations survive worker restarts. The store
+only holds the context and the last few turns of each conversation, and
+workers keep the last ``--history-window`` turns in memory, so neither
+grows with the length of a conversation; full transcripts are kept in the
+session journal.
+
+Each worker handles ``--threads`` requests at a time. Workers are restarted
+gracefully, finishing the requests they have in hand first, when the
+master receives ``SIGHUP`` or after ``--max-requests`` requests; ``SIGTERM``
+shuts the server down gracefully. Rules files (``ELIZA_RULES``) are
+watched by every worker.
+
+Usage:
+    eliza-serve [--bind 0.0.0.0:8000] [--workers 4] [--threads 4]
+"""
+
+import argparse
+import gc
+import os
+from typing import Any, Dict, List, Optional
+
+from ..core.journal import worker_journal_path
+from ..core.rulefile import RuleFile, default_rules
+from ..core.sessions import DEFAULT_HISTORY_WINDOW
+from .app import create_app
+
+DEFAULT_SESSION_STORE = 'eliza_sessions.sqlite3'
+
+
+def preload():
+    """Build the app in the master process and freeze it for sharing with the workers."""
+    app = create_app()
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def post_fork(server, worker) -> None:
+    """Restart what does not survive ``fork`` in a new worker."""
+    rules = default_rules()
+    if isinstance(rules, RuleFile):
+        rules.start()
+    os.environ['ELIZA_SESSION_JOURNAL'] = worker_journal_path(
+        os.environ.get('ELIZA_SESSION_JOURNAL', 'eliza_sessions.jsonl'), os.getpid())
+
+
+def gunicorn_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """Translate the command-line arguments into gunicorn settings."""
+    return {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'preload_app': True,
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests // 10,
+        'post_fork': post_fork,
+        'loglevel': args.log_level,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """Run the web application under gunicorn with pre-forked workers."""
+    parser = argparse.ArgumentParser(description='Serve ELIZA with pre-forked worker processes')
+    parser.add_argument('--bind', '-b', default='127.0.0.1:8000', help='Address to listen on')
+    parser.add_argument('--workers', '-w', type=int,
+                        default=int(os.environ.get('ELIZA_WORKERS', os.cpu_count() or 1)),
+                        help='Worker processes (default: ELIZA_WORKERS or the number of CPUs)')
+    parser.add_argument('--threads', type=int, default=4,
+                        help='Requests each worker handles concurrently')
+    parser.add_argument('--session-store',
+                        default=os.environ.get('ELIZA_SESSION_STORE'),
+                        help='SQLite file sharing conversations between workers (default: '
+                             f'ELIZA_SESSION_STORE, or {DEFAULT_SESSION_STORE} with several workers)')
+    parser.add_argument('--history-window', type=int,
+                        default=int(os.environ.get('ELIZA_HISTORY_WINDOW', DEFAULT_HISTORY_WINDOW)),
+                        help='Turns of each conversation kept in memory (default: '
+                             f'ELIZA_HISTORY_WINDOW or {DEFAULT_HISTORY_WINDOW})')
+    parser.add_argument('--timeout', type=float, default=30,
+                        help='Seconds a worker may spend on a request before it is restarted')
+    parser.add_argument('--graceful-timeout', type=float, default=30,
+                        help='Seconds restarting workers get to finish their requests')
+    parser.add_argument('--max-requests', type=int, default=0,
+                        help='Restart each worker after about this many requests (0: never)')
+    parser.add_argument('--log-level', default='info', help='gunicorn log level')
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.threads < 1 or args.history_window < 1:
+        parser.error('--workers, --threads and --history-window must be at least 1')
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit("Serving needs gunicorn: pip install 'modern-eliza[serve]'")
+
+    store = args.session_store or (DEFAULT_SESSION_STORE if args.workers > 1 else None)
+    if store:
+        os.environ['ELIZA_SESSION_STORE'] = store
+    os.environ['ELIZA_HISTORY_WINDOW'] = str(args.history_window)
+    options = gunicorn_options(args)
+
+    class ElizaServer(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return preload()
+
+    ElizaServer().run()
+
+
+if __name__ == '__main__':
+    main()
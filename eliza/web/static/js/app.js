@@ -3,6 +3,14 @@ document.addEventListener('DOMContentLoaded', () => {
     const userInput = document.getElementById('user-input');
     const chatMessages = document.getElementById('chat-messages');
     let sessionHistory = [];
+    let savedTurns = 0;
+    // Each page load starts a new conversation, matching the cleared chat log
+    let sessionId = newSessionId();
+
+    // Prefer a persistent WebSocket (ASGI mode); fall back to HTTP otherwise
+    let socket = null;
+    const pendingReplies = [];
+    connectSocket();
 
     // Add welcome message
     addMessage('Hello! I\'m Eliza, how can I support you today?', 'eliza');
@@ -20,15 +28,25 @@ document.addEventListener('DOMContentLoaded', () => {
             showTypingIndicator();
 
             try {
+                if (socket && socket.readyState === WebSocket.OPEN) {
+                    const reply = await sendOverSocket(message);
+                    removeTypingIndicator();
+                    addMessage(reply, 'eliza');
+                    return;
+                }
+
                 const response = await fetch('/api/chat', {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
                     },
-                    body: JSON.stringify({ message }),
+                    body: JSON.stringify({ message, session_id: sessionId }),
                 });
 
                 const data = await response.json();
+                if (data.session_id) {
+                    sessionId = data.session_id;
+                }
                 
                 // Remove typing indicator and add ELIZA's response
                 removeTypingIndicator();
@@ -44,6 +62,42 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    function newSessionId() {
+        const bytes = new Uint8Array(16);
+        crypto.getRandomValues(bytes);
+        return Array.from(bytes, (b) => b.toString(16).padStart(2, '0')).join('');
+    }
+
+    function connectSocket() {
+        if (!('WebSocket' in window)) {
+            return;
+        }
+        const scheme = location.protocol === 'https:' ? 'wss' : 'ws';
+        const ws = new WebSocket(`${scheme}://${location.host}/ws?session_id=${sessionId}`);
+        ws.addEventListener('open', () => {
+            socket = ws;
+        });
+        ws.addEventListener('message', (event) => {
+            const resolve = pendingReplies.shift();
+            if (resolve) {
+                resolve(event.data);
+            }
+        });
+        ws.addEventListener('close', () => {
+            socket = null;
+            while (pendingReplies.length) {
+                pendingReplies.shift()('Sorry, I\'m having trouble responding right now.');
+            }
+        });
+    }
+
+    function sendOverSocket(message) {
+        return new Promise((resolve) => {
+            pendingReplies.push(resolve);
+            socket.send(message);
+        });
+    }
+
     function addMessage(text, sender) {
         const messageDiv = document.createElement('div');
         messageDiv.className = `message ${sender}-message`;
@@ -92,14 +146,23 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     async function saveSession() {
+        // Only send the turns the server has not acknowledged yet
+        const turns = sessionHistory.slice(savedTurns);
+        if (!turns.length) {
+            return;
+        }
         try {
-            await fetch('/api/save-session', {
+            const response = await fetch('/api/save-session', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify({ session: sessionHistory }),
+                body: JSON.stringify({ session_id: sessionId, offset: savedTurns, turns }),
             });
+            const data = await response.json();
+            if (typeof data.saved === 'number') {
+                savedTurns = data.saved;
+            }
         } catch (error) {
             console.error('Error saving session:', error);
         }
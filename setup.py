@@ -28,11 +28,18 @@ setup(
         "flask>=3.0.0",
         "flask-socketio>=5.3.6",
         "python-dotenv>=1.0.0",
+        "numpy>=1.20",
     ],
+    extras_require={
+        "asgi": ["uvicorn[standard]>=0.23"],
+        "serve": ["gunicorn>=21"],
+    },
     entry_points={
         "console_scripts": [
             "eliza-cli=eliza.cli:main",
             "eliza-web=eliza.web.app:main",
+            "eliza-asgi=eliza.web.asgi:main",
+            "eliza-serve=eliza.web.serve:main",
         ],
     },
     include_package_data=True,
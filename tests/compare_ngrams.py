@@ -1,95 +1,77 @@
+import argparse
 import sys
-import re
-import collections
-from typing import Dict, List, Tuple
-import pandas as pd
 from pathlib import Path
 
-sys.path.append(str(Path(__file__).parent.parent / 'notebooks'))
-from unsmoothed_ngrams import generate_ngrams
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-def build_ngram_model(n: int, text: str) -> Dict[Tuple[str, ...], int]:
-    """Build an unsmoothed n-gram model from the given text."""
-    tokens = re.findall(r'\w+', text.lower())
-    print(f"Generated {len(tokens)} tokens.")
-    ngrams = generate_ngrams(n, tokens)
-    return collections.Counter(ngrams)
+from eliza.ngrams import compare_ngrams, count_ngrams_stream
+from eliza.ngrams.streaming import read_chunks
 
-def get_ngram_probabilities(model: Dict[Tuple[str, ...], int]) -> Dict[Tuple[str, ...], float]:
-    """Convert counts to probabilities."""
-    total = sum(model.values())
-    return {gram: count/total for gram, count in model.items()}
+ROOT = Path(__file__).parent.parent
 
-def compare_corpora(file1: str, file2: str, n: int = 1) -> None:
+def count_file(path: str, n: int):
+    """Count the n-grams of a file without reading it whole."""
+    with open(path, 'r', encoding='utf-8') as f:
+        model = count_ngrams_stream(n, read_chunks(f))
+    print(f"Counted {model.total} {n}-grams.")
+    return model
+
+def print_rows(rows) -> None:
+    print(f"{'n-gram':<30} {'prob_corpus1':>12} {'count_corpus1':>13} "
+          f"{'prob_corpus2':>12} {'count_corpus2':>13} {'abs_diff':>8}")
+    for ngram, count1, prob1, count2, prob2, diff, _ in rows:
+        print(f"{' '.join(ngram):<30} {prob1:>12.4f} {count1:>13} "
+              f"{prob2:>12.4f} {count2:>13} {diff:>8.4f}")
+
+def compare_corpora(file1: str, file2: str, n: int = 1, output: str = None) -> None:
     """Compare n-gram statistics between two corpora."""
     print(f"\nComparing {n}-grams between corpora...")
     
-    # Read files
-    with open(file1, 'r', encoding='utf-8') as f:
-        text1 = f.read()
-    with open(file2, 'r', encoding='utf-8') as f:
-        text2 = f.read()
-    
-    print(f"\nCorpus 1 length: {len(text1)} characters")
-    print(f"Corpus 2 length: {len(text2)} characters")
-    
     # Build models
     print("\nProcessing Corpus 1...")
-    model1 = build_ngram_model(n, text1)
+    model1 = count_file(file1, n)
     print("\nProcessing Corpus 2...")
-    model2 = build_ngram_model(n, text2)
-    
-    # Convert to probabilities
-    probs1 = get_ngram_probabilities(model1)
-    probs2 = get_ngram_probabilities(model2)
-    
-    # Create comparison dataframe
-    data = []
-    all_ngrams = set(probs1.keys()) | set(probs2.keys())
+    model2 = count_file(file2, n)
     
-    for ngram in all_ngrams:
-        prob1 = probs1.get(ngram, 0)
-        prob2 = probs2.get(ngram, 0)
-        count1 = model1.get(ngram, 0)
-        count2 = model2.get(ngram, 0)
-        diff = abs(prob1 - prob2)
-        
-        data.append({
-            'n-gram': ' '.join(ngram),
-            'prob_corpus1': prob1,
-            'count_corpus1': count1,
-            'prob_corpus2': prob2,
-            'count_corpus2': count2,
-            'abs_diff': diff
-        })
-    
-    df = pd.DataFrame(data)
-    df = df.sort_values('abs_diff', ascending=False)
+    comparison = compare_ngrams(model1, model2)
+    print(f"\nJensen-Shannon divergence: {comparison.js_divergence():.4f} bits")
+    print(f"KL(corpus1 || corpus2): {comparison.kl_divergence():.4f} bits")
     
     # Display results
     print("\nTop 10 most different n-grams between corpora:")
-    print(df.head(10).to_string(index=False, float_format=lambda x: '{:.4f}'.format(x)))
+    print_rows(comparison.top('abs_diff', 10))
     
     print("\nTop 10 most common n-grams in Corpus 1:")
-    top1 = sorted(probs1.items(), key=lambda x: x[1], reverse=True)[:10]
-    for gram, prob in top1:
-        print(f"{' '.join(gram)}: {prob:.4f} ({model1[gram]} occurrences)")
+    for gram, count in model1.most_common(10):
+        print(f"{' '.join(gram)}: {count / model1.total:.4f} ({count} occurrences)")
     
     print("\nTop 10 most common n-grams in Corpus 2:")
-    top2 = sorted(probs2.items(), key=lambda x: x[1], reverse=True)[:10]
-    for gram, prob in top2:
-        print(f"{' '.join(gram)}: {prob:.4f} ({model2[gram]} occurrences)")
+    for gram, count in model2.most_common(10):
+        print(f"{' '.join(gram)}: {count / model2.total:.4f} ({count} occurrences)")
+
+    if output:
+        # Full comparison, most different first, as CSV (or TSV for .tsv files)
+        delimiter = '\t' if output.endswith('.tsv') else ','
+        with open(output, 'w', encoding='utf-8', newline='') as f:
+            order = comparison.top_indices('abs_diff', len(comparison))
+            rows = comparison.write(f, delimiter=delimiter, indices=order)
+        print(f"\nWrote {rows} rows to {output}")
 
 def main():
-    # File paths relative to project root
-    corpus1 = '../corpora_1.txt'
-    corpus2 = '../corpora_2.txt'
-    
-    print("Comparing unigrams (n=1)...")
-    compare_corpora(corpus1, corpus2, n=1)
-    
-    print("\nComparing bigrams (n=2)...")
-    compare_corpora(corpus1, corpus2, n=2)
+    parser = argparse.ArgumentParser(description='Compare n-gram statistics of two corpora')
+    parser.add_argument('corpus1', nargs='?', default=str(ROOT / 'corpora_1.txt'))
+    parser.add_argument('corpus2', nargs='?', default=str(ROOT / 'corpora_2.txt'))
+    parser.add_argument('--output', '-o', type=str,
+                        help='Write the full comparison to this CSV/TSV file (suffixed with n)')
+    args = parser.parse_args()
+
+    for n, name in ((1, 'unigrams'), (2, 'bigrams')):
+        print(f"\nComparing {name} (n={n})...")
+        output = None
+        if args.output:
+            path = Path(args.output)
+            output = str(path.with_name(f"{path.stem}_{n}{path.suffix}"))
+        compare_corpora(args.corpus1, args.corpus2, n=n, output=output)
 
 if __name__ == "__main__":
     main()
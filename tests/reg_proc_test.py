@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+
+from eliza.utils.text_processing import (
+    Corpus,
+    capture_first_word,
+    capture_first_word_punc,
+    consecutive_repeated_words,
+    find_words,
+    get_alphabetic_strings,
+    integer_start_word_end,
+    iter_alphabetic_strings,
+    iter_capture_first_word,
+    iter_capture_first_word_punc,
+    iter_corpus_lines,
+    iter_corpus_words,
+    iter_integer_start_word_end,
+    load_corpus_text,
+)
+
+SAMPLE = ("1 Once upon a midnight dreary\n"
+          "While I pondered, weak and weary, the the raven\r\n"
+          "Quoth the Raven nevermore\n"
+          "\n"
+          "2 and 3 ended with a word\n"
+          "raven raven\n"
+          "  indented line")
+
+
+class TestCorpus(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(SAMPLE)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_views_match_load_corpus_text(self):
+        for use_mmap in (False, True):
+            corpus = Corpus(self.path, use_mmap=use_mmap)
+            self.assertEqual(corpus.words, load_corpus_text(self.path))
+            self.assertEqual(corpus.lines, load_corpus_text(self.path, lines=True))
+            self.assertEqual(corpus.text, load_corpus_text(self.path, raw=True))
+
+    def test_views_are_loaded_once(self):
+        corpus = Corpus(self.path)
+        self.assertIsNone(corpus._text)
+        self.assertIs(corpus.lines, corpus.lines)
+        self.assertIs(corpus.words, corpus.words)
+
+    def test_mapped_lines_stream_without_loading_text(self):
+        corpus = Corpus(self.path, use_mmap=True)
+        self.assertEqual(list(corpus.iter_lines()), load_corpus_text(self.path, lines=True))
+        self.assertIsNone(corpus._text)
+
+    def test_helpers_accept_a_corpus(self):
+        corpus = Corpus(self.path)
+        for func in (get_alphabetic_strings, consecutive_repeated_words,
+                     integer_start_word_end, find_words, capture_first_word):
+            self.assertEqual(func(corpus), func(self.path), func.__name__)
+
+    def test_search_lines_runs_queries_in_one_pass(self):
+        corpus = Corpus(self.path, use_mmap=True)
+        results = corpus.search_lines({'repeat': r"(\b\w+\b)\s+\1\b", 'number': r"^[0-9]+"})
+        self.assertNotIsInstance(results, list)
+        found = [(name, line) for name, line, _ in results]
+        self.assertEqual(found, [
+            ('number', "1 Once upon a midnight dreary"),
+            ('repeat', "While I pondered, weak and weary, the the raven"),
+            ('number', "2 and 3 ended with a word"),
+            ('repeat', "raven raven"),
+        ])
+
+    def test_match_words(self):
+        corpus = Corpus.from_text("Raven raven, nevermore 42 raven")
+        matches = [(name, word) for name, word, _ in
+                   corpus.match_words({'raven': r"[Rr]aven", 'number': r"\d+"})]
+        self.assertEqual(matches, [('raven', 'Raven'), ('number', '42'), ('raven', 'raven')])
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            Corpus(self.path + '.missing')
+
+
+
+class CountingCorpus(Corpus):
+    """In-memory corpus recording how many lines were consumed."""
+
+    def iter_lines(self):
+        self.consumed = 0
+        for line in super().iter_lines():
+            self.consumed += 1
+            yield line
+
+
+class TestStreamingScanners(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(SAMPLE)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_streams_match_loaded_views(self):
+        self.assertEqual(list(iter_corpus_lines(self.path)),
+                         load_corpus_text(self.path, lines=True))
+        self.assertEqual(list(iter_corpus_words(self.path)), load_corpus_text(self.path))
+
+    def test_scanners_are_lazy_and_limited(self):
+        words = iter_alphabetic_strings(self.path, limit=3)
+        self.assertNotIsInstance(words, list)
+        self.assertEqual(list(words), ['Once', 'upon', 'a'])
+        self.assertEqual(list(iter_capture_first_word(self.path, limit=2)), ['While', 'Quoth'])
+
+    def test_max_lines_stops_reading(self):
+        corpus = CountingCorpus.from_text("\n".join(f"{i} line word" for i in range(1000)))
+        self.assertEqual(len(list(iter_integer_start_word_end(corpus, max_lines=10))), 10)
+        self.assertEqual(corpus.consumed, 10)
+
+    def test_punctuation_pieces_span_lines(self):
+        self.assertEqual(list(iter_capture_first_word_punc(self.path)),
+                         capture_first_word_punc(Corpus(self.path)))
+        corpus = Corpus.from_text("one two\nthree, four")
+        self.assertEqual(capture_first_word_punc(corpus), ['one two\nthree', 'four'])
+
+
+if __name__ == '__main__':
+    unittest.main()
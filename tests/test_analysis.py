@@ -0,0 +1,57 @@
+import unittest
+
+from eliza.core.analysis import analyze
+from eliza.core.chatbot import Eliza
+from eliza.core.matcher import WORD_PATTERN
+from eliza.core.rulebook import default_rulebook
+from eliza.utils import detect_emotion, extract_keywords, normalize_text
+
+
+class TestAnalysis(unittest.TestCase):
+    def test_single_pass(self):
+        analysis = analyze("My Mother makes me SAD and angry; I'm feeling lonely at work")
+        self.assertEqual(analysis.tokens,
+                         WORD_PATTERN.findall("my mother makes me sad and angry; i'm feeling lonely at work"))
+        self.assertEqual(analysis.emotions, ('sad', 'angry', 'lonely'))
+        self.assertEqual(analysis.emotion, 'sad')
+        self.assertEqual(analysis.topics, ('family', 'work'))
+        self.assertEqual(analysis.keywords, ['mother', 'sad', 'angry', 'lonely', 'work'])
+        self.assertTrue(analysis.mentions_feelings)
+
+    def test_whole_words_only(self):
+        # Substring scans took "download" for "down" and "made" for "mad"
+        analysis = analyze("I made a download")
+        self.assertIsNone(analysis.emotion)
+        self.assertEqual(analysis.keywords, [])
+
+    def test_utility_functions(self):
+        self.assertEqual(detect_emotion("I'm feeling really anxious about this"), 'anxious')
+        self.assertIsNone(detect_emotion("Nice weather"))
+        self.assertEqual(extract_keywords("my boss and my BOSS's boss"), ['boss'])
+        self.assertEqual(normalize_text("  I'm SO   tired!! "), 'i m so tired')
+
+
+class TestContextFromAnalysis(unittest.TestCase):
+    def test_context_and_matching_share_tokens(self):
+        eliza = Eliza(seed=0)
+        eliza.respond("My father is worried about his job")
+        self.assertEqual(eliza.state.current_emotion, 'anxious')
+        self.assertEqual(eliza.state.current_topic, 'family')
+        self.assertTrue(eliza.state.mentioned_family)
+        self.assertFalse(eliza.state.mentioned_feelings)
+
+        eliza.respond("I feel fine now")
+        self.assertTrue(eliza.state.mentioned_feelings)
+        self.assertEqual(eliza.state.current_emotion, 'anxious')
+
+    def test_precomputed_tokens_match_like_text(self):
+        rulebook = default_rulebook()
+        for text in ["I feel sad today", "My MOTHER is awful", "I need a break", "Hello"]:
+            expected = rulebook.match(text)
+            actual = rulebook.match(text, analyze(text).tokens)
+            self.assertEqual(actual[0], expected[0])
+            self.assertEqual(actual[1].groups(), expected[1].groups())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from eliza.core.journal import SessionJournal
+from eliza.core.sessions import SessionManager
+from eliza.core.store import SqliteSessionStore
+from eliza.web.asgi import ElizaASGI, GOODBYE, POLICY_VIOLATION
+
+
+def run_websocket(app, query_string, messages):
+    """Drive one WebSocket connection through the ASGI app, returning sent events."""
+    events = [{'type': 'websocket.connect'}]
+    events += [{'type': 'websocket.receive', 'text': text} for text in messages]
+    events.append({'type': 'websocket.disconnect', 'code': 1000})
+    sent = []
+
+    async def receive():
+        return events.pop(0)
+
+    async def send(event):
+        sent.append(event)
+
+    scope = {'type': 'websocket', 'path': '/ws', 'query_string': query_string}
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+def run_http(app, path):
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(event):
+        sent.append(event)
+
+    scope = {'type': 'http', 'method': 'GET', 'path': path}
+    asyncio.run(app(scope, receive, send))
+    return sent[0]['status'], sent[1]['body']
+
+
+class TestElizaASGI(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.journal = SessionJournal(Path(self.tmpdir.name) / 'journal.jsonl', fsync=False)
+        self.addCleanup(self.journal.close)
+        self.sessions = SessionManager()
+        self.app = ElizaASGI(self.sessions, self.journal)
+
+    def test_chat_over_websocket(self):
+        sid = 'a' * 32
+        sent = run_websocket(self.app, f'session_id={sid}'.encode(),
+                             ['I feel sad', 'I need a hug', 'bye'])
+        self.assertEqual(sent[0], {'type': 'websocket.accept'})
+        replies = [event['text'] for event in sent[1:]]
+        self.assertEqual(len(replies), 3)
+        self.assertIn('a hug', replies[1])
+        self.assertEqual(replies[2], GOODBYE)
+        self.assertEqual(len(self.sessions.get(sid).eliza.session_history), 4)
+        self.assertEqual(self.journal.sessions()[sid],
+                         self.sessions.get(sid).eliza.session_history)
+
+    def test_blocking_work_runs_off_the_event_loop(self):
+        store = SqliteSessionStore(Path(self.tmpdir.name) / 'sessions.db')
+        threads = set()
+        load = store.load
+        def recording_load(*args):
+            threads.add(threading.get_ident())
+            return load(*args)
+        store.load = recording_load
+        app = ElizaASGI(SessionManager(store=store), self.journal)
+
+        sid = 'b' * 32
+        run_websocket(app, f'session_id={sid}'.encode(), ['I feel sad', 'I need a hug'])
+        self.assertTrue(threads)
+        self.assertNotIn(threading.get_ident(), threads)
+        self.assertEqual(store.load(sid)[0], 4)
+        self.assertEqual(len(self.journal.sessions()[sid]), 4)
+
+    def test_rejects_missing_session_id(self):
+        sent = run_websocket(self.app, b'', ['hello'])
+        self.assertEqual(sent, [{'type': 'websocket.close', 'code': POLICY_VIOLATION}])
+
+    def test_serves_page_and_static_files(self):
+        status, body = run_http(self.app, '/')
+        self.assertEqual(status, 200)
+        self.assertIn(b'/static/js/app.js', body)
+        self.assertNotIn(b'url_for', body)
+
+        status, _ = run_http(self.app, '/static/js/app.js')
+        self.assertEqual(status, 200)
+        status, _ = run_http(self.app, '/static/../asgi.py')
+        self.assertEqual(status, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
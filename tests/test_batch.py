@@ -0,0 +1,103 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from eliza.batch import read_utterances, replay, run_batch
+from eliza.core.chatbot import Eliza
+
+ROOT = Path(__file__).resolve().parent.parent
+
+LINES = [
+    'Hello',
+    '{"conversation_id": "a", "text": "I feel sad"}',
+    '{"conversation_id": "b", "text": "I need a break"}',
+    '',
+    '{"conversation_id": "a", "text": "My mother is awful"}',
+    'I am lonely',
+    '{"conversation_id": "b", "text": "thanks"}',
+]
+
+
+class TestBatch(unittest.TestCase):
+    def test_read_utterances_numbers_turns_per_conversation(self):
+        utterances = list(read_utterances(LINES))
+        self.assertEqual(utterances[0], ('default', 0, 'Hello'))
+        self.assertEqual(utterances[3], ('a', 1, 'My mother is awful'))
+        self.assertEqual(utterances[4], ('default', 1, 'I am lonely'))
+        self.assertEqual(len(utterances), 6)
+
+    def test_seeded_replay_is_reproducible(self):
+        utterances = list(read_utterances(LINES * 20))
+        first = list(replay(utterances, seed=7))
+        second = list(replay(utterances, seed=7))
+        self.assertEqual(first, second)
+
+    def test_worker_count_does_not_change_results(self):
+        utterances = [(f'c{i % 13}', i // 13, text)
+                      for i, text in enumerate(['I feel sad', 'Hello', 'I need tea', 'why?'] * 50)]
+        serial = list(replay(utterances, seed=3))
+        parallel = list(replay(utterances, workers=3, seed=3, chunk_size=7))
+
+        key = lambda r: (r['conversation_id'], r['turn'])
+        self.assertEqual(sorted(serial, key=key), sorted(parallel, key=key))
+        # Turns of each conversation come out in order
+        for conversation in {r['conversation_id'] for r in parallel}:
+            turns = [r['turn'] for r in parallel if r['conversation_id'] == conversation]
+            self.assertEqual(turns, sorted(turns))
+
+    def test_run_batch_writes_json_lines(self):
+        sink = io.StringIO()
+        count = run_batch(io.StringIO('\n'.join(LINES)), sink, seed=1)
+        records = [json.loads(line) for line in sink.getvalue().splitlines()]
+        self.assertEqual(count, 6)
+        self.assertEqual(len(records), 6)
+        self.assertIn('a break', records[2]['response'])
+
+    def test_custom_rules_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            rules = Path(tmpdir) / 'rules.json'
+            rules.write_text(json.dumps({'version': 1, 'rules': [
+                {'pattern': r'(.*)', 'flags': [], 'responses': ['Custom reply']}]}),
+                encoding='utf-8')
+            utterances = list(read_utterances(LINES))
+            for workers in (1, 2):
+                records = list(replay(utterances, workers=workers, seed=1, rules=str(rules)))
+                self.assertEqual([r['response'] for r in records], ['Custom reply'] * 6)
+
+            source = Path(tmpdir) / 'in.txt'
+            source.write_text('I feel sad\n', encoding='utf-8')
+            output = subprocess.run(
+                [sys.executable, '-m', 'eliza.cli', '--rules', str(rules), 'batch', '-i', str(source)],
+                capture_output=True, text=True, check=True, cwd=ROOT,
+                env=dict(os.environ, PYTHONPATH=str(ROOT))).stdout
+            self.assertEqual(json.loads(output)['response'], 'Custom reply')
+
+            # --stats reports the cache of the rulebook the replay used
+            source.write_text('hi\nhello\nhi\n', encoding='utf-8')
+            stderr = subprocess.run(
+                [sys.executable, '-m', 'eliza.cli', '--stats', '--rules', str(rules), 'batch',
+                 '-i', str(source)], capture_output=True, text=True, check=True, cwd=ROOT,
+                env=dict(os.environ, PYTHONPATH=str(ROOT))).stderr
+            self.assertIn('response cache: 2 entries, 33.3% hit rate', stderr)
+
+    def test_stats_rejected_with_worker_processes(self):
+        result = subprocess.run(
+            [sys.executable, '-m', 'eliza.cli', '--stats', 'batch', '--workers', '2'],
+            capture_output=True, text=True, input='', cwd=ROOT,
+            env=dict(os.environ, PYTHONPATH=str(ROOT)))
+        self.assertEqual(result.returncode, 2)
+        self.assertIn('--stats cannot be combined', result.stderr)
+
+    def test_respond_batch(self):
+        responses = list(Eliza(seed=5).respond_batch(['I feel sad', 'I need rest']))
+        self.assertEqual(responses, list(Eliza(seed=5).respond_batch(['I feel sad', 'I need rest'])))
+        self.assertIn('rest', responses[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
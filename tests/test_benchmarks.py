@@ -0,0 +1,55 @@
+import importlib.util
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+RUN_PATH = Path(__file__).parent.parent / 'benchmarks' / 'run.py'
+
+
+def load_runner():
+    spec = importlib.util.spec_from_file_location('benchmarks_run', RUN_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.runner = load_runner()
+        cls.results = cls.runner.run_suite('smoke')
+
+    def test_every_suite_reports(self):
+        suites = {result['suite'] for result in self.results['results']}
+        self.assertEqual(suites, set(self.runner.SUITES))
+        for result in self.results['results']:
+            self.assertGreater(result['median'], 0, result)
+            self.assertEqual(result['unit'], 's')
+        self.assertEqual(self.results['environment']['scale'], 'smoke')
+
+    def test_results_round_trip_and_compare(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'results.json'
+            self.assertEqual(self.runner.main(['--scale', 'smoke', '--only', 'construction',
+                                            '-o', str(path)]), 0)
+            with open(path) as f:
+                saved = json.load(f)
+        self.assertEqual({result['name'] for result in saved['results']},
+                         {'eliza', 'rulebook', 'context_tracker'})
+
+        slower = json.loads(json.dumps(saved))
+        for result in slower['results']:
+            result['median'] *= 2
+        pairs = self.runner.compare(saved, slower)
+        self.assertEqual(len(pairs), 3)
+        self.assertTrue(all(regressed for *_, regressed in pairs))
+        self.assertFalse(any(regressed for *_, regressed in self.runner.compare(slower, saved)))
+
+    def test_rejects_unknown_suite(self):
+        with self.assertRaises(ValueError):
+            self.runner.run_suite('smoke', ['nope'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import re
+import unittest
+
+from eliza.core.cache import ResponseCache
+from eliza.core.chatbot import Eliza
+from eliza.core.context import ContextTracker
+from eliza.core.response_patterns import DEFAULT_PATTERNS, ResponsePattern
+from eliza.core.rulebook import Rulebook
+
+SCRIPT = ["hi", "Hi", "yes", "I need a break", "I NEED a Break", "my mother is awful",
+          "I feel sad", "yes", "no", "thanks", "I need a break", "why?", "hi", "bye",
+          "I am so angry at work", "yes", "I need A BREAK", "thanks"] * 3
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_lru_eviction_and_stats(self):
+        cache = ResponseCache(maxsize=2)
+        cache.put('a', (1, ('x',)))
+        cache.put('b', (2, ('y',)))
+        self.assertEqual(cache.get('a'), (1, ('x',)))
+        cache.put('c', (3, ('z',)))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(len(cache), 2)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (1, 1, 1))
+        self.assertAlmostEqual(stats['hit_rate'], 0.5)
+        self.assertGreater(stats['memory_bytes'], 0)
+        cache.clear()
+        self.assertEqual(cache.stats()['memory_bytes'], 0)
+
+    def test_disabled(self):
+        cache = ResponseCache(maxsize=0)
+        cache.put('a', 1)
+        self.assertIsNone(cache.get('a'))
+
+
+class TestCachedSelection(unittest.TestCase):
+    def test_same_responses_as_uncached(self):
+        cached = Eliza(Rulebook(DEFAULT_PATTERNS), seed=3)
+        uncached = Eliza(Rulebook(DEFAULT_PATTERNS, cache_size=0), seed=3)
+        for text in SCRIPT:
+            self.assertEqual(cached.respond(text), uncached.respond(text), text)
+            self.assertEqual(cached.context, uncached.context)
+        stats = cached.rulebook.cache.stats()
+        self.assertGreater(stats['hits'], len(SCRIPT) // 2)
+        self.assertEqual(uncached.rulebook.cache.stats()['size'], 0)
+
+    def test_groups_come_from_the_actual_input(self):
+        eliza = Eliza(Rulebook(DEFAULT_PATTERNS), seed=0)
+        eliza.respond("I need a break")
+        self.assertIn("A BREAK", eliza.respond("I NEED A BREAK"))
+
+    def test_context_filters_cached_matches(self):
+        rulebook = Rulebook([ResponsePattern(re.compile(r'(.*)'), ["How do you feel?", "Tell me more."])])
+        eliza = Eliza(rulebook, seed=0)
+        eliza.respond("hmm")
+        eliza.respond("I feel sad")
+        self.assertEqual([eliza.respond("hmm"), eliza.respond("hmm")], ["Tell me more."] * 2)
+        self.assertEqual(rulebook.cache.stats()['hits'], 2)
+
+    def test_new_rules_start_with_an_empty_cache(self):
+        rulebook = Rulebook(DEFAULT_PATTERNS)
+        Eliza(rulebook).respond("hi")
+        extended = rulebook.extend([ResponsePattern(re.compile(r'hi', re.IGNORECASE), ["Hello!"])])
+        self.assertEqual(len(extended.cache), 0)
+        self.assertEqual(Eliza(extended).respond("hi"), "Hello!")
+
+    def test_case_sensitive_rules_keep_case_in_keys(self):
+        rulebook = Rulebook([ResponsePattern(re.compile(r'HI'), ["Loud"]),
+                             ResponsePattern(re.compile(r'(.*)'), ["Quiet"])])
+        self.assertEqual(rulebook.cache_key("HI"), "HI")
+        eliza = Eliza(rulebook)
+        self.assertEqual([eliza.respond("HI"), eliza.respond("hi")], ["Loud", "Quiet"])
+        self.assertIsNone(rulebook.cache_key("x" * 1000))
+
+
+class TestCachedAnalysis(unittest.TestCase):
+    def test_repeated_text_reuses_analysis(self):
+        tracker = ContextTracker()
+        first = tracker.analyze("I feel sad about my mother")
+        self.assertIs(tracker.analyze("I feel sad about my mother"), first)
+        self.assertEqual(first, ContextTracker(cache_size=0).analyze("I feel sad about my mother"))
+        self.assertEqual(tracker.cache.stats()['hits'], 1)
+        self.assertIsNot(tracker.analyze("x" * 1000), tracker.analyze("x" * 1000))
+
+
+if __name__ == '__main__':
+    unittest.main()
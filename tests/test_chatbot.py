@@ -0,0 +1,48 @@
+import dataclasses
+import unittest
+
+from eliza.core.chatbot import Eliza
+from eliza.core.rulebook import default_rulebook
+
+
+class TestEliza(unittest.TestCase):
+    def test_conversations_share_the_rulebook(self):
+        first, second = Eliza(), Eliza()
+        self.assertIs(first.rulebook, second.rulebook)
+        self.assertIs(first.rulebook, default_rulebook())
+        self.assertIsNot(first.state, second.state)
+
+    def test_rules_are_read_only(self):
+        rule = default_rulebook().patterns[0]
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            rule.responses = []
+        self.assertIsInstance(rule.responses, tuple)
+
+    def test_state_is_per_conversation(self):
+        sad, calm = Eliza(), Eliza()
+        sad.respond("I am so sad")
+        self.assertEqual(sad.context['current_emotion'], 'sad')
+        self.assertIsNone(calm.context['current_emotion'])
+        self.assertEqual(len(sad.session_history), 2)
+        self.assertEqual(calm.session_history, [])
+
+    def test_usage_is_tracked_per_conversation(self):
+        eliza = Eliza()
+        eliza.respond("I am so sad")
+        eliza.respond("still sad")
+        self.assertEqual(eliza.state.usage_counts, {0: 2})
+        self.assertIn(eliza.state.last_used[0], eliza.responses[0].responses)
+        self.assertEqual(Eliza().state.usage_counts, {})
+
+    def test_capture_groups_are_formatted(self):
+        response = Eliza().respond("I need a break")
+        self.assertIn("a break", response)
+
+    def test_state_has_no_instance_dict(self):
+        eliza = Eliza()
+        self.assertFalse(hasattr(eliza, '__dict__'))
+        self.assertFalse(hasattr(eliza.state, '__dict__'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from eliza.core.chatbot import Eliza
+from eliza.core.context import EMOTION, ContextTracker, Signal
+from eliza.core.conversation import Conversation
+
+
+class TestContextTracker(unittest.TestCase):
+    def setUp(self):
+        self.tracker = ContextTracker(decay=0.5, threshold=0.2)
+        self.state = Conversation()
+
+    def say(self, text):
+        self.tracker.update(self.state, self.tracker.analyze(text))
+
+    def test_one_dictionary_of_signals(self):
+        self.assertEqual(self.tracker.signals['afraid'], (Signal(EMOTION, 'anxious', 1.0),))
+        self.assertIn('boss', self.tracker.signals)
+        self.assertNotIn('made', self.tracker.signals)
+
+    def test_whole_words_only(self):
+        self.say("I made a download")
+        self.assertIsNone(self.state.current_emotion)
+        self.assertEqual(self.state.emotion_weights, {})
+
+    def test_weights_decay_and_fade(self):
+        self.say("I am sad")
+        self.assertEqual(self.state.emotion_weights, {'sad': 1.0})
+        self.say("I am angry")
+        self.assertEqual(self.state.emotion_weights, {'sad': 0.5, 'angry': 1.0})
+        self.assertEqual(self.state.current_emotion, 'angry')
+        self.say("sad sad sad")
+        self.assertEqual(self.state.current_emotion, 'sad')
+        for _ in range(5):
+            self.say("nothing to report")
+        self.assertIsNone(self.state.current_emotion)
+        self.assertEqual(self.state.emotion_weights, {})
+
+    def test_ties_follow_priority(self):
+        self.say("angry and sad at work with my mother")
+        self.assertEqual(self.state.current_emotion, 'sad')
+        self.assertEqual(self.state.current_topic, 'family')
+        self.assertTrue(self.state.mentioned_family)
+
+    def test_keyword_weights(self):
+        tracker = ContextTracker(weights={'furious': 3.0})
+        analysis = tracker.analyze("sad but furious")
+        self.assertEqual(analysis.emotion_scores, {'sad': 1.0, 'angry': 3.0})
+        self.assertEqual(analysis.emotions, ('angry', 'sad'))
+
+    def test_rejects_bad_settings(self):
+        with self.assertRaises(ValueError):
+            ContextTracker(emotions={'odd': r'I need (.*)'})
+        with self.assertRaises(ValueError):
+            ContextTracker(decay=1.0)
+
+    def test_eliza_uses_tracker(self):
+        eliza = Eliza(seed=0, tracker=self.tracker)
+        eliza.respond("My boss makes me anxious")
+        self.assertEqual(eliza.context['current_topic'], 'work')
+        self.assertEqual(eliza.context['emotion_weights'], {'anxious': 1.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import io
+import json
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from eliza.core.chatbot import Eliza
+from eliza.core.history import SessionHistory, Turn
+from eliza.core.journal import SessionJournal
+from eliza.core.sessions import windowed_factory
+
+
+def fill(history, turns):
+    for i in range(turns):
+        history.append('user' if i % 2 == 0 else 'eliza', f"turn {i} é", timestamp=1.7e9 + i)
+
+
+def expected(turns, start=0):
+    return [{'timestamp': datetime.fromtimestamp(1.7e9 + i).isoformat(),
+             'speaker': 'user' if i % 2 == 0 else 'eliza',
+             'text': f"turn {i} é"} for i in range(start, turns)]
+
+
+class TestSessionHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.spill = Path(self.tmpdir.name) / 'spill.jsonl'
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_turns_are_compact(self):
+        turn = Turn(1.7e9, ''.join(['us', 'er']), 'hi')
+        self.assertIs(turn.speaker, 'user')
+        self.assertFalse(hasattr(turn, '__dict__'))
+        self.assertEqual(turn.as_dict()['timestamp'], datetime.fromtimestamp(1.7e9).isoformat())
+
+    def test_unbounded_history(self):
+        history = SessionHistory()
+        fill(history, 10)
+        self.assertEqual(len(history), 10)
+        self.assertEqual(history.to_list(), expected(10))
+
+    def test_window_without_spill_drops_old_turns(self):
+        history = SessionHistory(window=4)
+        fill(history, 10)
+        self.assertEqual((history.in_memory, len(history), history.first), (4, 4, 6))
+        self.assertEqual(history.to_list(), expected(10, start=6))
+        self.assertEqual(list(history.iter_from(8)), expected(10, start=8))
+
+    def test_window_spills_to_disk(self):
+        self.spill.write_text('left by someone else\n')
+        history = SessionHistory(window=3, spill_path=self.spill, spill_every=2)
+        fill(history, 11)
+        self.assertEqual(history.in_memory, 3)
+        self.assertEqual(len(history), 11)
+        self.assertEqual(history.to_list(), expected(11))
+        self.assertEqual(list(history.iter_from(5)), expected(11, start=5))
+        self.assertTrue(self.spill.read_text().startswith('left by someone else\n'))
+
+        history.clear()
+        fill(history, 5)
+        self.assertEqual(history.to_list(), expected(5))
+
+    def test_write_json_matches_json_dump(self):
+        for turns in (0, 1, 7):
+            history = SessionHistory(window=2, spill_path=self.spill)
+            fill(history, turns)
+            out = io.StringIO()
+            history.write_json(out)
+            self.assertEqual(out.getvalue(), json.dumps(expected(turns), indent=2))
+            history.clear()
+
+
+class TestElizaHistory(unittest.TestCase):
+    def test_windowed_factory(self):
+        self.assertIs(windowed_factory(None), Eliza)
+        eliza = windowed_factory(2)()
+        for i in range(3):
+            eliza.respond(f"message {i}")
+        self.assertEqual(eliza.state.history.in_memory, 2)
+        self.assertEqual(eliza.state.history.appended, 6)
+
+    def test_bounded_conversation(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            spill = Path(tmpdir) / 'spill.jsonl'
+            eliza = Eliza(seed=1, history=SessionHistory(window=4, spill_path=spill, spill_every=1))
+            reference = Eliza(seed=1)
+            journal_path = Path(tmpdir) / 'journal.jsonl'
+            with SessionJournal(journal_path, fsync=False) as journal:
+                for i in range(10):
+                    eliza.respond(f"I need message {i}")
+                    reference.respond(f"I need message {i}")
+                    if i == 2:
+                        eliza.journal_session(journal, 's1')
+                eliza.journal_session(journal, 's1')
+                self.assertEqual(eliza.state.history.in_memory, 4)
+                self.assertEqual(len(eliza.session_history), 20)
+                self.assertEqual([entry['text'] for entry in journal.sessions()['s1']],
+                                 [entry['text'] for entry in reference.session_history])
+
+            saved, reference_saved = Path(tmpdir) / 'a.json', Path(tmpdir) / 'b.json'
+            eliza.save_session(str(saved))
+            with open(saved) as f:
+                entries = json.load(f)
+            self.assertEqual(entries, eliza.session_history)
+            self.assertEqual([entry['text'] for entry in entries],
+                             [entry['text'] for entry in reference.session_history])
+            with open(reference_saved, 'w') as f:
+                json.dump(eliza.session_history, f, indent=2)
+            self.assertEqual(saved.read_text(), reference_saved.read_text())
+
+
+if __name__ == '__main__':
+    unittest.main()
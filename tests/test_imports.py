@@ -0,0 +1,62 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative import time allowed for the CLI module, in microseconds
+CLI_IMPORT_BUDGET_US = 50_000
+
+
+def run_python(*args):
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True,
+                          cwd=ROOT, env=env, check=True)
+
+
+class TestImports(unittest.TestCase):
+    def test_cli_import_time(self):
+        timings = []
+        for _ in range(3):
+            stderr = run_python('-X', 'importtime', '-c', 'import eliza.cli').stderr
+            line = [line for line in stderr.splitlines() if line.endswith('| eliza.cli')][-1]
+            timings.append(int(re.split(r'\s*\|\s*', line)[1]))
+        self.assertLess(min(timings), CLI_IMPORT_BUDGET_US, timings)
+
+    def test_imports_are_lazy_and_side_effect_free(self):
+        code = ("import json, sys, threading\n"
+                "import eliza, eliza.cli, eliza.core, eliza.utils, eliza.ngrams, eliza.web.app\n"
+                "print(json.dumps({'modules': [m for m in ('eliza.core.chatbot', 'numpy', 'flask')\n"
+                "                              if m in sys.modules],\n"
+                "                  'threads': threading.active_count()}))")
+        loaded = json.loads(run_python('-c', code).stdout)
+        self.assertEqual(loaded, {'modules': ['eliza.core.chatbot'], 'threads': 1})
+
+        code = "import eliza.cli, sys; print('eliza.core.chatbot' in sys.modules)"
+        self.assertEqual(run_python('-c', code).stdout.strip(), 'False')
+
+    def test_lazy_exports_resolve(self):
+        import eliza
+        import eliza.ngrams
+        from eliza.core.chatbot import Eliza
+        from eliza.ngrams.counting import NgramTable
+        from eliza.utils import detect_emotion
+
+        self.assertIs(eliza.Eliza, Eliza)
+        self.assertIs(eliza.ngrams.NgramTable, NgramTable)
+        self.assertEqual(detect_emotion("I am so sad"), 'sad')
+        self.assertIn('Eliza', dir(eliza))
+        with self.assertRaises(AttributeError):
+            eliza.Missing
+        for package in ('eliza', 'eliza.core', 'eliza.utils', 'eliza.ngrams'):
+            module = __import__(package, fromlist=['__all__'])
+            for name in module.__all__:
+                self.assertIsNotNone(getattr(module, name), f"{package}.{name}")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from eliza.core.chatbot import Eliza
+from eliza.core.journal import (JournalInUse, SessionJournal, open_journal, read_journal,
+                                worker_journal_path)
+
+
+def turn(text, speaker='user'):
+    return {'timestamp': '2024-01-01T00:00:00', 'speaker': speaker, 'text': text}
+
+
+class TestSessionJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = Path(self.tmpdir.name) / 'journal.jsonl'
+
+    def test_appends_are_buffered_and_batched(self):
+        with SessionJournal(self.path, flush_every=3, flush_interval=3600, fsync=False) as journal:
+            journal.append('s1', 0, turn('a'))
+            journal.append('s1', 1, turn('b'))
+            self.assertEqual(list(read_journal(self.path)), [])
+            journal.append('s2', 0, turn('c'))
+            self.assertEqual(len(list(read_journal(self.path))), 3)
+        self.assertEqual(
+            [r['text'] for r in read_journal(self.path)], ['a', 'b', 'c'])
+
+    def test_idle_journal_is_flushed_in_the_background(self):
+        with SessionJournal(self.path, flush_interval=0.05, fsync=False) as journal:
+            journal.append('s1', 0, turn('a'))
+            self.assertEqual(list(read_journal(self.path)), [])
+            deadline = time.monotonic() + 5
+            while not list(read_journal(self.path)) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual([r['text'] for r in read_journal(self.path)], ['a'])
+
+    @unittest.skipIf(os.name != 'posix', "needs fcntl")
+    def test_one_writer_per_file(self):
+        with SessionJournal(self.path, fsync=False) as journal:
+            with self.assertRaises(JournalInUse):
+                SessionJournal(self.path)
+            with open_journal(self.path, fsync=False) as other:
+                self.assertEqual(str(other.path), worker_journal_path(self.path, os.getpid()))
+                other.append('s2', 0, turn('x'))
+            journal.append('s1', 0, turn('a'))
+            journal.compact()
+        # Closing releases the file for the next writer
+        with open_journal(self.path, fsync=False) as journal:
+            self.assertEqual(journal.path, self.path)
+            self.assertEqual(list(journal.sessions()), ['s1'])
+
+    def test_sessions_replay_and_deduplicate(self):
+        with SessionJournal(self.path, fsync=False) as journal:
+            journal.extend('s1', 0, [turn('a'), turn('b')])
+            journal.extend('s2', 0, [turn('x')])
+            journal.extend('s1', 1, [turn('b'), turn('c')])  # overlapping retry
+            sessions = journal.sessions()
+        self.assertEqual([t['text'] for t in sessions['s1']], ['a', 'b', 'c'])
+        self.assertEqual([t['text'] for t in sessions['s2']], ['x'])
+
+    def test_compaction_groups_sessions(self):
+        with SessionJournal(self.path, fsync=False) as journal:
+            journal.extend('s1', 0, [turn('a')])
+            journal.extend('s2', 0, [turn('x')])
+            journal.extend('s1', 0, [turn('a'), turn('b')])
+            journal.compact()
+            records = list(read_journal(self.path))
+            self.assertEqual([(r['session_id'], r['index']) for r in records],
+                             [('s1', 0), ('s1', 1), ('s2', 0)])
+            journal.append('s2', 1, turn('y'))
+        self.assertEqual(len(list(read_journal(self.path))), 4)
+
+    def test_automatic_compaction(self):
+        with SessionJournal(self.path, flush_every=1, fsync=False, compact_ratio=2,
+                            min_compact_bytes=512) as journal:
+            for _ in range(50):
+                journal.extend('s1', 0, [turn('same turn')])
+            self.assertLess(self.path.stat().st_size, 1024 + 200)
+            self.assertEqual(len(journal.sessions()['s1']), 1)
+
+    def test_truncated_last_line_is_ignored(self):
+        with SessionJournal(self.path, fsync=False) as journal:
+            journal.append('s1', 0, turn('a'))
+        with open(self.path, 'a') as f:
+            f.write('{"session_id": "s1", "ind')
+        self.assertEqual(len(list(read_journal(self.path))), 1)
+
+    def test_eliza_journals_only_new_turns(self):
+        eliza = Eliza()
+        with SessionJournal(self.path, fsync=False) as journal:
+            eliza.respond("Hello")
+            self.assertEqual(eliza.journal_session(journal, 's1'), 2)
+            self.assertEqual(eliza.journal_session(journal, 's1'), 0)
+            eliza.respond("I feel sad")
+            self.assertEqual(eliza.journal_session(journal, 's1'), 2)
+            self.assertEqual(journal.sessions()['s1'], eliza.session_history)
+
+            export = Path(self.tmpdir.name) / 'session.json'
+            journal.export('s1', export)
+        with open(export) as f:
+            self.assertEqual(json.load(f), eliza.session_history)
+
+
+if __name__ == '__main__':
+    unittest.main()
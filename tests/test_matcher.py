@@ -0,0 +1,77 @@
+import random
+import re
+import unittest
+
+from eliza.core.chatbot import Eliza
+from eliza.core.matcher import PatternMatcher, keyword_groups
+from eliza.core.response_patterns import DEFAULT_PATTERNS, ResponsePattern
+from eliza.core.rulebook import Rulebook
+
+
+def linear_match(patterns, text):
+    """Reference first-match-wins scan over the patterns."""
+    for index, pattern in enumerate(patterns):
+        match = pattern.pattern.match(text)
+        if match:
+            return index, match
+    return None
+
+
+class TestPatternMatcher(unittest.TestCase):
+    def setUp(self):
+        self.patterns = DEFAULT_PATTERNS
+        self.matcher = PatternMatcher(self.patterns)
+
+    def test_keyword_groups(self):
+        family = self.patterns[2].pattern
+        groups = keyword_groups(family)
+        self.assertEqual(len(groups), 2)
+        self.assertIn('mother', groups[0])
+        self.assertIn('awful', groups[1])
+
+        # Patterns that are not plain keyword rules are always tried
+        self.assertIsNone(keyword_groups(re.compile(r'I need (.*)', re.IGNORECASE)))
+        self.assertIsNone(keyword_groups(re.compile(r'.*\b(sad)\b.*')))
+
+    def assert_same_as_linear(self, text):
+        expected = linear_match(self.patterns, text)
+        actual = self.matcher.match(text)
+        self.assertEqual(actual[0], expected[0], text)
+        self.assertEqual(actual[1].groups(), expected[1].groups(), text)
+        self.assertEqual(actual[1].span(), expected[1].span(), text)
+
+    def test_matches_linear_scan(self):
+        for text in [
+            "I feel sad today",
+            "My MOTHER is awful",
+            "my mother is lovely",
+            "I need a holiday",
+            "Hello there",
+            "Is this a question?",
+            "downloading files",
+            "I am DOWN",
+            "sad\nbut on the second line",
+            "Ich bin traurig, sad",
+            "",
+            "thanks!",
+        ]:
+            self.assert_same_as_linear(text)
+
+    def test_matches_linear_scan_randomized(self):
+        rng = random.Random(0)
+        vocabulary = ['sad', 'mad', 'made', 'family', 'awful', 'feel', 'need',
+                      'I', 'hello', 'yes', 'no', 'help', 'thanks', 'bye',
+                      'lonely', 'worried', 'the', 'a', '?', '\n', 'Sad', 'é']
+        for _ in range(2000):
+            text = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(0, 8)))
+            self.assert_same_as_linear(text)
+
+    def test_extended_rulebook_takes_priority(self):
+        custom = ResponsePattern(re.compile(r'.*\b(zebra)\b.*', re.IGNORECASE), ["Zebras!"])
+        rulebook = Rulebook(DEFAULT_PATTERNS).extend([custom])
+        self.assertEqual(Eliza(rulebook).respond("a sad zebra"), "Zebras!")
+        self.assertNotEqual(Eliza().respond("a sad zebra"), "Zebras!")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import math
+import unittest
+
+from eliza.core.chatbot import Eliza
+from eliza.core.metrics import STAGES, Histogram, Metrics
+from eliza.core.response_patterns import DEFAULT_PATTERNS
+from eliza.core.rulebook import Rulebook
+from eliza.core.sessions import SessionManager
+from eliza.web.asgi import ElizaASGI
+
+from test_asgi import run_http
+
+
+class TestHistogram(unittest.TestCase):
+    def test_buckets_and_quantiles(self):
+        histogram = Histogram([1, 2, 4])
+        for value in (0.5, 1, 1.5, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 1, 1, 1])
+        self.assertEqual(histogram.count, 5)
+        self.assertAlmostEqual(histogram.mean, 16 / 5)
+        self.assertEqual(histogram.quantile(0.4), 1)
+        self.assertEqual(histogram.quantile(0.8), 4)
+        self.assertEqual(histogram.quantile(1.0), math.inf)
+        self.assertTrue(math.isnan(Histogram().quantile(0.5)))
+
+
+class TestMetrics(unittest.TestCase):
+    def test_records_stages_hits_and_fallbacks(self):
+        metrics = Metrics(enabled=True)
+        # Without the catch-all rule, unmatched input gets a fallback
+        eliza = Eliza(Rulebook(DEFAULT_PATTERNS[:2]), seed=0, metrics=metrics)
+        eliza.respond("I am so sad")
+        eliza.respond("still sad")
+        eliza.respond("The weather")
+
+        self.assertEqual(metrics.responses, 3)
+        self.assertEqual(metrics.fallbacks, 1)
+        self.assertAlmostEqual(metrics.fallback_rate, 1 / 3)
+        self.assertEqual(metrics.pattern_hits, {eliza.responses[0].pattern.pattern: 2})
+        for stage in ('context', 'match', 'format', 'history', 'total'):
+            self.assertEqual(metrics.stages[stage].count, 3, stage)
+        self.assertEqual(metrics.stages['filter'].count, 2)
+        self.assertEqual(set(metrics.stages), set(STAGES) | {'total'})
+
+    def test_disabled_records_nothing(self):
+        metrics = Metrics()
+        Eliza(metrics=metrics).respond("I am so sad")
+        self.assertEqual(metrics.responses, 0)
+        self.assertEqual(metrics.stages['total'].count, 0)
+
+    def test_errors_are_counted(self):
+        metrics = Metrics(enabled=True)
+        eliza = Eliza(metrics=metrics)
+        eliza.tracker = None
+        with self.assertLogs('eliza.core.chatbot', level='ERROR'):
+            reply = eliza.respond("hello")
+        self.assertIn("rephrase", reply)
+        self.assertEqual((metrics.errors, metrics.responses), (1, 0))
+
+    def test_exports(self):
+        metrics = Metrics(enabled=True)
+        Eliza(seed=0, metrics=metrics).respond("I need a \"break\"")
+        text = metrics.render_prometheus()
+        self.assertIn('eliza_stage_seconds_bucket{stage="match",le="+Inf"} 1\n', text)
+        self.assertIn('eliza_stage_seconds_count{stage="total"} 1\n', text)
+        self.assertIn('eliza_responses_total 1\n', text)
+        self.assertIn('eliza_pattern_hits_total{pattern="I need (.*)"} 1', text)
+        self.assertIn('responses: 1  fallbacks: 0', metrics.summary())
+
+        metrics.reset()
+        self.assertEqual(metrics.responses, 0)
+
+    def test_asgi_endpoint(self):
+        metrics = Metrics(enabled=True)
+        sessions = SessionManager(factory=lambda: Eliza(metrics=metrics))
+        app = ElizaASGI(sessions, journal=False, metrics=metrics)
+        sessions.respond(None, "I am sad")
+        status, body = run_http(app, '/metrics')
+        self.assertEqual(status, 200)
+        self.assertIn(b'eliza_responses_total 1\n', body)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import csv
+import io
+import math
+import random
+import unittest
+
+from eliza.ngrams.compare import compare_ngrams
+from eliza.ngrams.counting import Vocabulary, count_ngrams
+
+
+class TestNgramComparison(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.text_1 = ' '.join(rng.choice(['a', 'b', 'c', 'd']) for _ in range(500))
+        self.text_2 = ' '.join(rng.choice(['b', 'c', 'e', 'f', 'f']) for _ in range(300))
+
+    def reference(self, n):
+        """The original dict join over the union of n-grams."""
+        model_1 = count_ngrams(n, self.text_1).to_counter()
+        model_2 = count_ngrams(n, self.text_2).to_counter()
+        total_1, total_2 = sum(model_1.values()), sum(model_2.values())
+        return {ngram: abs(model_1[ngram] / total_1 - model_2[ngram] / total_2)
+                for ngram in set(model_1) | set(model_2)}
+
+    def test_join_matches_dict_comparison(self):
+        for n in (1, 2, 3):
+            comparison = compare_ngrams(count_ngrams(n, self.text_1), count_ngrams(n, self.text_2))
+            expected = self.reference(n)
+            self.assertEqual(len(comparison), len(expected))
+            for ngram, count_1, prob_1, count_2, prob_2, diff, _ in comparison.rows():
+                self.assertAlmostEqual(diff, expected[ngram])
+            self.assertEqual(comparison.total_1, 501 - n)
+
+    def test_top_matches_full_sort(self):
+        comparison = compare_ngrams(count_ngrams(2, self.text_1), count_ngrams(2, self.text_2))
+        expected = sorted(self.reference(2).values(), reverse=True)[:10]
+        self.assertEqual([round(row[5], 12) for row in comparison.top('abs_diff', 10)],
+                         [round(value, 12) for value in expected])
+        lowest = comparison.top('log_ratio', 3, largest=False)
+        self.assertTrue(all(row[1] == 0 for row in lowest))
+        self.assertEqual(len(comparison.top('abs_diff', 10 ** 6)), len(comparison))
+        with self.assertRaises(ValueError):
+            comparison.top('bogus')
+
+    def test_top_breaks_ties_at_the_cutoff_by_key(self):
+        comparison = compare_ngrams(count_ngrams(2, self.text_1), count_ngrams(2, self.text_2))
+        for metric in ('counts_1', 'counts_2', 'log_ratio'):
+            for largest in (True, False):
+                ranked = comparison.top_indices(metric, len(comparison), largest).tolist()
+                for k in range(len(comparison) + 1):
+                    self.assertEqual(comparison.top_indices(metric, k, largest).tolist(),
+                                     ranked[:k], (metric, largest, k))
+
+    def test_divergences(self):
+        same = compare_ngrams(count_ngrams(1, self.text_1), count_ngrams(1, self.text_1))
+        self.assertAlmostEqual(same.kl_divergence(), 0.0)
+        self.assertAlmostEqual(same.js_divergence(), 0.0)
+        disjoint = compare_ngrams(count_ngrams(1, "a b a"), count_ngrams(1, "x y"))
+        self.assertAlmostEqual(disjoint.js_divergence(), 1.0)
+        comparison = compare_ngrams(count_ngrams(1, self.text_1), count_ngrams(1, self.text_2))
+        self.assertGreater(comparison.kl_divergence(), 0)
+        self.assertNotAlmostEqual(comparison.kl_divergence(), comparison.kl_divergence(True))
+        self.assertTrue(0 < comparison.js_divergence() < 1)
+
+    def test_shared_vocabulary_is_not_copied(self):
+        vocab = Vocabulary()
+        first = count_ngrams(1, "a b", vocab)
+        second = count_ngrams(1, "b c", vocab)
+        comparison = compare_ngrams(first, second)
+        self.assertIs(comparison.vocab, vocab)
+        self.assertEqual([row[:2] for row in comparison.rows()],
+                         [(('a',), 1), (('b',), 1), (('c',), 0)])
+
+    def test_write_streams_delimited_rows(self):
+        comparison = compare_ngrams(count_ngrams(2, self.text_1), count_ngrams(2, self.text_2))
+        out = io.StringIO()
+        written = comparison.write(out, delimiter='\t', batch_size=7)
+        rows = list(csv.reader(io.StringIO(out.getvalue()), delimiter='\t'))
+        self.assertEqual(written, len(comparison))
+        self.assertEqual(rows[0][:2], ['ngram', 'count_1'])
+        self.assertEqual(len(rows), len(comparison) + 1)
+        first = comparison.rows([0])[0]
+        self.assertEqual(rows[1][0], ' '.join(first[0]))
+        self.assertTrue(math.isclose(float(rows[1][6]), first[6], rel_tol=1e-5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import collections
+import random
+import re
+import unittest
+
+import numpy as np
+
+from eliza.ngrams.counting import KeyCodec, NgramTable, Vocabulary, count_ngrams
+from eliza.ngrams.model import generate_ngrams
+
+
+def counter_model(n, text):
+    """The original Counter-based n-gram count."""
+    return collections.Counter(generate_ngrams(n, re.findall(r'\w+', text.lower())))
+
+
+class TestNgramCounting(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        words = [f'w{i}' for i in range(50)]
+        self.text = ' '.join(rng.choice(words) for _ in range(3000))
+
+    def test_matches_counter_for_n_1_to_5(self):
+        for n in range(1, 6):
+            table = count_ngrams(n, self.text)
+            self.assertEqual(table.to_counter(), counter_model(n, self.text), n)
+            self.assertEqual(table.total, 3000 - n + 1)
+
+    def test_wide_keys_when_ids_do_not_fit_64_bits(self):
+        rng = random.Random(1)
+        text = ' '.join(f'tok{rng.randrange(20000)}' for _ in range(30000))
+        table = count_ngrams(5, text)
+        self.assertFalse(table.codec.packed)
+        self.assertEqual(table.to_counter(), counter_model(5, text))
+
+    def test_codec_round_trip(self):
+        windows = np.array([[0, 5, 7], [7, 7, 7], [1, 0, 3]], dtype=np.uint32)
+        for vocab_size in (8, 1 << 30):
+            codec = KeyCodec(3, vocab_size)
+            np.testing.assert_array_equal(codec.unpack(codec.pack(windows)), windows)
+            # Keys sort in the same order as the ID tuples
+            order = np.argsort(codec.pack(windows), kind='stable')
+            self.assertEqual([tuple(w) for w in windows[order].tolist()],
+                             sorted(tuple(w) for w in windows.tolist()))
+
+    def test_counter_interface(self):
+        table = count_ngrams(2, "the cat in the hat the cat")
+        self.assertEqual(table[('the', 'cat')], 2)
+        self.assertEqual(table[('no', 'such')], 0)
+        self.assertNotIn(('no', 'such'), table)
+        self.assertIsNone(table.get(('cat', 'the')))
+        self.assertEqual(table.most_common(1), [(('the', 'cat'), 2)])
+        self.assertEqual(sum(table.values()), 6)
+        self.assertEqual(len(table), 5)
+
+    def test_most_common_breaks_ties_at_the_cutoff_by_key(self):
+        rng = random.Random(3)
+        table = count_ngrams(2, ' '.join(rng.choice('abcdefgh') for _ in range(400)))
+        ranked = table.most_common()
+        self.assertGreater(len({count for _, count in ranked}), 1)
+        for k in range(len(table) + 1):
+            self.assertEqual(table.most_common(k), ranked[:k])
+
+    def test_lookup(self):
+        table = count_ngrams(2, "a b a b c")
+        keys, known = table.encode([('a', 'b'), ('b', 'c'), ('c', 'a'), ('z', 'a')])
+        np.testing.assert_array_equal(known, [True, True, True, False])
+        np.testing.assert_array_equal(table.lookup(keys)[known], [2, 1, 0])
+
+    def test_merge_across_vocabularies(self):
+        left = count_ngrams(2, "a b c a b")
+        right = count_ngrams(2, "x y a b " * 40)
+        merged = left.merge(right)
+        self.assertEqual(merged.to_counter(), left.to_counter() + right.to_counter())
+
+    def test_merge_widens_keys_as_vocabulary_grows(self):
+        vocab = Vocabulary()
+        small = count_ngrams(3, "a b c d", vocab)
+        large = count_ngrams(3, ' '.join(f't{i}' for i in range(5000)), Vocabulary())
+        merged = small.merge(large)
+        self.assertEqual(merged.to_counter(), small.to_counter() + large.to_counter())
+        # The old table still answers lookups after its vocabulary grew
+        self.assertEqual(small[('a', 'b', 'c')], 1)
+        self.assertEqual(small[('t1', 't2', 't3')], 0)
+
+    def test_empty(self):
+        self.assertEqual(len(count_ngrams(3, "one two")), 0)
+        self.assertEqual(len(NgramTable.empty(2)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
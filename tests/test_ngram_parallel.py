@@ -0,0 +1,52 @@
+import os
+import random
+import tempfile
+import unittest
+
+from eliza.ngrams.counting import count_ngrams
+from eliza.ngrams.parallel import count_ngrams_parallel, shard_offsets
+
+
+class TestParallelNgrams(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        words = ['Alpha', 'beta', 'gamma,', 'd3lta.', 'épée', "it's", 'Σίσυφος']
+        self.text = '\n'.join(' '.join(rng.choice(words) for _ in range(20))
+                              for _ in range(300))
+        fd, self.path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(self.text)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_shards_align_on_token_boundaries(self):
+        data = open(self.path, 'rb').read()
+        offsets = shard_offsets(self.path, 17)
+        self.assertEqual((offsets[0], offsets[-1]), (0, len(data)))
+        self.assertEqual(offsets, sorted(set(offsets)))
+        for offset in offsets[1:-1]:
+            self.assertFalse(chr(data[offset]).isalnum() or data[offset] >= 0x80)
+
+    def test_identical_to_serial_counts(self):
+        for n in (1, 2, 4):
+            serial = count_ngrams(n, self.text)
+            for shards in (1, 7, 200):
+                table = count_ngrams_parallel(self.path, n, workers=1, shards=shards)
+                self.assertEqual(table.vocab.tokens, serial.vocab.tokens)
+                self.assertEqual(table.keys.tolist(), serial.keys.tolist())
+                self.assertEqual(table.counts.tolist(), serial.counts.tolist())
+
+    def test_worker_processes(self):
+        table = count_ngrams_parallel(self.path, 3, workers=2)
+        self.assertEqual(table.to_counter(), count_ngrams(3, self.text).to_counter())
+
+    def test_file_without_separators(self):
+        with open(self.path, 'w') as f:
+            f.write('x' * 1000)
+        table = count_ngrams_parallel(self.path, 1, workers=1, shards=4)
+        self.assertEqual(dict(table.items()), {('x' * 1000,): 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
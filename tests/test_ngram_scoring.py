@@ -0,0 +1,68 @@
+import math
+import random
+import unittest
+from collections import Counter
+
+from eliza.ngrams.counting import count_ngrams
+from eliza.ngrams.model import generate_ngrams
+from eliza.ngrams.scoring import PerplexityScorer
+
+
+def reference_perplexity(text, model, n, smoothing_value=1e-10):
+    """The original dict-based perplexity."""
+    total = sum(model.values())
+    ngrams = [tuple(text.lower().split()[i:i + n]) for i in range(len(text.split()) - n + 1)]
+    if not ngrams:
+        return float('inf')
+    log_prob = sum(math.log2(model.get(g, 0) / total or smoothing_value) for g in ngrams)
+    return 2 ** (-log_prob / len(ngrams))
+
+
+class TestPerplexityScorer(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        words = [f'w{i}' for i in range(40)]
+        self.train = ' '.join(rng.choice(words) for _ in range(5000))
+        self.docs = [' '.join(rng.choice(words + ['unseen']) for _ in range(rng.randrange(6)))
+                     for _ in range(200)]
+
+    def test_matches_reference_for_each_document(self):
+        for n in (1, 2, 3):
+            table = count_ngrams(n, self.train)
+            counter = table.to_counter()
+            scores = PerplexityScorer(table).score_many(self.docs)
+            self.assertEqual(len(scores), len(self.docs))
+            for doc, score in zip(self.docs, scores):
+                expected = reference_perplexity(doc, counter, n)
+                if math.isinf(expected):
+                    self.assertTrue(math.isinf(score), doc)
+                else:
+                    self.assertAlmostEqual(score / expected, 1.0, places=9, msg=doc)
+
+    def test_ngrams_do_not_span_documents(self):
+        scorer = PerplexityScorer(count_ngrams(2, "a b"))
+        self.assertEqual(scorer.score("a b"), 1.0)
+        scores = scorer.score_many(["x a", "b y", "a b"])
+        self.assertGreater(scores[0], 1e9)
+        self.assertEqual(scores[2], 1.0)
+
+    def test_accepts_counters(self):
+        counter = Counter(generate_ngrams(2, self.train.split()))
+        scorer = PerplexityScorer(counter, 2)
+        table_scorer = PerplexityScorer(count_ngrams(2, self.train))
+        self.assertAlmostEqual(scorer.score(self.docs[3]), table_scorer.score(self.docs[3]))
+
+    def test_score_counts_matches_text_score(self):
+        scorer = PerplexityScorer(count_ngrams(2, self.train))
+        text = ' '.join(self.docs)
+        self.assertAlmostEqual(scorer.score_counts(count_ngrams(2, text)), scorer.score(text))
+
+    def test_empty_inputs(self):
+        scorer = PerplexityScorer(count_ngrams(2, self.train))
+        self.assertEqual(len(scorer.score_many([])), 0)
+        self.assertEqual(scorer.score("one"), float('inf'))
+        self.assertAlmostEqual(PerplexityScorer(count_ngrams(2, "")).score("a b") / 1e10, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
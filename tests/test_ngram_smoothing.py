@@ -0,0 +1,69 @@
+import math
+import random
+import unittest
+
+from eliza.ngrams import train_ngram_model
+from eliza.ngrams.counting import Vocabulary, count_ngrams
+from eliza.ngrams.smoothing import KneserNeyModel
+
+
+class TestKneserNeyModel(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        words = [f'w{i}' for i in range(30)]
+        self.text = ' '.join(rng.choice(words[:rng.randrange(1, 30)]) for _ in range(5000))
+
+    def test_distributions_sum_to_one(self):
+        for n in (1, 2, 3, 4):
+            model = KneserNeyModel(count_ngrams(n, self.text))
+            for context in ([], ['w1'], ['w3', 'w1'], ['w2', 'w0', 'w1'], ['unseen', 'w1']):
+                total = sum(model.prob(word, context) for word in model.vocab.tokens)
+                total += model.prob('unseen', context)
+                self.assertAlmostEqual(total, 1.0, places=9, msg=(n, context))
+
+    def test_distributions_sum_to_one_with_a_grown_shared_vocabulary(self):
+        vocab = Vocabulary()
+        table = count_ngrams(2, self.text, vocab)
+        # Enough new tokens to exceed the key width of the training counts
+        count_ngrams(2, ' '.join(f'new{i}' for i in range(200)), vocab)
+        self.assertGreater(len(vocab), table.codec.id_limit)
+        model = KneserNeyModel(table)
+        for context in ([], ['w1'], ['new5'], ['unseen']):
+            total = sum(model.prob(word, context) for word in vocab.tokens)
+            total += model.prob('unseen', context)
+            self.assertAlmostEqual(total, 1.0, places=9, msg=context)
+
+    def test_continuation_counts(self):
+        # "francisco" is frequent but only ever follows "san"
+        text = "san francisco " * 20 + "the cat the dog a cat my cat"
+        model = KneserNeyModel(count_ngrams(2, text))
+        unigrams = model.orders[0]
+        self.assertEqual(unigrams[('francisco',)], 1)
+        self.assertEqual(unigrams[('cat',)], 3)
+        self.assertGreater(model.prob('cat', ['unseen']), model.prob('francisco', ['unseen']))
+        self.assertGreater(model.prob('francisco', ['san']), 0.9)
+
+    def test_ranks_in_domain_text_lower(self):
+        model = train_ngram_model(3, self.text)
+        in_domain, shuffled = self.text[:500], ' '.join(reversed(self.text[:500].split()))
+        scores = model.score_many([in_domain, shuffled, 'zz yy xx', ''])
+        self.assertLess(scores[0], scores[1])
+        self.assertLess(scores[1], scores[2])
+        self.assertEqual(scores[3], float('inf'))
+        self.assertAlmostEqual(model.score(in_domain), scores[0])
+
+    def test_score_counts_matches_token_scoring_after_first_tokens(self):
+        model = train_ngram_model(2, self.text)
+        tokens = self.text.split()[:300]
+        expected = 2 ** -(sum(math.log2(model.prob(w, [h]))
+                              for h, w in zip(tokens, tokens[1:])) / (len(tokens) - 1))
+        self.assertAlmostEqual(model.score_counts(count_ngrams(2, ' '.join(tokens))), expected)
+
+    def test_orders_share_vocabulary(self):
+        model = train_ngram_model(3, self.text)
+        self.assertEqual([order.n for order in model.orders], [1, 2, 3])
+        self.assertTrue(all(order.vocab is model.vocab for order in model.orders))
+
+
+if __name__ == '__main__':
+    unittest.main()
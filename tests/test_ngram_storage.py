@@ -0,0 +1,85 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from eliza.ngrams.counting import count_ngrams
+from eliza.ngrams.model import calculate_table_perplexity
+from eliza.ngrams.scoring import PerplexityScorer
+from eliza.ngrams.storage import load_model, save_model
+
+
+class TestModelStorage(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        words = ['Zeta', 'alpha', 'épée', 'b', 'Σίσυφος', '10']
+        self.text = ' '.join(rng.choice(words) + str(rng.randrange(3)) for _ in range(3000))
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'model.ngm')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def round_trip(self, table):
+        save_model(table, self.path)
+        return load_model(self.path)
+
+    def test_round_trip(self):
+        for n in (1, 2, 3):
+            table = count_ngrams(n, self.text)
+            model = self.round_trip(table)
+            self.assertEqual(model.n, n)
+            self.assertEqual(model.total, table.total)
+            self.assertEqual(model.to_counter(), table.to_counter())
+
+    def test_wide_keys_round_trip(self):
+        rng = random.Random(1)
+        table = count_ngrams(5, ' '.join(f't{rng.randrange(30000)}' for _ in range(40000)))
+        model = self.round_trip(table)
+        self.assertFalse(model.codec.packed)
+        self.assertEqual(model.to_counter(), table.to_counter())
+
+    def test_lookups_against_mapped_model(self):
+        model = self.round_trip(count_ngrams(2, "the cat in the hat the cat"))
+        self.assertFalse(model.keys.flags.writeable)
+        self.assertEqual(model[('the', 'cat')], 2)
+        self.assertEqual(model[('cat', 'the')], 0)
+        self.assertIn(('in', 'the'), model)
+        self.assertEqual(model.vocab.get('hat'), list(model.vocab.tokens).index('hat'))
+        self.assertIsNone(model.vocab.get('dog'))
+        self.assertEqual(list(model.vocab.tokens), sorted(model.vocab.tokens))
+        with self.assertRaises(TypeError):
+            model.vocab.encode(['dog'])
+
+    def test_perplexity_matches_in_memory_model(self):
+        table = count_ngrams(2, self.text)
+        model = self.round_trip(table)
+        test = count_ngrams(2, self.text[:2000] + ' unseen words')
+        self.assertAlmostEqual(calculate_table_perplexity(test, model),
+                               calculate_table_perplexity(test, table))
+
+    def test_scoring_does_not_copy_the_mapped_model(self):
+        table = count_ngrams(2, self.text)
+        model = self.round_trip(table)
+        scorer = PerplexityScorer(model)
+        self.assertFalse([name for name, value in vars(scorer).items()
+                          if isinstance(value, np.ndarray)])
+        self.assertAlmostEqual(scorer.score(self.text[:2000]),
+                               PerplexityScorer(table).score(self.text[:2000]))
+
+    def test_empty_model(self):
+        model = self.round_trip(count_ngrams(3, "too short"))
+        self.assertEqual(len(model), 0)
+        self.assertEqual(model[('too', 'short', 'x')], 0)
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a model' * 10)
+        with self.assertRaises(ValueError):
+            load_model(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import io
+import random
+import unittest
+
+from eliza.ngrams.counting import count_ngrams, iter_tokens
+from eliza.ngrams.model import build_ngram_model, calculate_perplexity, calculate_table_perplexity
+from eliza.ngrams.streaming import (StreamingNgramCounter, count_ngrams_stream,
+                                    iter_chunk_tokens, read_chunks, split_counts)
+
+
+class TestStreamingNgrams(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        words = ['Alpha', 'beta', 'gamma,', 'd3lta.', 'épée', "it's"]
+        self.text = ' '.join(rng.choice(words) for _ in range(2000))
+
+    def chunks(self, size):
+        return read_chunks(io.StringIO(self.text), size)
+
+    def test_words_split_across_chunks(self):
+        tokens = [t for chunk in iter_chunk_tokens(['Hel', 'lo wor', 'ld', '!', ' end'])
+                  for t in chunk]
+        self.assertEqual(tokens, ['hello', 'world', 'end'])
+        for size in (1, 3, 64):
+            tokens = [t for chunk in iter_chunk_tokens(self.chunks(size)) for t in chunk]
+            self.assertEqual(tokens, list(iter_tokens(self.text)))
+
+    def test_counts_match_whole_text(self):
+        for n in range(1, 5):
+            expected = count_ngrams(n, self.text).to_counter()
+            for size in (1, 7, 1000):
+                table = count_ngrams_stream(n, self.chunks(size))
+                self.assertEqual(table.to_counter(), expected, (n, size))
+
+    def test_counter_updates_shorter_than_n(self):
+        counter = StreamingNgramCounter(3)
+        for token in ['a', 'b', 'c', 'a', 'b']:
+            counter.update([token])
+        self.assertEqual(counter.table().to_counter(),
+                         count_ngrams(3, 'a b c a b').to_counter())
+        self.assertEqual(counter.tokens, 5)
+
+    def test_split_counts(self):
+        tokens = list(iter_tokens(self.text))
+        split = int(len(tokens) * 0.9)
+        for n in (1, 2, 3):
+            counts = split_counts(n, self.chunks(100), chunk_tokens=97)
+            self.assertEqual(counts.tokens, len(tokens))
+            self.assertEqual(counts.characters, len(self.text))
+            self.assertEqual(counts.train.to_counter(),
+                             count_ngrams(n, tokens[:split]).to_counter())
+            self.assertEqual(counts.test.to_counter(),
+                             count_ngrams(n, tokens[split:]).to_counter())
+            self.assertEqual(counts.full.to_counter(), count_ngrams(n, self.text).to_counter())
+
+    def test_table_perplexity_matches_text_perplexity(self):
+        tokens = list(iter_tokens(self.text))
+        train, test = ' '.join(tokens[:1800]), ' '.join(tokens[1800:])
+        model = build_ngram_model(2, train)
+        self.assertAlmostEqual(calculate_table_perplexity(count_ngrams(2, test), model),
+                               calculate_perplexity(test, model, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,6 @@
-import sys
 import unittest
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent / 'notebooks'))
 
-from unsmoothed_ngrams import (
+from eliza.ngrams.model import (
     generate_ngrams,
     build_ngram_model,
     calculate_probabilities,
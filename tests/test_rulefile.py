@@ -0,0 +1,127 @@
+import json
+import os
+import pickle
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from eliza.core.chatbot import Eliza
+from eliza.core.response_patterns import DEFAULT_PATTERNS
+from eliza.core.rulebook import Rulebook
+from eliza.core.rulefile import (RuleFile, default_cache_path, dump_rules, load_rulebook,
+                                 load_rules, parse_rules)
+
+SCRIPT = ["hi", "I need a break", "my mother is awful", "I feel sad", "why?", "I am anxious"]
+
+
+def write_rules(path, responses):
+    rules = [{'pattern': r'(.*)', 'flags': ['IGNORECASE'], 'responses': responses}]
+    path.write_text(json.dumps({'version': 1, 'rules': rules}), encoding='utf-8')
+
+
+class TestRuleFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / 'rules.json'
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip_of_default_rules(self):
+        dump_rules(DEFAULT_PATTERNS, self.path)
+        self.assertEqual(load_rules(self.path), DEFAULT_PATTERNS)
+        loaded = Eliza(load_rulebook(self.path), seed=4)
+        builtin = Eliza(Rulebook(DEFAULT_PATTERNS), seed=4)
+        self.assertEqual([loaded.respond(text) for text in SCRIPT],
+                         [builtin.respond(text) for text in SCRIPT])
+
+    def test_invalid_rules(self):
+        for data in ({'rules': []}, {'version': 1, 'rules': {}},
+                     {'version': 1, 'rules': [{'pattern': '(', 'responses': ['x']}]},
+                     {'version': 1, 'rules': [{'pattern': 'x', 'responses': []}]},
+                     {'version': 1, 'rules': [{'pattern': 'x', 'flags': ['LOUD'], 'responses': ['x']}]}):
+            with self.assertRaises(ValueError):
+                parse_rules(data)
+        self.path.write_text('not json', encoding='utf-8')
+        with self.assertRaises(ValueError):
+            load_rulebook(self.path)
+
+    def test_compiled_cache_is_used_while_current(self):
+        write_rules(self.path, ["First."])
+        load_rulebook(self.path)
+        cache_path = default_cache_path(self.path)
+        self.assertTrue(cache_path.exists())
+
+        # A cache whose stamp matches is trusted without reading the rules
+        with open(cache_path, 'rb') as f:
+            stamp = pickle.load(f)
+        with open(cache_path, 'wb') as f:
+            pickle.dump(stamp, f)
+            pickle.dump(Rulebook(DEFAULT_PATTERNS[-1:]), f)
+        self.assertEqual(load_rulebook(self.path).patterns, DEFAULT_PATTERNS[-1:])
+
+        write_rules(self.path, ["Second."])
+        self.assertEqual(Eliza(load_rulebook(self.path)).respond("hi"), "Second.")
+        cache_path.write_bytes(b'garbage')
+        with self.assertLogs('eliza.core.rulefile', level='WARNING'):
+            self.assertEqual(Eliza(load_rulebook(self.path)).respond("hi"), "Second.")
+
+    def test_pickled_rulebook_starts_with_an_empty_cache(self):
+        rulebook = Rulebook(DEFAULT_PATTERNS)
+        Eliza(rulebook).respond("hi")
+        restored = pickle.loads(pickle.dumps(rulebook))
+        self.assertEqual(restored, rulebook)
+        self.assertEqual(len(restored.cache), 0)
+        self.assertEqual(len(restored.candidates), len(DEFAULT_PATTERNS))
+
+
+class TestRuleFile(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / 'rules.json'
+        write_rules(self.path, ["Old."])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def touch(self, seconds):
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10**9))
+
+    def test_reload_swaps_rules_for_live_conversations(self):
+        rules = RuleFile(self.path)
+        eliza = Eliza(rules)
+        self.assertEqual(eliza.respond("hi"), "Old.")
+        self.assertFalse(rules.check())
+
+        write_rules(self.path, ["New."])
+        self.touch(1)
+        self.assertTrue(rules.check())
+        self.assertEqual((eliza.respond("hi"), rules.reloads), ("New.", 1))
+        self.assertEqual(len(eliza.session_history), 4)
+
+    def test_broken_file_keeps_current_rules(self):
+        rules = RuleFile(self.path)
+        self.path.write_text('{"version": 1, "rules": [{"pattern": "("}]}', encoding='utf-8')
+        self.touch(1)
+        with self.assertLogs('eliza.core.rulefile', level='ERROR'):
+            self.assertFalse(rules.check())
+        self.assertEqual(Eliza(rules).respond("hi"), "Old.")
+
+    def test_watch_thread(self):
+        rules = RuleFile(self.path, interval=0.01).start()
+        try:
+            write_rules(self.path, ["Watched."])
+            self.touch(1)
+            for _ in range(500):
+                if rules.reloads:
+                    break
+                time.sleep(0.01)
+        finally:
+            rules.stop()
+        self.assertEqual(Eliza(rules).respond("hi"), "Watched.")
+
+
+if __name__ == '__main__':
+    unittest.main()
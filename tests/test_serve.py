@@ -0,0 +1,89 @@
+import http.client
+import json
+import os
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from eliza.web.serve import worker_journal_path
+
+try:
+    import gunicorn
+except ImportError:
+    gunicorn = None
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestServeHelpers(unittest.TestCase):
+    def test_worker_journal_path(self):
+        self.assertEqual(worker_journal_path('logs/eliza.jsonl', 42), 'logs/eliza.42.jsonl')
+
+
+@unittest.skipIf(gunicorn is None or os.name != 'posix', "needs gunicorn on a POSIX system")
+class TestServe(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.store = Path(self.tmpdir.name) / 'sessions.db'
+        self.port = free_port()
+        env = dict(os.environ, PYTHONPATH=str(ROOT),
+                   ELIZA_SESSION_JOURNAL=str(Path(self.tmpdir.name) / 'journal.jsonl'))
+        self.server = subprocess.Popen(
+            [sys.executable, '-m', 'eliza.web.serve', '--bind', f'127.0.0.1:{self.port}',
+             '--workers', '2', '--threads', '2', '--session-store', str(self.store),
+             '--log-level', 'warning'],
+            cwd=self.tmpdir.name, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.addCleanup(self.stop)
+
+    def stop(self):
+        self.server.terminate()
+        self.server.wait(timeout=30)
+
+    def chat(self, message, session_id, attempts=100):
+        body = json.dumps({'message': message, 'session_id': session_id})
+        for _ in range(attempts):
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=10)
+                connection.request('POST', '/api/chat', body, {'Content-Type': 'application/json'})
+                response = connection.getresponse()
+                data = json.loads(response.read())
+                connection.close()
+                return data
+            except OSError:
+                time.sleep(0.1)
+        self.fail("server did not answer")
+
+    def version(self, session_id):
+        with sqlite3.connect(self.store) as connection:
+            return connection.execute('SELECT version FROM sessions WHERE id = ?',
+                                      (session_id,)).fetchone()[0]
+
+    def test_conversations_survive_across_workers_and_restarts(self):
+        sid = 'd' * 32
+        for message in ("I feel sad", "my mother is awful", "I need rest", "why?"):
+            self.assertEqual(self.chat(message, sid)['session_id'], sid)
+        self.assertEqual(self.version(sid), 8)
+
+        # Graceful restart: new workers pick the conversation up from the store
+        self.server.send_signal(signal.SIGHUP)
+        time.sleep(1)
+        reply = self.chat("hello again", sid)
+        self.assertIn('response', reply)
+        self.assertEqual(self.version(sid), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from eliza.core.sessions import DEFAULT_HISTORY_WINDOW, SessionManager, sessions_from_env
+from eliza.core.store import SqliteSessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionManager(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sessions = SessionManager(max_sessions=3, idle_timeout=60, clock=self.clock)
+
+    def test_sessions_are_isolated(self):
+        sid_a, _ = self.sessions.respond(None, "I feel sad")
+        sid_b, _ = self.sessions.respond(None, "Hello")
+        self.assertNotEqual(sid_a, sid_b)
+
+        eliza_a = self.sessions.get(sid_a).eliza
+        eliza_b = self.sessions.get(sid_b).eliza
+        self.assertEqual(eliza_a.context['current_emotion'], 'sad')
+        self.assertIsNone(eliza_b.context['current_emotion'])
+        self.assertEqual(len(eliza_a.session_history), 2)
+        self.assertEqual(len(eliza_b.session_history), 2)
+
+    def test_reuses_existing_session(self):
+        sid, _ = self.sessions.respond(None, "Hello")
+        same, _ = self.sessions.respond(sid, "I need sleep")
+        self.assertEqual(sid, same)
+        self.assertEqual(len(self.sessions.get(sid).eliza.session_history), 4)
+
+    def test_malformed_id_gets_new_session(self):
+        sid, _ = self.sessions.respond("../../etc", "Hello")
+        self.assertNotEqual(sid, "../../etc")
+
+    def test_lru_eviction(self):
+        ids = [self.sessions.get().session_id for _ in range(3)]
+        self.sessions.get(ids[0])  # touch the oldest
+        self.sessions.get()
+        self.assertEqual(len(self.sessions), 3)
+        self.assertIn(ids[0], self.sessions)
+        self.assertNotIn(ids[1], self.sessions)
+
+    def test_idle_eviction(self):
+        old = self.sessions.get().session_id
+        self.clock.now = 30
+        recent = self.sessions.get().session_id
+        self.clock.now = 61
+        self.assertEqual(self.sessions.evict_idle(), 1)
+        self.assertNotIn(old, self.sessions)
+        self.assertIn(recent, self.sessions)
+
+    def test_concurrent_messages(self):
+        sid = self.sessions.get().session_id
+
+        def chat():
+            for _ in range(50):
+                self.sessions.respond(sid, "I feel lonely")
+
+        threads = [threading.Thread(target=chat) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.sessions.get(sid).eliza.session_history), 400)
+
+
+
+class TestSessionsFromEnv(unittest.TestCase):
+    def test_settings(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            env = {'ELIZA_HISTORY_WINDOW': '5', 'ELIZA_MAX_SESSIONS': '7',
+                   'ELIZA_SESSION_TIMEOUT': '90',
+                   'ELIZA_SESSION_STORE': str(Path(tmpdir) / 'sessions.db')}
+            with mock.patch.dict(os.environ, env):
+                sessions = sessions_from_env()
+            self.assertEqual((sessions.max_sessions, sessions.idle_timeout), (7, 90.0))
+            self.assertIsInstance(sessions.store, SqliteSessionStore)
+            self.assertEqual(sessions.store.max_age, 90.0)
+            self.assertEqual(sessions.get().eliza.state.history.window, 5)
+
+    def test_defaults(self):
+        with mock.patch.dict(os.environ):
+            for name in ('ELIZA_HISTORY_WINDOW', 'ELIZA_SESSION_STORE'):
+                os.environ.pop(name, None)
+            sessions = sessions_from_env()
+        self.assertIsNone(sessions.store)
+        eliza = sessions.get().eliza
+        self.assertEqual(eliza.state.history.window, DEFAULT_HISTORY_WINDOW)
+        for i in range(DEFAULT_HISTORY_WINDOW):
+            eliza.respond(f"message {i}")
+        self.assertEqual(eliza.state.history.in_memory, DEFAULT_HISTORY_WINDOW)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from eliza.core.chatbot import Eliza
+from eliza.core.history import SessionHistory
+from eliza.core.sessions import SessionManager, windowed_factory
+from eliza.core.store import SessionStore, SqliteSessionStore
+
+SCRIPT = ["I feel sad", "my mother is awful", "I need rest", "why?", "I am so angry"]
+
+
+class TestSnapshots(unittest.TestCase):
+    def test_conversation_round_trip(self):
+        eliza = Eliza(seed=1, history=SessionHistory(window=4))
+        for text in SCRIPT:
+            eliza.respond(text)
+        snapshot = json.loads(json.dumps(eliza.state.snapshot()))
+
+        copy = Eliza(history=SessionHistory(window=4))
+        copy.state.restore(snapshot)
+        self.assertEqual(copy.context, eliza.context)
+        self.assertEqual(copy.session_history, eliza.session_history)
+        self.assertEqual((copy.state.history.appended, copy.state.history.first), (10, 6))
+        self.assertEqual(copy.state.usage_counts, eliza.state.usage_counts)
+        self.assertEqual(copy.state.last_used, eliza.state.last_used)
+
+    def test_snapshot_tail(self):
+        eliza = Eliza()
+        for text in SCRIPT:
+            eliza.respond(text)
+        snapshot = eliza.state.snapshot(tail=3)['history']
+        self.assertEqual(snapshot['appended'], 10)
+        self.assertEqual([turn[2] for turn in snapshot['turns']],
+                         [turn['text'] for turn in eliza.session_history[-3:]])
+
+    def test_restore_fits_the_window(self):
+        eliza = Eliza()
+        for text in SCRIPT:
+            eliza.respond(text)
+        small = SessionHistory(window=3)
+        small.restore(eliza.state.history.snapshot())
+        self.assertEqual(small.to_list(), eliza.session_history[-3:])
+        self.assertEqual(small.first, 7)
+
+
+class TestSessionStore(unittest.TestCase):
+    def test_interface_is_abstract(self):
+        with self.assertRaises(TypeError):
+            SessionStore()
+
+
+class TestSharedSessions(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.store = SqliteSessionStore(Path(self.tmpdir.name) / 'sessions.db')
+        self.addCleanup(self.store.close)
+
+    def test_workers_share_conversations(self):
+        # Two managers on one store stand for two worker processes
+        workers = [SessionManager(factory=windowed_factory(50), store=self.store)
+                   for _ in range(2)]
+        sid = 'c' * 32
+        for i, text in enumerate(SCRIPT):
+            workers[i % 2].respond(sid, text)
+        for worker in workers:
+            worker.respond(sid, "hello")
+        latest = workers[1].get(sid).eliza
+        self.assertEqual(len(latest.session_history), 2 * len(SCRIPT) + 4)
+        self.assertEqual(self.store.load(sid)[0], 2 * len(SCRIPT) + 4)
+
+        # The context is that of a single process seeing every message
+        expected = SessionManager()
+        for text in SCRIPT + ["hello", "hello"]:
+            expected.respond(sid, text)
+        self.assertEqual(latest.context, expected.get(sid).eliza.context)
+
+    def test_evicted_sessions_come_back_from_the_store(self):
+        sessions = SessionManager(max_sessions=1, store=self.store)
+        sid, _ = sessions.respond(None, "I feel sad")
+        sessions.respond(None, "Hello")
+        self.assertNotIn(sid, sessions)
+        sessions.respond(sid, "still here")
+        self.assertEqual(len(sessions.get(sid).eliza.session_history), 4)
+        self.assertEqual(sessions.get(sid).eliza.context['current_emotion'], 'sad')
+
+        sessions.discard(sid)
+        self.assertIsNone(self.store.load(sid))
+
+    def test_saves_compare_and_swap_the_version(self):
+        sid = 's' * 16
+        self.assertTrue(self.store.save(sid, 2, {'turns': 2}, previous=0))
+        self.assertFalse(self.store.save(sid, 2, {'turns': 'other'}, previous=0))
+        self.assertTrue(self.store.save(sid, 4, {'turns': 4}, previous=2))
+        self.assertFalse(self.store.save(sid, 4, {'turns': 'other'}, previous=2))
+        self.assertEqual(self.store.load(sid), (4, {'turns': 4}))
+        self.assertIsNone(self.store.load(sid, newer_than=4))
+        self.assertEqual(len(self.store), 1)
+
+    def test_concurrent_answers_keep_every_turn(self):
+        sid = 'r' * 32
+        first, second = (SessionManager(factory=windowed_factory(50), store=self.store)
+                         for _ in range(2))
+        first.respond(sid, "I feel sad")
+        second.respond(sid, "my mother is awful")
+
+        # The first worker answers while the second is between its load and save
+        load = self.store.load
+        def racing_load(session_id, newer_than=-1):
+            saved = load(session_id, newer_than)
+            self.store.load = load
+            first.respond(sid, "I need rest")
+            return saved
+        self.store.load = racing_load
+        second.respond(sid, "why?")
+
+        texts = [turn['text'] for turn in second.get(sid).eliza.session_history
+                 if turn['speaker'] == 'user']
+        self.assertEqual(texts, ["I feel sad", "my mother is awful", "I need rest", "why?"])
+        self.assertEqual(self.store.load(sid)[0], 8)
+
+    def test_stored_state_does_not_grow_with_the_conversation(self):
+        sessions = SessionManager(store=self.store)
+        sid = 'g' * 32
+        sizes = []
+        for i in range(100):
+            sessions.respond(sid, SCRIPT[i % len(SCRIPT)])
+            sizes.append(len(json.dumps(self.store.load(sid)[1])))
+        self.assertLess(max(sizes[50:]), max(sizes[:50]) + 100)
+        self.assertEqual(len(self.store.load(sid)[1]['history']['turns']),
+                         SessionManager.STORED_TURNS)
+
+
+if __name__ == '__main__':
+    unittest.main()
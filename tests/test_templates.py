@@ -0,0 +1,39 @@
+import unittest
+
+from eliza.core.response_patterns import DEFAULT_PATTERNS
+from eliza.core.templates import (CHANGES_TOPIC, HAS_PLACEHOLDER, MENTIONS_FEELINGS, Template,
+                                  candidate_table)
+
+
+class TestTemplate(unittest.TestCase):
+    def test_tags(self):
+        self.assertEqual(Template("How do you FEEL about {}?").tags,
+                         MENTIONS_FEELINGS | HAS_PLACEHOLDER)
+        self.assertEqual(Template("Shall we change focus?").tags, CHANGES_TOPIC)
+        self.assertEqual(Template("Go on.").tags, 0)
+
+    def test_render_matches_str_format(self):
+        groups = ("a break", None)
+        for text in ("You need {}.", "{1} and {0}{0}", "{{literal}} {}", "{:>10}|", "{!r}",
+                     "no placeholders"):
+            self.assertEqual(Template(text).render(groups), text.format(*groups), text)
+        for rule in DEFAULT_PATTERNS:
+            for text in rule.responses:
+                self.assertEqual(Template(text).render(("x", "y")), text.format("x", "y"))
+
+    def test_missing_group_raises_index_error(self):
+        with self.assertRaises(IndexError):
+            Template("{} and {}").render(("one",))
+
+    def test_candidate_table(self):
+        templates = (Template("How do you feel?"), Template("Let's change focus."), Template("Go on."))
+        table = candidate_table(templates)
+        self.assertIs(table[0], templates)
+        self.assertEqual([t.text for t in table[MENTIONS_FEELINGS]], ["Let's change focus.", "Go on."])
+        self.assertEqual([t.text for t in table[MENTIONS_FEELINGS | CHANGES_TOPIC]], ["Go on."])
+        only_feelings = (Template("How do you feel?"),)
+        self.assertIs(candidate_table(only_feelings)[MENTIONS_FEELINGS], only_feelings)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from eliza.core.journal import SessionJournal
+from eliza.web import app as web_app
+from eliza.web.app import app
+
+
+class TestChatEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.journal = SessionJournal(Path(self.tmpdir.name) / 'journal.jsonl', fsync=False)
+        self.addCleanup(self.journal.close)
+        web_app._journal = self.journal
+
+    def test_issues_and_reuses_session_id(self):
+        first = self.client.post('/api/chat', json={'message': 'I feel sad'}).get_json()
+        self.assertIn('session_id', first)
+
+        again = self.client.post('/api/chat', json={
+            'message': 'Hello', 'session_id': first['session_id']}).get_json()
+        self.assertEqual(again['session_id'], first['session_id'])
+
+        other = self.client.post('/api/chat', json={'message': 'Hello'}).get_json()
+        self.assertNotEqual(other['session_id'], first['session_id'])
+
+
+    def test_save_session_appends_only_new_turns(self):
+        sid = 'b' * 32
+        turns = [{'timestamp': 't', 'speaker': 'user', 'text': str(i)} for i in range(4)]
+
+        saved = self.client.post('/api/save-session', json={
+            'session_id': sid, 'offset': 0, 'turns': turns[:2]}).get_json()
+        self.assertEqual(saved['saved'], 2)
+        # A retry overlapping what was already saved is not written twice
+        saved = self.client.post('/api/save-session', json={
+            'session_id': sid, 'offset': 1, 'turns': turns[1:]}).get_json()
+        self.assertEqual(saved['saved'], 4)
+        # Legacy full-history payloads are still accepted
+        self.client.post('/api/save-session', json={'session_id': sid, 'session': turns})
+
+        self.journal.flush()
+        with open(self.journal.path) as f:
+            self.assertEqual(len(f.readlines()), 4)
+        self.assertEqual(self.journal.sessions()[sid], turns)
+
+    def test_save_session_requires_session_id(self):
+        response = self.client.post('/api/save-session', json={'session': []})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()